@@ -1,41 +1,401 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, g
 import os
 import json
-from backend.code_crawler import CodeCrawler
-from backend.ai_helper import AIHelper
+import gzip
+import importlib
+import shutil
+import threading
+import time
+import uuid
 
-app = Flask(__name__)
+from backend.metrics import REGISTRY, span
+from backend.project_catalog import ProjectCatalog, brain_stats
+
+app = Flask(__name__, template_folder='frontend', static_folder='frontend', static_url_path='/static')
+
+# Startup mode: only the endpoint groups listed here get registered, and the
+# backend modules they need are imported on first request (or at startup when
+# CODECRAFT_PRELOAD=1). e.g. CODECRAFT_ENDPOINTS=projects,ask
+ALL_ENDPOINTS = 'projects,analyze,ask,architecture,search,history,metrics,profiling'
+ENABLED_ENDPOINTS = {
+    group.strip() for group in os.environ.get('CODECRAFT_ENDPOINTS', ALL_ENDPOINTS).split(',')
+    if group.strip()
+}
+ENDPOINT_MODULES = {
+    'projects': [],
+    'analyze': ['backend.code_crawler', 'backend.architecture_mapper', 'backend.parse_cache',
+                'backend.project_watcher'],
+    'ask': ['backend.ai_helper', 'backend.question_router'],
+    'architecture': ['backend.architecture_mapper'],
+    'search': ['backend.symbol_index'],
+    'history': ['backend.brain_history'],
+    'metrics': [],
+    'profiling': ['backend.request_profiler'],
+}
+
+def endpoint(group, rule, **options):
+    """Register a route only when its endpoint group is enabled"""
+    def decorator(view):
+        if group in ENABLED_ENDPOINTS:
+            app.add_url_rule(rule, view_func=view, **options)
+        return view
+    return decorator
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'codecraft_http_request_duration_seconds', 'Time to handle an HTTP request', ['method', 'endpoint', 'status']
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'codecraft_cache_requests_total', 'Per-project derived data lookups', ['cache', 'result']
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The route pattern, not the URL - one series per endpoint, not per project
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method, endpoint=rule, status=response.status_code
+        )
+    return response
+
+# Opt-in profiling (CODECRAFT_PROFILING=1): ?profile=cpu|memory|all or X-Codecraft-Profile on
+# any request, plus a random CODECRAFT_PROFILE_SAMPLE_RATE share of all requests. Off by default:
+# any client could otherwise add profiler overhead and disk writes to the server
+PROFILING_ENABLED = os.environ.get('CODECRAFT_PROFILING', '0') != '0'
+PROFILE_SAMPLE_RATE = float(os.environ.get('CODECRAFT_PROFILE_SAMPLE_RATE', '0'))
+_request_profiler = None
+
+def get_request_profiler():
+    global _request_profiler
+    if _request_profiler is None:
+        from backend.request_profiler import RequestProfiler
+        _request_profiler = RequestProfiler(
+            os.path.join('projects', '.profiles'),
+            keep=int(os.environ.get('CODECRAFT_PROFILE_KEEP', '50')),
+            sample_rate=PROFILE_SAMPLE_RATE,
+            enabled=PROFILING_ENABLED
+        )
+    return _request_profiler
+
+@app.before_request
+def start_request_profile():
+    if not PROFILING_ENABLED:
+        return
+    flag = request.args.get('profile') or request.headers.get('X-Codecraft-Profile')
+    if not flag and not PROFILE_SAMPLE_RATE:
+        return  # the common case never touches the profiler
+    
+    modes = get_request_profiler().modes_for(flag)
+    if modes:
+        session = get_request_profiler().start(modes)
+        if session is not None:
+            g.profile_session = session
+
+@app.after_request
+def save_request_profile(response):
+    session = g.pop('profile_session', None)
+    if session is not None:
+        summary = get_request_profiler().save(session, request.method, request.path, response.status_code)
+        response.headers['X-Codecraft-Profile-Id'] = summary['id']
+    return response
+
+@app.teardown_request
+def finish_request_profile(error=None):
+    """A request that raised skips after_request: stop its profiler here so it never stays on"""
+    session = g.pop('profile_session', None)
+    if session is not None:
+        get_request_profiler().save(session, request.method, request.path, 500)
+
+def preload_endpoint_modules():
+    """Import the backend modules of every enabled endpoint group up front"""
+    for group in sorted(ENABLED_ENDPOINTS):
+        for module_name in ENDPOINT_MODULES.get(group, []):
+            importlib.import_module(module_name)
 
 class ProjectManager:
     def __init__(self):
         self.projects_dir = "projects"
         os.makedirs(self.projects_dir, exist_ok=True)
+        self.catalog = ProjectCatalog(self.projects_dir)
+        self._cache = {}  # (project, kind) -> (brain stamp, value)
+        self._histories = {}
+    
+    def brain_file(self, project_name):
+        """The brain's index header (brain_index.json), or project_brain.json of older projects"""
+        from backend.sharded_brain import INDEX_FILE
+        
+        index_file = os.path.join(self.projects_dir, project_name, INDEX_FILE)
+        legacy_file = os.path.join(self.projects_dir, project_name, 'project_brain.json')
+        if not os.path.exists(index_file) and os.path.exists(legacy_file):
+            return legacy_file
+        return index_file
+    
+    def save_lock(self, project_name):
+        """Held while a brain is stored (and its meta updated) - across threads and worker processes"""
+        return self.job_lock(project_name, 'save')
+    
+    def job_lock(self, project_name, job):
+        """projects/.locks/<name>.<job>.lock: 'crawl' / 'watch' are held by the worker running that job"""
+        from backend.file_lock import FileLock
+        return FileLock(os.path.join(self.projects_dir, '.locks', f'{project_name}.{job}.lock'))
+    
+    def brain_writer(self, project_name):
+        """Sink for CodeCrawler.build_project_map: files are stored as they are parsed"""
+        from backend.sharded_brain import BrainWriter
+        return BrainWriter(os.path.join(self.projects_dir, project_name))
+    
+    def open_brain(self, project_name):
+        """The stored brain as a read-only mapping, read from disk on access"""
+        from backend.sharded_brain import ShardedBrain
+        
+        brain_file = self.brain_file(project_name)
+        if brain_file.endswith('project_brain.json'):
+            with open(brain_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return ShardedBrain(os.path.dirname(brain_file))  # FileNotFoundError if never analyzed
+    
+    def history(self, project_name):
+        """The project's BrainHistory, with the retention settings from the environment"""
+        from backend.brain_history import BrainHistory
+        
+        if project_name not in self._histories:
+            self._histories[project_name] = BrainHistory(
+                os.path.join(self.projects_dir, project_name),
+                compact_every=int(os.environ.get('CODECRAFT_HISTORY_COMPACT', '20')),
+                keep=int(os.environ.get('CODECRAFT_HISTORY_KEEP', '200'))
+            )
+        return self._histories[project_name]
+    
+    def mapped_brain_file(self, project_name):
+        """Memory-mappable copy of the brain, shared by all worker processes"""
+        return os.path.join(self.projects_dir, project_name, 'project_brain.bin')
+    
+    def brain_stamp(self, project_name):
+        """Changes whenever either brain file is replaced (re-analysis, checkpoint, watch)"""
+        mtime = os.path.getmtime(self.brain_file(project_name))  # FileNotFoundError if never analyzed
+        try:
+            return mtime, os.path.getmtime(self.mapped_brain_file(project_name))
+        except FileNotFoundError:
+            return mtime, None
+    
+    def meta_file(self, project_name):
+        return os.path.join(self.projects_dir, project_name, 'project_meta.json')
+    
+    def load_meta(self, project_name):
+        """Where a project was analyzed from, and when ({} for older projects)"""
+        try:
+            with open(self.meta_file(project_name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def save_meta(self, project_name, **fields):
+        """Update the meta file and the project's catalog entry (one writer at a time, any process)"""
+        with self.job_lock(project_name, 'meta'):
+            meta = self.load_meta(project_name)
+            meta.update(fields)
+            tmp_path = f"{self.meta_file(project_name)}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp_path, self.meta_file(project_name))
+            self.catalog.update(project_name, meta)
+        return meta
+    
+    def cached(self, project_name, kind, builder, depends=()):
+        """Per-project derived data, rebuilt only when the brain file changes
+        
+        Every worker process checks the stamp on each call, so a re-analysis
+        done by one worker is picked up by the others on their next request.
+        depends: other files in the project directory the value is read from;
+        replacing one of them also rebuilds it.
+        """
+        brain_file = self.brain_file(project_name)
+        stamp = self.brain_stamp(project_name)
+        for name in depends:
+            try:
+                stamp += (os.path.getmtime(os.path.join(self.projects_dir, project_name, name)),)
+            except FileNotFoundError:
+                stamp += (None,)
+        
+        entry = self._cache.get((project_name, kind))
+        if entry and entry[0] == stamp:
+            CACHE_REQUESTS.inc(cache=kind, result='hit')
+            return entry[1]
+        
+        CACHE_REQUESTS.inc(cache=kind, result='miss')
+        with span(f'build_{kind}'):
+            value = builder(brain_file)
+        self._cache[(project_name, kind)] = (stamp, value)
+        return value
+    
+    def load_brain(self, project_name):
+        """Read-only compact brain, cached until the project is re-analyzed
+        
+        Maps project_brain.bin when it is at least as new as the brain, so
+        processes share the pages instead of each decoding its own copy.
+        """
+        from backend.compact_brain import CompactBrain
+        
+        def build(brain_file):
+            json_mtime, mapped_mtime = self.brain_stamp(project_name)
+            if mapped_mtime is not None and mapped_mtime >= json_mtime:
+                try:
+                    return CompactBrain.load_mapped(self.mapped_brain_file(project_name))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠️ Ignoring mapped brain of {project_name}: {e}")
+            brain = self.open_brain(project_name)
+            if isinstance(brain, dict):
+                return CompactBrain.from_dict(brain)
+            with brain:
+                return CompactBrain.from_dict(brain)
+        
+        return self.cached(project_name, 'brain', build)
+    
+    def patch_brain(self, project_name):
+        """The stored brain as a BrainPatch: update it in place, save_project_index writes only the changes"""
+        from backend.sharded_brain import BrainPatch
+        
+        brain = self.open_brain(project_name)
+        return brain if isinstance(brain, dict) else BrainPatch(brain)
+    
+    def load_brain_dict(self, project_name):
+        """The brain as plain, modifiable dicts (not cached)"""
+        brain = self.open_brain(project_name)
+        if isinstance(brain, dict):
+            return brain
+        with brain:
+            return brain.to_dict()
     
     def get_projects(self):
-        """Get all saved projects"""
-        projects = []
-        for project_name in os.listdir(self.projects_dir):
-            project_path = os.path.join(self.projects_dir, project_name)
-            if os.path.isdir(project_path):
-                projects.append({
-                    'name': project_name,
-                    'brain_file': os.path.join(project_path, 'project_brain.json')
-                })
+        """Get all saved projects with their stats, from the catalog"""
+        projects, _ = self.catalog.listing()
         return projects
+    
+    def delete_project(self, project_name):
+        """Remove a project's directory and catalog entry; False if there was none"""
+        project_dir = os.path.join(self.projects_dir, project_name)
+        if project_name.startswith('.') or os.path.basename(project_name) != project_name:
+            return False  # not a project name (shared data, or a path)
+        
+        existed = os.path.isdir(project_dir) or self.catalog.get(project_name) is not None
+        shutil.rmtree(project_dir, ignore_errors=True)
+        self.catalog.remove(project_name)
+        for key in [key for key in self._cache if key[0] == project_name]:
+            self._cache.pop(key, None)
+        self._histories.pop(project_name, None)
+        return existed
 
 project_manager = ProjectManager()
 
+_parse_cache = None
+
+def get_parse_cache():
+    """One content-addressed parse cache shared by every project"""
+    global _parse_cache
+    if _parse_cache is None:
+        from backend.parse_cache import ParseCache
+        max_mb = int(os.environ.get('CODECRAFT_PARSE_CACHE_MB', '256'))
+        _parse_cache = ParseCache(
+            os.path.join(project_manager.projects_dir, '.parse_cache'),
+            max_bytes=max_mb * 1024 * 1024
+        )
+    return _parse_cache
+
 @app.route('/')
 def home():
     return render_template('index.html')
 
-@app.route('/api/projects', methods=['GET'])
+_catalog_response = None
+
+@endpoint('projects', '/api/projects', methods=['GET'])
 def get_projects():
-    projects = project_manager.get_projects()
-    return jsonify(projects)
+    """Catalog of projects with file/symbol counts and freshness; ETag-revalidated"""
+    global _catalog_response
+    projects, etag = project_manager.catalog.listing()
+    if _catalog_response is None or _catalog_response['etag'] != etag:
+        _catalog_response = encoded_json(projects, etag)
+    return cached_json_response(_catalog_response)
+
+@endpoint('projects', '/api/projects/<project_name>', methods=['DELETE'])
+def delete_project(project_name):
+    """Stop any crawl / watcher of the project, then remove it
+    
+    Crawls and watchers running in other workers find the meta gone and
+    stop without saving: they check it under the save lock held here.
+    """
+    cancel_background_crawl(project_name)
+    cancel_prefetch(project_name)
+    stop_local_watch(project_name)
+    
+    with project_manager.save_lock(project_name):
+        deleted = project_manager.delete_project(project_name)
+    if not deleted:
+        return jsonify({'error': f'Project {project_name} not found'}), 404
+    return jsonify({'status': 'success', 'message': f'Project {project_name} deleted'})
+
+# Brain versions: every save that changes the brain is kept as a delta (see backend/brain_history.py)
+HISTORY_ENABLED = os.environ.get('CODECRAFT_HISTORY', '1') != '0'
+
+def save_project_index(project_name, project_map, record_history=True):
+    """Store the brain (shards + mapped copy), then the derived metrics, call graph and symbol index
+    
+    project_map is a dict, a BrainPatch of the stored brain (only its changed
+    files are written), or the ShardedBrain a streaming crawl already wrote
+    for this project, which is closed here. The derived data is built from the compact
+    brain, so the whole brain is never held as plain dicts here.
+    Each brain that differs from the previous one becomes a new history version,
+    unless record_history is False: the checkpoints of a budgeted crawl are
+    half-indexed, so only its complete brain is recorded.
+    Returns the brain's catalog stats (files, symbols, brain_bytes) for save_meta.
+    """
+    from backend.architecture_mapper import ArchitectureMapper
+    from backend.brain_cache import save_cached
+    from backend.compact_brain import CompactBrain
+    from backend.sharded_brain import BrainPatch, ShardedBrain, storage_bytes, write_sharded_brain
+    from backend.symbol_index import SymbolIndex
+    
+    project_dir = os.path.join(project_manager.projects_dir, project_name)
+    if isinstance(project_map, BrainPatch):
+        with span('brain_patch'):
+            project_map = project_map.apply()
+    elif not (isinstance(project_map, ShardedBrain) and os.path.samefile(project_map.project_dir, project_dir)):
+        with span('brain_write'):
+            project_map = write_sharded_brain(project_dir, project_map)
+    legacy_file = os.path.join(project_dir, 'project_brain.json')
+    if os.path.exists(legacy_file):
+        os.remove(legacy_file)  # superseded by the sharded brain
+    
+    with project_map:
+        if HISTORY_ENABLED and record_history:
+            with span('record_history'):
+                project_manager.history(project_name).record(project_map)
+        with span('mapped_brain_write'):
+            compact = CompactBrain.from_dict(project_map)
+            compact.save(project_manager.mapped_brain_file(project_name))
+    
+    # Post-crawl: structural metrics used to rank context
+    mapper = ArchitectureMapper()
+    mapper.build_dependency_graph(compact)
+    mapper.compute_metrics(os.path.join(project_dir, 'graph_metrics.json'))
+    mapper.build_call_graph(compact, os.path.join(project_dir, 'call_graph.json'))
+    with span('build_symbol_index'):
+        save_cached(os.path.join(project_dir, 'symbol_index.json'), mapper.brain_version,
+                    SymbolIndex.from_project_map(compact).to_data())
+    
+    stats = brain_stats(compact)
+    stats['brain_bytes'] = storage_bytes(project_dir)
+    return stats
 
-@app.route('/api/analyze_project', methods=['POST'])
+@endpoint('analyze', '/api/analyze_project', methods=['POST'])
 def analyze_project():
+    from backend.code_crawler import CodeCrawler
+    
     data = request.json
     project_path = data['project_path']
     project_name = data.get('project_name', 'default_project')
@@ -44,35 +404,756 @@ def analyze_project():
     project_dir = os.path.join('projects', project_name)
     os.makedirs(project_dir, exist_ok=True)
     
-    # Build project brain
-    crawler = CodeCrawler(project_path)
-    project_map = crawler.build_project_map()
+    crawler = CodeCrawler(project_path, parse_cache=get_parse_cache())
+    meta = project_manager.load_meta(project_name)
     
-    # Save to project-specific brain file
-    brain_file = os.path.join(project_dir, 'project_brain.json')
-    with open(brain_file, 'w') as f:
-        json.dump(project_map, f, indent=2)
+    # mode=git: re-parse only what git says changed since the last analysis
+    update = None
+    if data.get('mode') == 'git' and meta.get('commit') and os.path.isfile(project_manager.brain_file(project_name)):
+        project_map = project_manager.patch_brain(project_name)
+        update = crawler.update_from_git(project_map, meta['commit'], meta.get('untracked', []))
+        if update is None and hasattr(project_map, 'close'):
+            project_map.close()  # git can't tell: full crawl below
     
-    return jsonify({
+    # Budgeted crawl: important files first, the rest keeps filling in the background
+    time_budget = data.get('time_budget') or os.environ.get('CODECRAFT_CRAWL_BUDGET')
+    file_budget = data.get('file_budget')
+    remaining = []
+    
+    cancel_background_crawl(project_name)
+    cancel_prefetch(project_name)
+    started = time.perf_counter()
+    if update is None:
+        # Build project brain
+        if time_budget or file_budget:
+            project_map, remaining = crawler.build_partial_project_map(
+                float(time_budget) if time_budget else None,
+                int(file_budget) if file_budget else None
+            )
+        else:
+            # Streamed straight into the project's brain shards as files are parsed
+            project_map = crawler.build_project_map(sink=project_manager.brain_writer(project_name))
+        git_state = crawler.git_state()
+    else:
+        git_state = {'commit': update['commit'], 'untracked': update['untracked']}
+    
+    crawl_seconds = time.perf_counter() - started
+    crawl_token = uuid.uuid4().hex if remaining else None  # which background crawl is wanted
+    with project_manager.save_lock(project_name):
+        stats = save_project_index(project_name, project_map, record_history=not remaining)
+        project_manager.save_meta(
+            project_name,
+            source_root=os.path.abspath(project_path),
+            analyzed_at=time.time(),
+            crawl_seconds=round(crawl_seconds, 3),
+            status='partial' if remaining else 'complete',
+            files_pending=len(remaining),
+            # git re-analysis only patches a brain that covers the whole tree
+            commit=None if remaining else git_state.get('commit'),
+            untracked=git_state.get('untracked', []),
+            crawl_token=crawl_token,
+            **stats
+        )
+    
+    response = {
         'status': 'success',
         'message': f'Project {project_name} analyzed successfully!',
-        'files_analyzed': len(project_map)
-    })
+        'mode': 'git' if update is not None else 'full',
+        'brain_status': 'partial' if remaining else 'complete',
+        'files_analyzed': len(project_map),
+        'files_pending': len(remaining),
+        'files_reparsed': update['updated'] if update is not None else len(project_map),
+        'commit': git_state.get('commit'),
+        'parse_cache': get_parse_cache().stats()
+    }
+    if remaining:
+        response['message'] = f'Project {project_name} is ready to ask - still indexing {len(remaining)} files'
+        start_background_crawl(project_name, crawler, project_map, remaining, git_state, crawl_token)
+    else:
+        start_prefetch(project_name)
+    
+    return jsonify(response)
+
+# Budgeted crawls: project name -> CrawlJob still filling its brain in this worker. The crawl
+# holds .locks/<name>.crawl.lock; meta['crawl_token'] says which crawl is still wanted.
+crawl_jobs = {}
+crawl_jobs_lock = threading.Lock()
+
+class CrawlJob:
+    """Stop signal of one background crawl: a cancel in this worker, or a newer token in the meta
+    
+    Any worker can supersede a crawl by changing the project's crawl_token;
+    the crawl notices within a second (is_set reads the meta at most that
+    often) and always re-reads it under the save lock before saving.
+    """
+    
+    def __init__(self, project_name, token):
+        self.project_name = project_name
+        self.token = token
+        self._event = threading.Event()
+        self._checked = time.monotonic()
+        self.thread = None
+    
+    def set(self):
+        self._event.set()
+    
+    def is_set(self, fresh=False):
+        if not self._event.is_set() and (fresh or time.monotonic() - self._checked >= 1):
+            self._checked = time.monotonic()
+            if project_manager.load_meta(self.project_name).get('crawl_token') != self.token:
+                self._event.set()
+        return self._event.is_set()
+
+def start_background_crawl(project_name, crawler, project_map, remaining, git_state, token):
+    job = CrawlJob(project_name, token)
+    with crawl_jobs_lock:
+        crawl_jobs[project_name] = job
+    
+    thread = threading.Thread(
+        target=finish_crawl, args=(project_name, crawler, project_map, remaining, git_state, job),
+        daemon=True, name=f'crawl:{project_name}'
+    )
+    job.thread = thread
+    thread.start()
+
+def cancel_background_crawl(project_name):
+    """A new analysis supersedes a crawl still running for the same project, in any worker
+    
+    Clears the crawl token under the save lock: a checkpoint save already
+    under way has finished by then, and every crawl re-checks the token
+    under that lock, so none saves again.
+    """
+    with crawl_jobs_lock:
+        job = crawl_jobs.pop(project_name, None)
+    if job:
+        job.set()
+    with project_manager.save_lock(project_name):
+        if project_manager.load_meta(project_name).get('crawl_token'):
+            project_manager.save_meta(project_name, crawl_token=None)
+
+def finish_crawl(project_name, crawler, project_map, remaining, git_state, job):
+    """Parse the files a budgeted crawl skipped, saving a checkpoint every few seconds"""
+    checkpoint = float(os.environ.get('CODECRAFT_CRAWL_CHECKPOINT', '30'))
+    crawl_lock = project_manager.job_lock(project_name, 'crawl')
+    crawl_lock.acquire()  # a superseded crawl (maybe in another worker) lets go within a second
+    
+    try:
+        if job.is_set(fresh=True):
+            return
+        crawl_seconds = project_manager.load_meta(project_name).get('crawl_seconds', 0)
+        while remaining:
+            started = time.perf_counter()
+            remaining = crawler.crawl_files(
+                remaining, project_map, deadline=time.monotonic() + checkpoint, stop_event=job
+            )
+            if job.is_set():
+                return
+            crawl_seconds += time.perf_counter() - started
+            
+            with project_manager.save_lock(project_name):
+                if job.is_set(fresh=True):
+                    return  # superseded while parsing: the newer brain stays
+                stats = save_project_index(project_name, project_map, record_history=not remaining)
+                project_manager.save_meta(
+                    project_name,
+                    analyzed_at=time.time(),
+                    crawl_seconds=round(crawl_seconds, 3),
+                    status='partial' if remaining else 'complete',
+                    files_pending=len(remaining),
+                    commit=None if remaining else git_state.get('commit'),
+                    crawl_token=job.token if remaining else None,
+                    **stats
+                )
+            print(f"📥 {project_name}: {len(project_map)} files indexed, {len(remaining)} to go")
+        start_prefetch(project_name)
+    except Exception as e:
+        print(f"❌ Background crawl of {project_name} failed: {e}")
+    finally:
+        crawl_lock.release()
+        with crawl_jobs_lock:
+            if crawl_jobs.get(project_name) is job:
+                del crawl_jobs[project_name]
+
+def resume_pending_crawls():
+    """Take over budgeted crawls whose worker went away (reload, crash): their crawl lock is free"""
+    from backend.code_crawler import CodeCrawler
+    from backend.file_lock import lock_is_held
+    
+    for entry in project_manager.get_projects():
+        project_name = entry.get('name')
+        if entry.get('status') != 'partial' or project_name in crawl_jobs:
+            continue
+        if lock_is_held(project_manager.job_lock(project_name, 'crawl').path):
+            continue
+        meta = project_manager.load_meta(project_name)
+        source_root = meta.get('source_root')
+        if not meta.get('crawl_token') or not source_root or not os.path.isdir(source_root):
+            continue
+        
+        crawler = CodeCrawler(source_root, parse_cache=get_parse_cache())
+        project_map = project_manager.load_brain_dict(project_name)
+        remaining = [path for path in crawler.prioritize(crawler.find_all_code_files()) if path not in project_map]
+        print(f"♻️ Resuming the crawl of {project_name}: {len(remaining)} files to go")
+        if remaining:
+            start_background_crawl(project_name, crawler, project_map, remaining, crawler.git_state(),
+                                   meta['crawl_token'])
+        else:
+            with project_manager.save_lock(project_name):
+                if project_manager.load_meta(project_name).get('crawl_token') == meta['crawl_token']:
+                    project_manager.save_meta(project_name, status='complete', files_pending=0,
+                                              crawl_token=None, commit=crawler.git_state().get('commit'))
+
+# Watch mode: meta['watch'] = {debounce, backend} while a project should be watched; the worker
+# running its ProjectWatcher holds .locks/<name>.watch.lock. Here: name -> (watcher, lock).
+watchers = {}
+watchers_lock = threading.Lock()
+
+def start_local_watch(project_name, source_root, config):
+    """Run the project's watcher in this worker unless another worker already does"""
+    from backend.project_watcher import ProjectWatcher
+    
+    with watchers_lock:
+        if project_name in watchers and watchers[project_name][0].running:
+            return
+        watch_lock = project_manager.job_lock(project_name, 'watch')
+        if not watch_lock.acquire(blocking=False):
+            return
+        watcher = ProjectWatcher(
+            source_root,
+            lambda changed: reindex_changes(project_name, source_root, changed),
+            debounce=float(config.get('debounce', 0.5)),
+            use_inotify=config.get('backend', 'auto') != 'polling'
+        )
+        watcher.start()
+        watchers[project_name] = (watcher, watch_lock)
+    project_manager.save_meta(project_name, watch_backend=watcher.backend_name)
+
+def stop_local_watch(project_name):
+    with watchers_lock:
+        entry = watchers.pop(project_name, None)
+    if entry:
+        watcher, watch_lock = entry
+        watcher.stop()
+        watch_lock.release()
+
+def reindex_changes(project_name, source_root, changed_paths):
+    """Feed a batch of changed paths (None = re-check everything) into the brain"""
+    from backend.code_crawler import CodeCrawler
+    
+    crawler = CodeCrawler(source_root, parse_cache=get_parse_cache())
+    with project_manager.save_lock(project_name):  # read-modify-write of the stored brain
+        meta = project_manager.load_meta(project_name)
+        if not meta.get('watch'):
+            stop_local_watch(project_name)  # unwatched or deleted by another worker
+            return
+        if changed_paths is None:
+            project_map = crawler.build_project_map(sink=project_manager.brain_writer(project_name))
+        else:
+            project_map = project_manager.patch_brain(project_name)
+            result = crawler.update_files(project_map, changed_paths)
+            if not result['updated'] and not result['removed']:
+                if hasattr(project_map, 'close'):
+                    project_map.close()
+                return
+        
+        # A background crawl still filling the brain records the complete version
+        stats = save_project_index(project_name, project_map,
+                                   record_history=meta.get('status', 'complete') == 'complete')
+        project_manager.save_meta(project_name, analyzed_at=time.time(), **stats)
+    start_prefetch(project_name)
+
+@endpoint('analyze', '/api/projects/<project_name>/watch', methods=['POST'])
+def start_watch(project_name):
+    """Keep a project's brain up to date as its files change (in whichever worker can take it)"""
+    source_root = project_manager.load_meta(project_name).get('source_root')
+    if not source_root or not os.path.isfile(project_manager.brain_file(project_name)):
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+    if not os.path.isdir(source_root):
+        return jsonify({'error': f'Source folder {source_root} no longer exists'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    config = {'debounce': float(data.get('debounce', 0.5)), 'backend': data.get('backend', 'auto')}
+    project_manager.save_meta(project_name, watch=config)
+    start_local_watch(project_name, source_root, config)
+    return jsonify(watch_info(project_name))
+
+@endpoint('analyze', '/api/projects/<project_name>/watch', methods=['DELETE'])
+def stop_watch(project_name):
+    """Unwatch: a watcher in another worker sees it on its next change (or maintenance pass)"""
+    if project_manager.load_meta(project_name):
+        project_manager.save_meta(project_name, watch=None)
+    stop_local_watch(project_name)
+    return jsonify(watch_info(project_name))
+
+@endpoint('analyze', '/api/projects/<project_name>/watch', methods=['GET'])
+def watch_status(project_name):
+    return jsonify(watch_info(project_name))
+
+def watch_info(project_name):
+    """The project's watch state, whichever worker runs the watcher"""
+    from backend.file_lock import lock_is_held
+    
+    meta = project_manager.load_meta(project_name)
+    running = bool(meta.get('watch')) and lock_is_held(project_manager.job_lock(project_name, 'watch').path)
+    return {
+        'project': project_name,
+        'watching': running,
+        'backend': meta.get('watch_backend') if running else None,
+        'analyzed_at': meta.get('analyzed_at')
+    }
+
+def maintain_background_jobs():
+    """One maintenance pass of this worker: take over orphaned crawls and watches, drop unwanted ones"""
+    from backend.file_lock import lock_is_held
+    
+    resume_pending_crawls()
+    for project_name in list(watchers):
+        if not project_manager.load_meta(project_name).get('watch'):
+            stop_local_watch(project_name)
+    for entry in project_manager.get_projects():
+        project_name = entry.get('name')
+        if project_name in watchers or lock_is_held(project_manager.job_lock(project_name, 'watch').path):
+            continue
+        meta = project_manager.load_meta(project_name)
+        if meta.get('watch') and meta.get('source_root') and os.path.isdir(meta['source_root']):
+            print(f"♻️ Taking over the watcher of {project_name}")
+            start_local_watch(project_name, meta['source_root'], meta['watch'])
+
+_maintenance = None
+
+def start_background_maintenance():
+    """Per worker: a maintenance pass now and every CODECRAFT_JOBS_INTERVAL seconds (0 = off)"""
+    global _maintenance
+    interval = float(os.environ.get('CODECRAFT_JOBS_INTERVAL', '15'))
+    if _maintenance is not None or interval <= 0:
+        return
+    _maintenance = threading.Event()
+    
+    def run(stop_event):
+        while True:
+            try:
+                maintain_background_jobs()
+            except Exception as e:
+                print(f"❌ Background job maintenance failed: {e}")
+            if stop_event.wait(interval):
+                return
+    
+    threading.Thread(target=run, args=(_maintenance,), daemon=True, name='maintenance').start()
+
+def stop_background_jobs():
+    """Worker shutdown: let go of this worker's crawls and watchers so another worker takes them over
+    
+    Their tokens / watch config stay in the meta; the crawl locks are
+    released as the crawl threads stop (or when the process exits).
+    """
+    if _maintenance is not None:
+        _maintenance.set()
+    with crawl_jobs_lock:
+        jobs = list(crawl_jobs.values())
+    for job in jobs:
+        job.set()
+    for job in jobs:
+        job.thread.join(10)  # a checkpoint save under way finishes first
+    for project_name in list(watchers):
+        stop_local_watch(project_name)
+    with prefetch_jobs_lock:
+        for stop_event in prefetch_jobs.values():
+            stop_event.set()
+
+_llm_queue = None
+
+def get_llm_queue():
+    """The process's queue in front of Ollama: CODECRAFT_LLM_SLOTS calls at a time"""
+    global _llm_queue
+    if _llm_queue is None:
+        from backend.llm_queue import LLMQueue
+        _llm_queue = LLMQueue(int(os.environ.get('CODECRAFT_LLM_SLOTS', '1')))
+    return _llm_queue
+
+_question_router = None
+
+def get_question_router():
+    """Model routing for /api/ask_question; thresholds from the environment"""
+    global _question_router
+    if _question_router is None:
+        from backend.question_router import QuestionRouter
+        _question_router = QuestionRouter(
+            large_model=os.environ.get('CODECRAFT_LARGE_MODEL', 'codellama:7b'),
+            small_model=os.environ.get('CODECRAFT_SMALL_MODEL', 'qwen2.5-coder:1.5b'),  # '' = large only
+            small_max_words=int(os.environ.get('CODECRAFT_ROUTE_SMALL_MAX_WORDS', '12')),
+            small_max_context=int(os.environ.get('CODECRAFT_ROUTE_SMALL_MAX_CONTEXT', '4000')),
+            lookups=os.environ.get('CODECRAFT_ROUTE_LOOKUPS', '1') != '0'
+        )
+    return _question_router
+
+# Post-analysis prefetch of likely first questions: CODECRAFT_PREFETCH=contexts (default),
+# answers (also ask the LLM, at low priority) or 0
+PREFETCH_MODE = os.environ.get('CODECRAFT_PREFETCH', 'contexts')
+prefetch_jobs = {}
+prefetch_jobs_lock = threading.Lock()
+
+def start_prefetch(project_name):
+    """Warm the first questions about a freshly stored (complete) brain in the background"""
+    if PREFETCH_MODE not in ('contexts', 'answers') or 'ask' not in ENABLED_ENDPOINTS:
+        return
+    cancel_prefetch(project_name)
+    stop_event = threading.Event()
+    with prefetch_jobs_lock:
+        prefetch_jobs[project_name] = stop_event
+    
+    threading.Thread(
+        target=run_prefetch, args=(project_name, stop_event), daemon=True, name=f'prefetch:{project_name}'
+    ).start()
+
+def cancel_prefetch(project_name):
+    """A newer brain makes the running prefetch pointless"""
+    with prefetch_jobs_lock:
+        stop_event = prefetch_jobs.pop(project_name, None)
+    if stop_event:
+        stop_event.set()
+
+def run_prefetch(project_name, stop_event):
+    from backend.ai_helper import AIHelper
+    from backend.question_prefetch import PREFETCH_FILE, QuestionPrefetcher, template_questions
+    
+    try:
+        brain_file = project_manager.brain_file(project_name)
+        project_map = project_manager.load_brain(project_name)
+        ai = AIHelper(brain_file, project_map=project_map, llm_queue=get_llm_queue(), router=get_question_router(),
+                      brain_context=load_brain_context(project_name, project_map))
+        questions = template_questions(
+            ai.project_map, ai.graph_metrics, class_count=int(os.environ.get('CODECRAFT_PREFETCH_CLASSES', '5'))
+        )
+        prefetcher = QuestionPrefetcher(
+            ai, os.path.join(os.path.dirname(brain_file), PREFETCH_FILE), answers=PREFETCH_MODE == 'answers'
+        )
+        with span('prefetch_questions'):
+            entries = prefetcher.run(questions, stop_event)
+        if not stop_event.is_set():
+            print(f"🔮 {project_name}: {len(entries)} likely questions prefetched ({PREFETCH_MODE})")
+    except Exception as e:
+        print(f"❌ Prefetch for {project_name} failed: {e}")
+    finally:
+        with prefetch_jobs_lock:
+            if prefetch_jobs.get(project_name) is stop_event:
+                del prefetch_jobs[project_name]
 
-@app.route('/api/ask_question', methods=['POST'])
+@endpoint('ask', '/api/ask_question', methods=['POST'])
 def ask_question():
+    from backend.ai_helper import AIHelper
+    
     data = request.json
     question = data['question']
     project_name = data['project_name']
     
-    brain_file = os.path.join('projects', project_name, 'project_brain.json')
-    ai = AIHelper(brain_file)
-    answer = ai.ask_question(question)
+    brain_file = project_manager.brain_file(project_name)
+    try:
+        project_map = project_manager.load_brain(project_name)
+    except FileNotFoundError:
+        project_map = None  # AIHelper reports the missing brain
+    ai = AIHelper(brain_file, project_map=project_map, llm_queue=get_llm_queue(), router=get_question_router(),
+                  brain_context=load_brain_context(project_name, project_map) if project_map else None,
+                  prefetched=load_prefetched_questions(project_name, project_map) if project_map else None)
+    result = ai.ask_routed(question)
     
     return jsonify({
         'question': question,
-        'answer': answer
+        'answer': result['answer'],
+        'route': result['route'],
+        'model': result['model']
+    })
+
+def load_brain_context(project_name, project_map):
+    """AIHelper's graph metrics, call graph and defined names - built once per brain, not per question"""
+    from backend.ai_helper import BrainContext
+    
+    return project_manager.cached(
+        project_name, 'brain_context', lambda brain_file: BrainContext(os.path.dirname(brain_file), project_map),
+        depends=('graph_metrics.json', 'call_graph.json')  # written after the brain
+    )
+
+def load_prefetched_questions(project_name, project_map):
+    """The prefetch results for the current brain, re-read only when prefetch.json is rewritten"""
+    from backend.question_prefetch import PREFETCH_FILE, load_prefetched
+    
+    return project_manager.cached(
+        project_name, 'prefetched',
+        lambda brain_file: load_prefetched(os.path.join(os.path.dirname(brain_file), PREFETCH_FILE),
+                                           project_map.version),
+        depends=(PREFETCH_FILE,)
+    )
+
+@endpoint('ask', '/api/ask/stats', methods=['GET'])
+def ask_stats():
+    """Per-route question latency (this worker process): count, mean, p50, p95"""
+    router = get_question_router()
+    return jsonify({
+        'routes': router.stats.summary(),
+        'models': {'small': router.small_model, 'large': router.large_model}
+    })
+
+def get_hierarchy(project_name):
+    """Level-of-detail architecture model for a project (None if not analyzed)"""
+    from backend.architecture_mapper import ArchitectureMapper
+    
+    try:
+        project_map = project_manager.load_brain(project_name)
+        return project_manager.cached(
+            project_name, 'hierarchy',
+            lambda brain_file: ArchitectureMapper().build_hierarchy(project_map)
+        )
+    except FileNotFoundError:
+        return None
+
+@endpoint('architecture', '/api/architecture/<project_name>', methods=['GET'])
+def architecture_overview(project_name):
+    """Collapsed package/file view with aggregated import edges"""
+    hierarchy = get_hierarchy(project_name)
+    if hierarchy is None:
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+    
+    return jsonify(hierarchy.collapsed_view())
+
+@endpoint('architecture', '/api/architecture/<project_name>/expand', methods=['GET'])
+def architecture_expand(project_name):
+    """Children of ?node=<id>; pass the ids already on screen as ?visible=<id>"""
+    hierarchy = get_hierarchy(project_name)
+    if hierarchy is None:
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+    
+    node_id = request.args.get('node', '')
+    try:
+        view = hierarchy.expand(node_id, request.args.getlist('visible'))
+    except KeyError:
+        return jsonify({'error': f'Unknown node: {node_id}'}), 404
+    
+    return jsonify(view)
+
+def encoded_json(payload, etag):
+    """Serialize once, gzip once - what cached responses store"""
+    with span('json_encode'):
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return {'etag': etag, 'body': body, 'gzip': gzip.compress(body, compresslevel=6)}
+
+def cached_json_response(encoded):
+    """Serve an encoded_json() entry with ETag / If-None-Match and gzip"""
+    if encoded['etag'] in request.if_none_match:
+        response = Response(status=304)
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = Response(encoded['gzip'], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(encoded['body'], mimetype='application/json')
+    
+    response.set_etag(encoded['etag'])
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate, 304 is cheap
+    return response
+
+@endpoint('architecture', '/api/architecture/<project_name>/graph', methods=['GET'])
+def architecture_graph(project_name):
+    """Whole dependency graph in the compact typed-array format"""
+    from backend.architecture_mapper import ArchitectureMapper
+    
+    def build(brain_file):
+        layout_file = os.path.join(os.path.dirname(brain_file), 'layout.json')
+        mapper = ArchitectureMapper(layout_file=layout_file)
+        payload = mapper.build_architecture_graph(project_manager.load_brain(project_name))
+        return encoded_json(payload, payload['brain_version'])
+    
+    try:
+        encoded = project_manager.cached(project_name, 'graph', build)
+    except FileNotFoundError:
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+    
+    return cached_json_response(encoded)
+
+@endpoint('architecture', '/api/architecture/<project_name>/metrics', methods=['GET'])
+def architecture_metrics(project_name):
+    """Fan-in/out, import cycles, PageRank and layers computed after analysis"""
+    from backend.architecture_mapper import ArchitectureMapper
+    
+    def build(brain_file):
+        mapper = ArchitectureMapper()
+        mapper.build_dependency_graph(project_manager.load_brain(project_name))
+        return mapper.compute_metrics(os.path.join(os.path.dirname(brain_file), 'graph_metrics.json'))
+    
+    try:
+        return jsonify(project_manager.cached(project_name, 'metrics', build))
+    except FileNotFoundError:
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+
+@endpoint('architecture', '/api/architecture/<project_name>/calls', methods=['GET'])
+def architecture_calls(project_name):
+    """Callers and callees of ?symbol=<id or bare function name>"""
+    from backend.architecture_mapper import ArchitectureMapper
+    
+    def build(brain_file):
+        mapper = ArchitectureMapper()
+        mapper.build_call_graph(
+            project_manager.load_brain(project_name),
+            os.path.join(os.path.dirname(brain_file), 'call_graph.json')
+        )
+        return mapper
+    
+    try:
+        mapper = project_manager.cached(project_name, 'calls', build)
+    except FileNotFoundError:
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+    
+    symbol = request.args.get('symbol', '')
+    return jsonify({
+        'symbol': symbol,
+        'callers': mapper.callers(symbol),
+        'callees': mapper.callees(symbol)
     })
 
+def parse_cache_stats(field):
+    """Parse cache numbers for /metrics - nothing until the cache is first used"""
+    def read():
+        return {(): _parse_cache.stats()[field]} if _parse_cache is not None else {}
+    return read
+
+REGISTRY.gauge('codecraft_parse_cache_hits_total', 'Parse cache hits', [], parse_cache_stats('hits'), kind='counter')
+REGISTRY.gauge('codecraft_parse_cache_misses_total', 'Parse cache misses', [], parse_cache_stats('misses'), kind='counter')
+REGISTRY.gauge('codecraft_parse_cache_hit_ratio', 'Parse cache hits / lookups', [], parse_cache_stats('hit_rate'))
+REGISTRY.gauge('codecraft_parse_cache_bytes', 'Parse cache size on disk', [], parse_cache_stats('bytes'))
+
+def get_symbol_index(project_name):
+    """The project's SymbolIndex: the one saved at crawl time, rebuilt if stale"""
+    from backend.brain_cache import load_cached, save_cached
+    from backend.symbol_index import SymbolIndex
+    
+    def build(brain_file):
+        project_map = project_manager.load_brain(project_name)
+        index_file = os.path.join(os.path.dirname(brain_file), 'symbol_index.json')
+        data = load_cached(index_file, project_map.version)
+        if data is not None:
+            return SymbolIndex.from_data(data)
+        index = SymbolIndex.from_project_map(project_map)
+        save_cached(index_file, project_map.version, index.to_data())
+        return index
+    
+    return project_manager.cached(project_name, 'symbol_index', build)
+
+@endpoint('search', '/api/search', methods=['GET'])
+def search_symbols():
+    """Autocomplete: ?project=<name>&q=<partial name>[&kind=class,method,function,file][&limit=20]"""
+    project_name = request.args.get('project', '')
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    kinds = [kind for kind in request.args.get('kind', '').split(',') if kind] or None
+    
+    try:
+        index = get_symbol_index(project_name)
+    except FileNotFoundError:
+        return jsonify({'error': f'Project {project_name} has not been analyzed'}), 404
+    
+    started = time.perf_counter()
+    results = index.search(query, limit=limit, kinds=kinds)
+    return jsonify({
+        'project': project_name,
+        'query': query,
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
+@endpoint('history', '/api/projects/<project_name>/versions', methods=['GET'])
+def list_versions(project_name):
+    """Recorded brain versions, oldest first, with per-version change counts"""
+    return jsonify({'project': project_name, 'versions': project_manager.history(project_name).versions()})
+
+@endpoint('history', '/api/projects/<project_name>/versions/<int:version_id>', methods=['GET'])
+def get_version(project_name, version_id):
+    """The whole brain as it was in a version, or one file of it with ?file=<path>"""
+    history = project_manager.history(project_name)
+    entry = history.get(version_id)
+    if entry is None:
+        return jsonify({'error': f'Project {project_name} has no version {version_id}'}), 404
+    
+    file_path = request.args.get('file')
+    if file_path:
+        file_info = history.files_at(version_id, [file_path])[file_path]
+        if file_info is None:
+            return jsonify({'error': f'{file_path} is not in version {version_id}'}), 404
+        return jsonify({'version': entry, 'file': file_path, 'info': file_info})
+    
+    # A version never changes, so its content hash is a permanent ETag
+    etag = f"brain-{entry['version']}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    with span('reconstruct_version'):
+        brain = history.reconstruct(version_id)
+    return cached_json_response(encoded_json({'version': entry, 'brain': brain}, etag))
+
+@endpoint('history', '/api/projects/<project_name>/diff', methods=['GET'])
+def diff_versions(project_name):
+    """Structural changes between ?from=<id>&to=<id> (default: the latest version vs the one before)"""
+    history = project_manager.history(project_name)
+    versions = history.versions()
+    if not versions:
+        return jsonify({'error': f'Project {project_name} has no recorded versions'}), 404
+    
+    to_id = request.args.get('to', versions[-1]['id'], type=int)
+    from_id = request.args.get('from', type=int)
+    if from_id is None:
+        # The entry before `to` (ids have gaps once old versions are pruned)
+        ids = [entry['id'] for entry in versions]
+        if to_id not in ids:
+            return jsonify({'error': f'Project {project_name} has no version {to_id}'}), 404
+        position = ids.index(to_id)
+        if position == 0:
+            return jsonify({
+                'from': None,
+                'to': versions[0],
+                'files': {'added': [], 'removed': [], 'changed': {}},
+                'summary': {'added': 0, 'removed': 0, 'changed': 0}
+            })
+        from_id = ids[position - 1]
+    try:
+        with span('diff_versions'):
+            return jsonify(history.diff(from_id, to_id))
+    except KeyError as e:
+        return jsonify({'error': f'Project {project_name} has no version {e.args[0]}'}), 404
+
+@endpoint('history', '/api/projects/<project_name>/versions/<int:version_id>/restore', methods=['POST'])
+def restore_version(project_name, version_id):
+    """Roll the brain back to a version; the restore is itself recorded as the newest version"""
+    history = project_manager.history(project_name)
+    if history.get(version_id) is None:
+        return jsonify({'error': f'Project {project_name} has no version {version_id}'}), 404
+    
+    cancel_background_crawl(project_name)  # it would overwrite the restored brain
+    project_map = history.reconstruct(version_id)
+    with project_manager.save_lock(project_name):
+        stats = save_project_index(project_name, project_map)
+        # The brain no longer matches a commit, so the next git re-analysis does a full crawl
+        project_manager.save_meta(project_name, analyzed_at=time.time(), status='complete',
+                                  files_pending=0, commit=None, restored_from=version_id, **stats)
+    start_prefetch(project_name)
+    return jsonify({
+        'status': 'success',
+        'message': f'Project {project_name} restored to version {version_id}',
+        'version': history.versions()[-1]
+    })
+
+@endpoint('metrics', '/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of request, stage and cache metrics"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@endpoint('profiling', '/api/profiles', methods=['GET'])
+def list_profiles():
+    """Recent profile captures, newest first, with top functions / allocation sites"""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify(get_request_profiler().list_captures(limit))
+
+if os.environ.get('CODECRAFT_PRELOAD') == '1':
+    preload_endpoint_modules()
+
 if __name__ == '__main__':
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':  # the reloader's serving child
+        start_background_maintenance()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -1,26 +1,131 @@
 import json
+import re
 import subprocess
 import os
-import requests
+import time
+
+from backend.brain_cache import brain_version, load_cached, read_cache_file
+from backend.call_graph import CallGraph
+from backend.compact_brain import CompactBrain
+from backend.llm_queue import INTERACTIVE
+from backend.metrics import span
+from backend.question_prefetch import PREFETCH_FILE, load_prefetched, normalize_question
+from backend.question_router import INDEX, LARGE, PREFETCHED, SMALL
+from backend.sharded_brain import INDEX_FILE, ShardedBrain
+
+# Up to this many relevance points go to the most central file (by PageRank)
+CENTRALITY_BOOST = 5
+DEFAULT_MODEL = "codellama:7b"
+
+class BrainContext:
+    """What AIHelper derives from one brain version besides the brain itself
+    
+    Graph metrics with their top PageRank, the call graph (read from the
+    files the analyzer stored next to the brain) and the names the brain
+    defines. Building it reads and parses those files and walks the whole
+    brain, so the server builds one per brain and shares it between
+    questions.
+    """
+    
+    def __init__(self, brain_dir, project_map):
+        self.brain_dir = brain_dir
+        self.version = brain_version(project_map) if project_map else None
+        self.graph_metrics = self.load_graph_metrics()
+        files = self.graph_metrics.get('files', {})
+        self.top_rank = max((metrics['pagerank'] for metrics in files.values()), default=0) or 1
+        self.call_graph = self.load_call_graph()
+        self.defined = set()
+        if self.call_graph:  # only call-graph lookups need it
+            for info in project_map.values():
+                self.defined.update(info.get('functions', {}))
+                self.defined.update(info.get('classes', {}))
+    
+    def load_graph_metrics(self):
+        """Structural metrics stored next to the brain by the analyzer (optional)"""
+        cached = read_cache_file(os.path.join(self.brain_dir, 'graph_metrics.json'))
+        
+        # Ignore metrics computed for an older version of the brain
+        if not cached or cached['version'] != self.version:
+            return {}
+        return cached['data']
+    
+    def load_call_graph(self):
+        """Resolved call sites stored next to the brain by the analyzer (optional)"""
+        calls_file = os.path.join(self.brain_dir, 'call_graph.json')
+        edges = load_cached(calls_file, self.version) if self.version else None
+        return CallGraph(edges) if edges is not None else None
 
 class AIHelper:
-    def __init__(self, project_brain_file='project_brain.json'):
+    def __init__(self, project_brain_file='project_brain.json', project_map=None, llm_queue=None, router=None,
+                 brain_context=None, prefetched=None):
         self.project_brain_file = project_brain_file
-        self.project_map = self.load_project_map()
+        # An already loaded (e.g. cached CompactBrain) brain skips the disk read
+        self.project_map = project_map if project_map is not None else self.load_project_map()
+        self.brain_version = brain_version(self.project_map) if self.project_map else None
+        # Likewise a BrainContext cached for this brain
+        if brain_context is None or brain_context.version != self.brain_version:
+            brain_context = BrainContext(os.path.dirname(self.project_brain_file), self.project_map)
+        self.brain_context = brain_context
+        self.graph_metrics = brain_context.graph_metrics
+        self.call_graph = brain_context.call_graph
+        self.prefetched = prefetched if prefetched is not None else self.load_prefetched()
+        self.llm_queue = llm_queue  # LLMQueue shared by the process, None = call Ollama directly
+        self.router = router  # QuestionRouter, None = every question to DEFAULT_MODEL
         self.ollama_url = "http://localhost:11434/api/generate"
     
+    @span('load_project_map')
     def load_project_map(self):
-        """Load the project brain we built"""
+        """Load the project brain we built (brain_index.json of a sharded brain, or a JSON brain)"""
         try:
+            if os.path.basename(self.project_brain_file) == INDEX_FILE:
+                with ShardedBrain(os.path.dirname(self.project_brain_file)) as brain:
+                    return CompactBrain.from_dict(brain)
             with open(self.project_brain_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return CompactBrain.from_dict(json.load(f))
         except FileNotFoundError:
             print("❌ Project brain not found! Run the crawler first.")
             return {}
     
+    def load_prefetched(self):
+        """Contexts / answers the post-analysis prefetch stored for likely questions (optional)"""
+        prefetch_file = os.path.join(os.path.dirname(self.project_brain_file), PREFETCH_FILE)
+        return load_prefetched(prefetch_file, self.brain_version)
+    
+    def get_call_context(self, question):
+        """Callers/callees of any project function the question mentions"""
+        if not self.call_graph:
+            return []
+        
+        context_parts = []
+        for name in dict.fromkeys(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', question)):
+            if name not in self.brain_context.defined:
+                continue
+            callers = self.call_graph.callers_of(name)[:10]
+            callees = [call for call in self.call_graph.callees_of(name) if call['resolved']][:10]
+            if not callers and not callees:
+                continue
+            
+            context_parts.append(f"\n--- Call graph: {name} ---")
+            if callers:
+                context_parts.append("Called by: " + ", ".join(f"{call['caller']} (line {call['line']})" for call in callers))
+            if callees:
+                context_parts.append("Calls: " + ", ".join(call['callee'] for call in callees))
+        
+        return context_parts
+    
+    def centrality_boost(self, file_path):
+        """0..CENTRALITY_BOOST points for files many others depend on"""
+        files = self.graph_metrics.get('files', {})
+        if not files or file_path not in files:
+            return 0
+        
+        return round(CENTRALITY_BOOST * files[file_path]['pagerank'] / self.brain_context.top_rank)
+    
+    @span('get_intelligent_context')
     def get_intelligent_context(self, question):
         """SMART: Only send relevant code based on the question"""
         context_parts = []
+        scored_files = []
         
         # Analyze question to determine what's relevant
         question_lower = question.lower()
@@ -47,18 +152,36 @@ class AIHelper:
                 if 'Flask' in str(info.get('imports', [])):
                     file_relevance_score += 5
             
-            # Only include relevant files
+            # Only include relevant files - central ones first
             if file_relevance_score > 0:
-                context_parts.append(f"\n--- {file_path} (relevance: {file_relevance_score}) ---")
-                
-                if info.get('classes'):
-                    context_parts.append(f"Classes: {list(info['classes'].keys())}")
-                if info.get('functions'):
-                    context_parts.append(f"Functions: {list(info['functions'].keys())}")
+                file_relevance_score += self.centrality_boost(file_path)
+                scored_files.append((file_relevance_score, file_path, info))
+        
+        # Nothing matched: the most central files are the best overview
+        if not scored_files:
+            for file_path in self.graph_metrics.get('central_files', [])[:3]:
+                if file_path in self.project_map:
+                    scored_files.append((self.centrality_boost(file_path), file_path, self.project_map[file_path]))
+        
+        scored_files.sort(key=lambda item: item[0], reverse=True)
+        for file_relevance_score, file_path, info in scored_files:
+            context_parts.append(f"\n--- {file_path} (relevance: {file_relevance_score}) ---")
+            
+            if info.get('classes'):
+                context_parts.append(f"Classes: {list(info['classes'].keys())}")
+            if info.get('functions'):
+                context_parts.append(f"Functions: {list(info['functions'].keys())}")
+            if info.get('globals'):
+                context_parts.append(f"Globals: {list(info['globals'].keys())}")
+            if info.get('defines'):
+                context_parts.append(f"Defines: {list(info['defines'].keys())}")
+        
+        context_parts.extend(self.get_call_context(question))
         
         return "\n".join(context_parts) if context_parts else "No specific context found for this question."
     
-    def ask_ollama(self, question, context):
+    @span('ask_ollama')
+    def ask_ollama(self, question, context, priority=INTERACTIVE, model=None):
         """ACTUAL OLLAMA INTEGRATION - THIS IS WHERE THE MAGIC HAPPENS"""
         prompt = f"""You are CodeCraft Context, an expert AI assistant for understanding codebases.
 
@@ -75,15 +198,21 @@ IMPORTANT INSTRUCTIONS:
 
 ANSWER:"""
         
+        import requests  # only needed once we actually talk to Ollama
+        
         try:
             # OLLAMA API CALL
             payload = {
-                "model": "codellama:7b",
+                "model": model or (self.router.large_model if self.router else DEFAULT_MODEL),
                 "prompt": prompt,
                 "stream": False
             }
             
-            response = requests.post(self.ollama_url, json=payload, timeout=30)
+            if self.llm_queue is not None:
+                with self.llm_queue.slot(priority):
+                    response = requests.post(self.ollama_url, json=payload, timeout=30)
+            else:
+                response = requests.post(self.ollama_url, json=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -98,16 +227,44 @@ ANSWER:"""
     
     def ask_question(self, question):
         """Main function to ask questions about the project"""
+        return self.ask_routed(question)['answer']
+    
+    def ask_routed(self, question):
+        """Answer via the cheapest route that fits: {'answer', 'route', 'model'}"""
         if not self.project_map:
-            return "❌ No project brain found. Please analyze a project first!"
+            return {'answer': "❌ No project brain found. Please analyze a project first!", 'route': None, 'model': None}
+        
+        started = time.perf_counter()
+        result = self._answer(question)
+        if self.router:
+            self.router.stats.observe(result['route'], time.perf_counter() - started)
+        return result
+    
+    def _answer(self, question):
+        prefetched = self.prefetched.get(normalize_question(question), {})
+        if 'answer' in prefetched:
+            print(f"⚡ Prefetched answer: '{question}'")
+            return {'answer': prefetched['answer'], 'route': PREFETCHED, 'model': None}
+        
+        if self.router:
+            answer = self.router.answer_lookup(question, self.project_map, self.call_graph)
+            if answer is not None:
+                print(f"📇 Answered from the index: '{question}'")
+                return {'answer': answer, 'route': INDEX, 'model': None}
         
         print(f"🔍 Analyzing: '{question}'")
-        context = self.get_intelligent_context(question)
+        context = prefetched.get('context') or self.get_intelligent_context(question)
         
-        print("🤖 Consulting AI brain...")
-        answer = self.ask_ollama(question, context)
+        route = self.router.model_for(question, context) if self.router else LARGE
+        model = self.router.model_name(route) if self.router else DEFAULT_MODEL
+        print(f"🤖 Consulting AI brain ({model})...")
+        answer = self.ask_ollama(question, context, model=model)
+        if route == SMALL and answer.startswith("❌ Ollama error: 404"):
+            # Small model not pulled: the large one still answers
+            route, model = LARGE, self.router.large_model
+            answer = self.ask_ollama(question, context, model=model)
         
-        return answer
+        return {'answer': answer, 'route': route, 'model': model}
 
 # TEST WITH REAL OLLAMA
 def test_real_ai():
@@ -0,0 +1,143 @@
+from typing import Dict, Iterable, List, Optional
+
+from backend.module_index import ModuleIndex, to_posix
+
+ROOT = ''
+PACKAGE_PREFIX = 'pkg:'
+
+
+class ArchitectureHierarchy:
+    """Package -> file -> class -> method tree with import edges lifted on demand
+
+    Instead of one node per symbol, clients start from a collapsed view of
+    the top-level packages and expand one node at a time. Import edges are
+    stored once at file level and aggregated (with weights) up to whatever
+    nodes are currently visible, so a response only grows with what the
+    user is looking at.
+    """
+
+    def __init__(self, project_map: Dict, module_index: Optional[ModuleIndex] = None):
+        self.nodes = {ROOT: {'id': ROOT, 'label': '/', 'type': 'root', 'parent': None}}
+        self.children = {ROOT: []}
+        self.subtree_files = {ROOT: []}
+
+        for file_path, file_info in project_map.items():
+            self._add_file(file_path, file_info)
+
+        # File-level import edges, indexed both ways for quick expansion
+        module_index = module_index or ModuleIndex(project_map)
+        self.out_edges, self.in_edges = {}, {}
+        for file_path, file_info in project_map.items():
+            for imp in file_info.get('imports', []):
+                target = module_index.resolve(imp, file_path)
+                if target and target != file_path and target in self.nodes:
+                    self.out_edges.setdefault(file_path, set()).add(target)
+                    self.in_edges.setdefault(target, set()).add(file_path)
+
+    def _add_node(self, node_id, label, node_type, parent):
+        self.nodes[node_id] = {'id': node_id, 'label': label, 'type': node_type, 'parent': parent}
+        self.children.setdefault(parent, []).append(node_id)
+
+    def _add_file(self, file_path, file_info):
+        parts = to_posix(file_path).split('/')
+
+        # Package chain
+        parent = ROOT
+        self.subtree_files[ROOT].append(file_path)
+        for depth in range(len(parts) - 1):
+            package_id = PACKAGE_PREFIX + '/'.join(parts[:depth + 1])
+            if package_id not in self.nodes:
+                self._add_node(package_id, parts[depth], 'package', parent)
+                self.subtree_files[package_id] = []
+            self.subtree_files[package_id].append(file_path)
+            parent = package_id
+
+        self._add_node(file_path, parts[-1], 'file', parent)
+        self.subtree_files[file_path] = [file_path]
+
+        methods = set()
+        for class_name, class_methods in file_info.get('classes', {}).items():
+            class_node = f"{file_path}::{class_name}"
+            self._add_node(class_node, class_name, 'class', file_path)
+            for method in class_methods:
+                self._add_node(f"{class_node}.{method}", method, 'method', class_node)
+            methods.update(class_methods)
+
+        # The crawler lists methods under 'functions' too - only show free functions here
+        for func_name in file_info.get('functions', {}):
+            if func_name not in methods:
+                self._add_node(f"{file_path}::{func_name}", func_name, 'function', file_path)
+
+    def _describe(self, node_id):
+        node = self.nodes[node_id]
+        return {
+            'id': node_id,
+            'label': node['label'],
+            'type': node['type'],
+            'parent': node['parent'],
+            'child_count': len(self.children.get(node_id, [])),
+            'file_count': len(self.subtree_files.get(node_id, []))
+        }
+
+    def _visible_ancestor(self, file_path, visible):
+        """The deepest visible node containing a file (files are their own ancestor)"""
+        node = file_path
+        while node is not None:
+            if node in visible:
+                return node
+            node = self.nodes[node]['parent']
+        return None
+
+    def _lift_edges(self, files: List[str], visible) -> List[Dict]:
+        """Aggregate the imports touching `files` onto visible nodes (weight = import count)"""
+        inside = set(files)
+        weights = {}
+
+        def add(source, target):
+            if source and target and source != target:
+                weights[(source, target)] = weights.get((source, target), 0) + 1
+
+        for file_path in files:
+            source = self._visible_ancestor(file_path, visible)
+            for target_file in self.out_edges.get(file_path, ()):
+                add(source, self._visible_ancestor(target_file, visible))
+            # Imports coming from inside were already counted from their source
+            for source_file in self.in_edges.get(file_path, ()):
+                if source_file not in inside:
+                    add(self._visible_ancestor(source_file, visible), source)
+
+        return [
+            {'source': source, 'target': target, 'weight': weight}
+            for (source, target), weight in weights.items()
+        ]
+
+    def collapsed_view(self) -> Dict:
+        """Top-level packages/files; single-package roots are opened automatically"""
+        top = self.children.get(ROOT, [])
+        while len(top) == 1 and self.nodes[top[0]]['type'] == 'package':
+            top = self.children.get(top[0], [])
+
+        visible = set(top)
+        files = self.subtree_files[ROOT]
+        return {
+            'nodes': [self._describe(node_id) for node_id in top],
+            'edges': self._lift_edges(files, visible)
+        }
+
+    def expand(self, node_id: str, visible: Iterable[str] = ()) -> Dict:
+        """Children of one node plus their edges to the other visible nodes"""
+        if node_id not in self.nodes:
+            raise KeyError(node_id)
+
+        kids = self.children.get(node_id, [])
+        visible = (set(visible) - {node_id}) | set(kids)
+
+        # Anything without a visible ancestor is shown at top level
+        visible |= set(self.children.get(ROOT, []))
+        visible.discard(node_id)
+
+        return {
+            'node': self._describe(node_id),
+            'nodes': [self._describe(kid) for kid in kids],
+            'edges': self._lift_edges(self.subtree_files.get(node_id, []), visible)
+        }
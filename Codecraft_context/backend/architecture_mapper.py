@@ -1,15 +1,55 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
+import base64
+import sys
+from array import array
 from typing import Dict, List
 
+from backend.architecture_hierarchy import ArchitectureHierarchy
+from backend.brain_cache import brain_version, load_cached, read_cache_file, save_cached
+from backend.call_graph import CallGraph
+from backend.graph_analytics import compute_graph_metrics
+from backend.graph_layout import GraphLayout
+from backend.module_index import ModuleIndex
+
+NODE_TYPES = ['file', 'class', 'method']
+
+def _typed_array_b64(values: array) -> str:
+    """array('f'/'I') -> base64 of its little-endian bytes (JS typed array layout)"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
 class ArchitectureMapper:
-    def __init__(self):
-        self.dependency_graph = nx.DiGraph()
+    def __init__(self, layout_file=None, layout_seed=42):
+        self._dependency_graph = None
+        self.module_index = None
+        self.hierarchy = None
+        self.call_graph = None
+        self.brain_version = None
+        
+        # Layouts are persisted per brain version so repeat views are instant
+        # and stable, and a re-crawl only has to place the new nodes
+        self.layout_file = layout_file
+        self.layout_engine = GraphLayout(seed=layout_seed)
+    
+    @property
+    def dependency_graph(self):
+        """Create the graph on first use so importing the mapper stays cheap"""
+        if self._dependency_graph is None:
+            import networkx as nx
+            self._dependency_graph = nx.DiGraph()
+        return self._dependency_graph
     
     def build_architecture_graph(self, project_map: Dict):
         """HARD: Build interactive dependency graph"""
+        self.build_dependency_graph(project_map)
+        
+        return self._generate_visualization()
+    
+    def build_dependency_graph(self, project_map: Dict):
+        """Files, classes and methods plus the import edges between files"""
         self.dependency_graph.clear()
+        self.brain_version = brain_version(project_map)
         
         # Add nodes (files, classes, functions)
         for file_path, file_info in project_map.items():
@@ -18,7 +58,50 @@ class ArchitectureMapper:
         # Build dependencies
         self._build_dependencies(project_map)
         
-        return self._generate_visualization()
+        return self.dependency_graph
+    
+    def build_call_graph(self, project_map: Dict, cache_file=None) -> CallGraph:
+        """Resolved call sites (caller -> callee), cached per brain version"""
+        version = self.brain_version or brain_version(project_map)
+        edges = load_cached(cache_file, version) if cache_file else None
+        
+        if edges is None:
+            self.module_index = self.module_index or ModuleIndex(project_map)
+            self.call_graph = CallGraph.from_project_map(project_map, self.module_index)
+            if cache_file:
+                save_cached(cache_file, version, self.call_graph.edges)
+        else:
+            self.call_graph = CallGraph(edges)
+        
+        return self.call_graph
+    
+    def callers(self, name: str) -> List[Dict]:
+        """Who calls `name` (a symbol id like 'file::Class.method' or a bare name)"""
+        return self.call_graph.callers_of(name) if self.call_graph else []
+    
+    def callees(self, name: str) -> List[Dict]:
+        """What `name` calls"""
+        return self.call_graph.callees_of(name) if self.call_graph else []
+    
+    def compute_metrics(self, cache_file=None) -> Dict:
+        """Structural metrics for the current graph, cached per brain version"""
+        if cache_file:
+            cached = load_cached(cache_file, self.brain_version)
+            if cached is not None:
+                return cached
+        
+        metrics = compute_graph_metrics(self.dependency_graph)
+        
+        if cache_file:
+            save_cached(cache_file, self.brain_version, metrics)
+        
+        return metrics
+    
+    def build_hierarchy(self, project_map: Dict) -> ArchitectureHierarchy:
+        """Level-of-detail model: collapsed packages first, children on demand"""
+        self.module_index = ModuleIndex(project_map)
+        self.hierarchy = ArchitectureHierarchy(project_map, self.module_index)
+        return self.hierarchy
     
     def _add_file_to_graph(self, file_path, file_info):
         """HARD: Add hierarchical code structure to graph"""
@@ -39,56 +122,92 @@ class ArchitectureMapper:
     
     def _build_dependencies(self, project_map):
         """HARD: Build call relationships between components"""
-        # This is where it gets REALLY complex
-        # We need to analyze imports and function calls
+        # Index module names once, then every import is a dictionary lookup
+        self.module_index = ModuleIndex(project_map)
         
         for file_path, file_info in project_map.items():
             imports = file_info.get('imports', [])
             
             for imp in imports:
                 # Find which local file this import corresponds to
-                target_file = self._resolve_import(imp, project_map)
-                if target_file and target_file in self.dependency_graph:
+                target_file = self._resolve_import(imp, file_path)
+                if target_file and target_file != file_path and target_file in self.dependency_graph:
                     self.dependency_graph.add_edge(file_path, target_file)
     
+    def _resolve_import(self, import_name, importer):
+        """Map an import string from the brain to a local file (None if external)"""
+        return self.module_index.resolve(import_name, importer)
+    
+    def compute_layout(self):
+        """Node positions for the current graph (cached / warm-started)"""
+        cached = read_cache_file(self.layout_file) if self.layout_file else None
+        previous = cached['data'] if cached else None
+        
+        if cached and cached['version'] == self.brain_version:
+            return {node: tuple(position) for node, position in previous.items()}
+        
+        pos = self.layout_engine.compute(self.dependency_graph, previous)
+        
+        if self.layout_file:
+            save_cached(self.layout_file, self.brain_version, {
+                node: [round(c, 4) for c in position] for node, position in pos.items()
+            })
+        
+        return pos
+    
     def _generate_visualization(self):
-        """HARD: Create interactive 3D force-directed graph"""
-        # Use plotly for beautiful 3D visualization
-        pos = nx.spring_layout(self.dependency_graph, dim=3)
-        
-        # Extract node positions
-        node_x, node_y, node_z, node_text = [], [], [], []
-        for node, (x, y, z) in pos.items():
-            node_x.append(x)
-            node_y.append(y)
-            node_z.append(z)
-            node_text.append(node)
-        
-        # Create 3D scatter plot
-        node_trace = go.Scatter3d(
-            x=node_x, y=node_y, z=node_z,
-            mode='markers+text',
-            marker=dict(size=10, color='lightblue'),
-            text=node_text,
-            textposition="middle center"
-        )
-        
-        # Add edges
-        edge_x, edge_y, edge_z = [], [], []
-        for edge in self.dependency_graph.edges():
-            x0, y0, z0 = pos[edge[0]]
-            x1, y1, z1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-            edge_z.extend([z0, z1, None])
-        
-        edge_trace = go.Scatter3d(
-            x=edge_x, y=edge_y, z=edge_z,
-            mode='lines',
-            line=dict(width=2, color='gray')
-        )
-        
-        fig = go.Figure(data=[edge_trace, node_trace])
-        fig.update_layout(title='Code Architecture 3D Visualization')
-        
-        return fig.to_html()
\ No newline at end of file
+        """Compact graph payload - the browser renders it (see frontend/app.js)"""
+        return self.export_compact()
+    
+    def export_compact(self) -> Dict:
+        """Graph as integer ids + typed arrays instead of a plotly HTML page
+        
+        - strings: label table (method names like __init__ appear once)
+        - labels / parents / types: one entry per node id (parent -1 = none)
+        - positions: base64 little-endian Float32Array, x,y,z per node
+        - edges: base64 Uint32Array of (source, target) import pairs;
+          containment (file -> class -> method) is implied by `parents`
+        """
+        graph = self.dependency_graph
+        pos = self.compute_layout()
+        
+        ids = {node: i for i, node in enumerate(graph.nodes)}
+        strings, string_ids = [], {}
+        labels, parents, types = [], [], []
+        positions = array('f')
+        
+        for node, attrs in graph.nodes(data=True):
+            node_type = attrs.get('type', 'file')
+            if node_type == 'class':
+                parent, label = node.split('::', 1)
+            elif node_type == 'method':
+                parent, label = node.rsplit('.', 1)
+            else:
+                parent, label = None, node
+            
+            if label not in string_ids:
+                string_ids[label] = len(strings)
+                strings.append(label)
+            labels.append(string_ids[label])
+            parents.append(ids.get(parent, -1))
+            types.append(NODE_TYPES.index(node_type) if node_type in NODE_TYPES else 0)
+            positions.extend(pos.get(node, (0.0, 0.0, 0.0)))
+        
+        edges = array('I')
+        for source, target in graph.edges():
+            if parents[ids[target]] != ids[source]:
+                edges.extend((ids[source], ids[target]))
+        
+        return {
+            'format': 'codecraft-graph/1',
+            'brain_version': self.brain_version,
+            'node_count': len(ids),
+            'edge_count': len(edges) // 2,
+            'node_types': NODE_TYPES,
+            'strings': strings,
+            'labels': labels,
+            'parents': parents,
+            'types': types,
+            'positions': _typed_array_b64(positions),
+            'edges': _typed_array_b64(edges)
+        }
@@ -1,6 +1,133 @@
 import ast
+import bisect
+import difflib
+import io
+import re
 import tokenize
-from io import StringIO
+from collections import namedtuple
+from typing import Dict, List
+
+# A single text change against the ORIGINAL source: replace code[start:end] with text
+TextEdit = namedtuple('TextEdit', ['start', 'end', 'text'])
+
+WHILE_TRUE = re.compile(r'while\s*\(?\s*(True|1)\s*\)?\s*:')
+
+
+class PositionMap:
+    """Maps (line, column) to offsets and lines to AST statements - built once per file"""
+    
+    def __init__(self, code: str):
+        self.code = code
+        self.lines = code.split('\n')
+        
+        # Offset of the first character of every line
+        self.line_starts = [0]
+        for line in self.lines[:-1]:
+            self.line_starts.append(self.line_starts[-1] + len(line) + 1)
+        
+        self._statements = None
+        self._starts = []  # sorted first lines of the statements, for bisect
+        self._parents = {}  # statement -> the statement around it (None at module level)
+        self._tree = None
+        self._functions = []
+        self._string_lines = None
+    
+    def offset(self, line: int, column: int = 0) -> int:
+        """1-based line + 0-based column -> offset into the code"""
+        if line > len(self.lines):
+            return len(self.code)
+        return self.line_starts[line - 1] + column
+    
+    def line_text(self, line: int) -> str:
+        return self.lines[line - 1] if 0 < line <= len(self.lines) else ''
+    
+    def indent_of(self, line: int) -> str:
+        text = self.line_text(line)
+        return text[:len(text) - len(text.lstrip())]
+    
+    def statement_at(self, line: int):
+        """(statement, enclosing body list) for the statement starting on a line"""
+        if self._statements is None:
+            self._statements = {}
+            try:
+                tree = ast.parse(self.code)
+            except SyntaxError:
+                return None, None
+            
+            self._tree = tree
+            
+            # One walk over the tree: remember every statement and the body it lives in
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    self._functions.append(node)
+                parent = node if isinstance(node, ast.stmt) else self._parents.get(node)
+                for field in ('body', 'orelse', 'finalbody'):
+                    body = getattr(node, field, None)
+                    if isinstance(body, list):
+                        for stmt in body:
+                            if isinstance(stmt, ast.stmt):
+                                self._statements.setdefault(stmt.lineno, (stmt, body))
+                                self._parents[stmt] = parent
+                for handler in getattr(node, 'handlers', []):
+                    self._parents[handler] = node  # its body's statements belong to the try
+                    for stmt in handler.body:
+                        self._statements.setdefault(stmt.lineno, (stmt, handler.body))
+                for case in getattr(node, 'cases', []):
+                    self._parents[case] = node
+            self._starts = sorted(self._statements)
+        
+        return self._statements.get(line, (None, None))
+    
+    def reads_after(self, name: str, line: int) -> bool:
+        """Is `name` read after a line anywhere in the function (or module) around it?"""
+        self.statement_at(line)
+        if self._tree is None:
+            return True  # can't tell, so assume it is
+        
+        scope = max((function for function in self._functions
+                     if function.lineno <= line <= function.end_lineno),
+                    key=lambda function: function.lineno, default=self._tree)
+        return any(isinstance(node, ast.Name) and node.id == name and isinstance(node.ctx, ast.Load)
+                   and node.lineno > line for node in ast.walk(scope))
+    
+    def enclosing_statement(self, line: int):
+        """Innermost statement whose source spans a line
+        
+        The last statement starting at or before the line either spans it or
+        sits inside the one that does (if any), so only its parents are climbed.
+        """
+        self.statement_at(line)
+        i = bisect.bisect_right(self._starts, line) - 1
+        stmt = self._statements[self._starts[i]][0] if i >= 0 else None
+        while stmt is not None and (stmt.end_lineno or stmt.lineno) < line:
+            stmt = self._parents.get(stmt)
+        return stmt
+    
+    def string_lines(self):
+        """(lines ending inside a string literal, lines starting inside one) - from the tokens"""
+        if self._string_lines is None:
+            ends, starts = set(), set()
+            fstring_start = getattr(tokenize, 'FSTRING_START', None)  # Python 3.12+
+            fstring_end = getattr(tokenize, 'FSTRING_END', None)
+            opened = []
+            try:
+                for token in tokenize.generate_tokens(io.StringIO(self.code).readline):
+                    if token.type == fstring_start:
+                        opened.append(token.start[0])
+                        continue
+                    if token.type == tokenize.STRING:
+                        first, last = token.start[0], token.end[0]
+                    elif token.type == fstring_end and opened:
+                        first, last = opened.pop(), token.end[0]
+                    else:
+                        continue
+                    ends.update(range(first, last))
+                    starts.update(range(first + 1, last + 1))
+            except (tokenize.TokenError, SyntaxError):
+                pass
+            self._string_lines = (ends, starts)
+        return self._string_lines
+
 
 class AutoFixer:
     def __init__(self):
@@ -8,13 +135,113 @@ class AutoFixer:
     
     def generate_fix(self, issue: Dict, original_code: str) -> str:
         """HARD: Automatically generate code fixes"""
-        fix_strategy = self.fix_strategies.get(issue['type'])
+        result = self.apply_fixes([issue], original_code)
         
-        if fix_strategy:
-            return fix_strategy(issue, original_code)
+        if result['applied']:
+            return result['code']
         
         return None
     
+    def apply_fixes(self, issues: List[Dict], original_code: str, file_path: str = '<code>') -> Dict:
+        """Fix every issue of one file in a single pass
+        
+        Each strategy turns an issue into edits against the original code,
+        overlapping fixes are skipped, the survivors are applied in one linear
+        pass and the result is parsed once to make sure it is still valid Python.
+        """
+        positions = PositionMap(original_code)
+        
+        # 1. Turn issues into groups of edits
+        fixes, skipped, seen = [], [], set()
+        for issue in issues:
+            key = (issue.get('type'), issue.get('line'))
+            if key in seen:
+                skipped.append({'issue': issue, 'reason': 'duplicate issue'})
+                continue
+            seen.add(key)
+            
+            fix_strategy = self.fix_strategies.get(issue.get('type'))
+            if not fix_strategy:
+                skipped.append({'issue': issue, 'reason': 'no fix strategy'})
+                continue
+            if not issue.get('line'):
+                skipped.append({'issue': issue, 'reason': 'issue has no line'})
+                continue
+            
+            edits = fix_strategy(issue, positions)
+            if edits:
+                fixes.append((issue, edits))
+            else:
+                skipped.append({'issue': issue, 'reason': 'nothing to fix at this line'})
+        
+        # 2. Keep only fixes whose edits don't overlap an earlier fix
+        accepted, taken = [], []  # taken = sorted (start, end) ranges already claimed
+        for issue, edits in fixes:
+            if any(self._overlaps(taken, edit) for edit in edits):
+                skipped.append({'issue': issue, 'reason': 'overlaps another fix'})
+                continue
+            for edit in edits:
+                bisect.insort(taken, (edit.start, edit.end))
+            accepted.append((issue, edits))
+        
+        # 3. Apply everything in one pass over the original text
+        all_edits = sorted(
+            (edit for _, edits in accepted for edit in edits),
+            key=lambda edit: (edit.start, edit.end)
+        )
+        pieces, cursor = [], 0
+        for edit in all_edits:
+            pieces.append(original_code[cursor:edit.start])
+            pieces.append(edit.text)
+            cursor = edit.end
+        pieces.append(original_code[cursor:])
+        fixed_code = ''.join(pieces)
+        
+        # 4. Re-parse once to verify
+        error = None
+        try:
+            ast.parse(fixed_code)
+        except SyntaxError as e:
+            error = f'Fixed code does not parse: {e.msg} (line {e.lineno})'
+        
+        diff = ''.join(difflib.unified_diff(
+            original_code.splitlines(keepends=True),
+            fixed_code.splitlines(keepends=True),
+            fromfile=f'a/{file_path}',
+            tofile=f'b/{file_path}'
+        ))
+        
+        return {
+            'file': file_path,
+            'code': fixed_code if error is None else original_code,
+            'diff': diff if error is None else '',
+            'applied': [issue for issue, _ in accepted] if error is None else [],
+            'skipped': skipped,
+            'valid': error is None,
+            'error': error
+        }
+    
+    def _overlaps(self, taken, edit):
+        """Does an edit touch a range another fix already claimed?
+        
+        Accepted ranges never overlap, so only the nearest one before the edit
+        and the ones starting inside it can collide. Insertions may share a
+        boundary with anything.
+        """
+        i = bisect.bisect_left(taken, (edit.start, edit.end))
+        
+        if i > 0:
+            start, end = taken[i - 1]
+            if edit.start < end and start < edit.end:
+                return True
+        
+        while i < len(taken) and taken[i][0] < edit.end:
+            if edit.start < taken[i][1]:
+                return True
+            i += 1
+        
+        return False
+    
     def _load_fix_strategies(self):
         """HARD: Expert system for code fixes"""
         return {
@@ -23,52 +250,103 @@ class AutoFixer:
             'performance_issue': self._fix_performance_issue,
         }
     
-    def _fix_resource_leak(self, issue, code):
-        """HARD: Automatically add resource cleanup"""
-        lines = code.split('\n')
-        line_idx = issue['line'] - 1
+    def _fix_resource_leak(self, issue, positions):
+        """HARD: Automatically add resource cleanup
         
-        if 'open(' in lines[line_idx]:
-            # Find the scope to add close()
-            indent = len(lines[line_idx]) - len(lines[line_idx].lstrip())
-            close_line = ' ' * indent + '# AUTO-FIX: Added resource cleanup'
-            
-            # Insert close statement in appropriate place
-            # This requires complex scope analysis
-            return self._insert_in_scope(lines, line_idx, close_line)
+        `f = open(...)` followed by more statements becomes
+        `f = open(...)` + try: <rest of the block> finally: f.close(), so the
+        file is closed after every use - return values, early returns and
+        exceptions included. A file still read after its block (opened in an
+        if / else, used below it) is left alone.
+        """
+        line = issue['line']
+        if 'open(' not in positions.line_text(line):
+            return []
         
-        return None
+        # Only `name = open(...)` can be closed automatically
+        stmt, body = positions.statement_at(line)
+        if not isinstance(stmt, ast.Assign) or len(stmt.targets) != 1 \
+                or not isinstance(stmt.targets[0], ast.Name):
+            return []
+        
+        name = stmt.targets[0].id
+        indent = positions.indent_of(line)
+        close_line = f"{name}.close()  # AUTO-FIX: Added resource cleanup\n"
+        rest = body[body.index(stmt) + 1:]
+        if positions.reads_after(name, body[-1].end_lineno):
+            return []  # used after this block (e.g. opened in an if/else) - closing here would break that
+        if not rest:
+            return [self._insert_after(positions, stmt.end_lineno, indent + close_line)]
+        
+        if rest[0].lineno == stmt.end_lineno:
+            return []  # `f = open(p); data = f.read()` - no line to wrap
+        for node in (node for statement in rest for node in ast.walk(statement)):
+            if isinstance(node, (ast.Return, ast.Yield)) and isinstance(node.value, ast.Name) \
+                    and node.value.id == name:
+                return []  # the open file is handed out; closing it here would break the caller
+        
+        # One edit for the whole block: other fixes inside it count as overlapping
+        unit = '\t' if '\t' in indent else '    '
+        first, last = rest[0].lineno, rest[-1].end_lineno
+        _, starts_in_string = positions.string_lines()
+        wrapped = [f"{indent}try:"]
+        for block_line in range(first, last + 1):
+            text = positions.line_text(block_line)
+            # Never change the contents of a multi-line string
+            keep = block_line in starts_in_string or not text.strip()
+            wrapped.append(text if keep else unit + text)
+        wrapped.append(f"{indent}finally:\n{indent}{unit}{close_line}")
+        
+        start, end = positions.offset(first), positions.offset(last + 1)
+        if last >= len(positions.lines) and not positions.code.endswith('\n'):
+            wrapped[-1] = wrapped[-1].rstrip('\n')
+        return [TextEdit(start, end, '\n'.join(wrapped))]
     
-    def _fix_infinite_loop(self, issue, code):
+    def _fix_infinite_loop(self, issue, positions):
         """HARD: Add loop termination conditions"""
-        lines = code.split('\n')
-        line_idx = issue['line'] - 1
+        line = issue['line']
+        match = WHILE_TRUE.search(positions.line_text(line))
         
-        if 'while True:' in lines[line_idx]:
-            # Transform: while True: → while should_continue:
-            new_line = lines[line_idx].replace('while True:', 'while should_continue:')
-            lines[line_idx] = new_line
-            
-            # Add termination condition
-            indent = len(lines[line_idx]) - len(lines[line_idx].lstrip())
-            condition_line = ' ' * indent + 'should_continue = True  # AUTO-FIX: Added loop condition'
-            
-            # Insert before loop
-            lines.insert(line_idx, condition_line)
-            
-            return '\n'.join(lines)
+        if not match:
+            return []
         
-        return None
+        # Transform: while True: → while should_continue:
+        start = positions.offset(line, match.start())
+        replace = TextEdit(start, positions.offset(line, match.end()), 'while should_continue:')
+        
+        # Add termination condition, inserted before the loop
+        condition_line = positions.indent_of(line) + 'should_continue = True  # AUTO-FIX: Added loop condition\n'
+        insert = TextEdit(positions.offset(line), positions.offset(line), condition_line)
+        
+        return [insert, replace]
     
-    def _insert_in_scope(self, lines, target_line, new_line):
-        """HARD: Insert code in correct scope (VERY COMPLEX)"""
-        # This requires full parse tree analysis to understand scope
-        # Simplified version:
-        for i in range(target_line, len(lines)):
-            if len(lines[i].strip()) == 0 or lines[i].startswith(' ' * 4):
-                continue
-            # Found end of scope
-            lines.insert(i, new_line)
-            break
+    def _fix_performance_issue(self, issue, positions):
+        """No safe rewrite exists (e.g. SELECT *), so flag the line for review
+        
+        The note goes at the end of the line - or, when that line ends inside
+        a string (a triple-quoted SQL query), on its own line above the
+        statement, so the string itself never changes.
+        """
+        line = issue['line']
+        note = f"# AUTO-FIX: review - {issue.get('message', 'performance issue')}"
+        ends_in_string, _ = positions.string_lines()
+        text = positions.line_text(line)
+        if line not in ends_in_string and not text.rstrip().endswith('\\'):
+            end_of_line = positions.offset(line, len(text))
+            return [TextEdit(end_of_line, end_of_line, f"  {note}")]
+        
+        stmt = positions.enclosing_statement(line)
+        if stmt is None:
+            return []
+        offset = positions.offset(stmt.lineno)
+        return [TextEdit(offset, offset, f"{positions.indent_of(stmt.lineno)}{note}\n")]
+    
+    def _insert_after(self, positions, last_line, new_line):
+        """Insert a line after a given line (handles a last line without newline)"""
+        offset = positions.offset(last_line + 1)
+        
+        # Last line of the file without a trailing newline
+        if last_line >= len(positions.lines) and not positions.code.endswith('\n'):
+            new_line = '\n' + new_line.rstrip('\n')
         
-        return '\n'.join_lines(lines)
\ No newline at end of file
+        return TextEdit(offset, offset, new_line)
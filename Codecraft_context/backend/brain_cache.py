@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+
+def file_digest(file_info: Dict) -> str:
+    """Content hash of one file's entry (key order doesn't matter)"""
+    canonical = json.dumps(file_info, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def combine_digests(digests: Dict[str, str]) -> str:
+    """Brain version from per-file digests - what a streaming writer can compute"""
+    combined = hashlib.sha1()
+    for file_path in sorted(digests):
+        combined.update(f"{file_path}\0{digests[file_path]}\n".encode('utf-8'))
+    return combined.hexdigest()[:16]
+
+
+def brain_version(project_map: Dict) -> str:
+    """Content hash of a brain - changes whenever the crawled structure changes"""
+    if getattr(project_map, 'version', None):
+        return project_map.version  # CompactBrain / ShardedBrain: hashed when written
+    return combine_digests({file_path: file_digest(file_info) for file_path, file_info in project_map.items()})
+
+
+def read_cache_file(path: str) -> Optional[Dict]:
+    """Load a derived-data file stored next to a brain ({'version': ..., 'data': ...})"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if not isinstance(cached, dict) or 'version' not in cached:
+        return None
+    return cached
+
+
+def load_cached(path: str, version: str):
+    """Cached data for exactly this brain version, or None"""
+    cached = read_cache_file(path)
+    if cached and cached['version'] == version:
+        return cached.get('data')
+    return None
+
+
+def save_cached(path: str, version: str, data):
+    """Write derived data atomically so readers never see half a file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'data': data}, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
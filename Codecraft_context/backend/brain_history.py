@@ -0,0 +1,292 @@
+import gzip
+import json
+import os
+import shutil
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from backend.brain_cache import file_digest
+from backend.file_lock import FileLock
+from backend.sharded_brain import ShardedBrain, storage_bytes, write_sharded_brain
+
+# projects/<name>/history/
+#   versions.json            [{id, version, created_at, files, snapshot, ...}], oldest first
+#   head.json                digests of the newest version (what the next delta is taken against)
+#   snapshot-<id>/           full brain of some versions (a sharded brain, seekable per file)
+#   delta-<id>.json.gz       per-file structural changes from version id - 1 to id
+HISTORY_DIR = 'history'
+COMPACT_EVERY = 20  # deltas before the next full snapshot
+KEEP_VERSIONS = 200
+
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _save_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _apply_list(old: List, op: Dict) -> List:
+    removed = Counter(json.dumps(item) for item in op['removed'])
+    kept = []
+    for item in old:
+        key = json.dumps(item)
+        if removed[key]:
+            removed[key] -= 1
+        else:
+            kept.append(item)
+    return kept + op['added']
+
+
+def _list_delta(old: List, new: List) -> Dict:
+    """Added/removed items - or the whole list when order changed in a way that can't replay"""
+    old_counts = Counter(json.dumps(item) for item in old)
+    new_counts = Counter(json.dumps(item) for item in new)
+    op = {
+        'removed': [json.loads(key) for key in (old_counts - new_counts).elements()],
+        'added': [item for item in new if (new_counts - old_counts)[json.dumps(item)]]
+    }
+    return {'list': op} if _apply_list(old, op) == new else {'set': new}
+
+
+def _dict_delta(old: Dict, new: Dict) -> Dict:
+    return {'dict': {
+        'added': {key: value for key, value in new.items() if key not in old},
+        'removed': [key for key in old if key not in new],
+        'changed': {key: value for key, value in new.items() if key in old and old[key] != value}
+    }}
+
+
+def file_delta(old: Dict, new: Dict) -> Dict:
+    """Per-key structural changes between two versions of one file's entry"""
+    changes = {}
+    for key in old:
+        if key not in new:
+            changes[key] = {'del': True}
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = {'set': value}
+        elif old[key] != value:
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                changes[key] = _dict_delta(old[key], value)
+            elif isinstance(value, list) and isinstance(old[key], list):
+                changes[key] = _list_delta(old[key], value)
+            else:
+                changes[key] = {'set': value}
+    return changes
+
+
+def apply_file_delta(old: Dict, changes: Dict) -> Dict:
+    new = {}
+    for key, value in old.items():
+        op = changes.get(key)
+        if op is None:
+            new[key] = value
+        elif 'del' in op:
+            continue
+        elif 'set' in op:
+            new[key] = op['set']
+        elif 'list' in op:
+            new[key] = _apply_list(value, op['list'])
+        else:
+            merged = {k: v for k, v in value.items() if k not in op['dict']['removed']}
+            merged.update(op['dict']['changed'])
+            merged.update(op['dict']['added'])
+            new[key] = merged
+    for key, op in changes.items():
+        if key not in old and 'set' in op:
+            new[key] = op['set']
+    return new
+
+
+def summarize_file_delta(changes: Dict) -> Dict:
+    """What changed in a file, by name: {'functions': {'added': [...], ...}, 'imports': {...}}"""
+    summary = {}
+    for key, op in changes.items():
+        if 'dict' in op:
+            summary[key] = {'added': sorted(op['dict']['added']), 'removed': sorted(op['dict']['removed']),
+                            'changed': sorted(op['dict']['changed'])}
+        elif 'list' in op:
+            summary[key] = {'added': op['list']['added'], 'removed': op['list']['removed']}
+        else:
+            summary[key] = {'replaced': 'del' not in op}
+    return summary
+
+
+class BrainHistory:
+    """Versions of one project's brain: periodic full snapshots plus per-file deltas
+
+    Every re-analysis that changes the brain appends a version. Its delta
+    lists the files added and removed and, for changed files, only the
+    symbols / imports / calls that differ. Every COMPACT_EVERY versions the
+    brain is also stored whole, which bounds how many deltas a
+    reconstruction has to replay. Recording holds history/.lock, so worker
+    processes saving the same project append one after the other.
+    """
+
+    def __init__(self, project_dir: str, compact_every: int = COMPACT_EVERY, keep: int = KEEP_VERSIONS):
+        self.directory = os.path.join(project_dir, HISTORY_DIR)
+        self.compact_every = compact_every
+        self.keep = keep
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def versions(self) -> List[Dict]:
+        return _load_json(self._path('versions.json'), [])
+
+    def get(self, version_id: int) -> Optional[Dict]:
+        return next((entry for entry in self.versions() if entry['id'] == version_id), None)
+
+    def _delta(self, version_id: int, deltas: Optional[Dict] = None) -> Dict:
+        """A version's delta; `deltas` caches them for the length of one operation only"""
+        if deltas is not None and version_id in deltas:
+            return deltas[version_id]
+        with gzip.open(self._path(f'delta-{version_id}.json.gz'), 'rt', encoding='utf-8') as f:
+            delta = json.load(f)
+        if deltas is not None:
+            deltas[version_id] = delta
+        return delta
+
+    def _base(self, versions: List[Dict], version_id: int) -> Dict:
+        """Nearest snapshot at or before a version"""
+        snapshots = [entry for entry in versions if entry['snapshot'] and entry['id'] <= version_id]
+        if not snapshots or not any(entry['id'] == version_id for entry in versions):
+            raise KeyError(version_id)
+        return snapshots[-1]
+
+    def files_at(self, version_id: int, paths: Iterable[str], deltas: Optional[Dict] = None,
+                 versions: Optional[List[Dict]] = None) -> Dict[str, Optional[Dict]]:
+        """Some files as they were in a version (None = not in that version)"""
+        base = self._base(versions if versions is not None else self.versions(), version_id)
+        with ShardedBrain(self._path(f"snapshot-{base['id']}")) as snapshot:
+            files = {path: snapshot.get(path) for path in paths}
+        for delta_id in range(base['id'] + 1, version_id + 1):
+            delta = self._delta(delta_id, deltas)
+            for path in files:
+                if path in delta['removed']:
+                    files[path] = None
+                elif path in delta['added']:
+                    files[path] = delta['added'][path]
+                elif path in delta['changed'] and files[path] is not None:
+                    files[path] = apply_file_delta(files[path], delta['changed'][path])
+        return files
+
+    def reconstruct(self, version_id: int) -> Dict:
+        """The whole brain of a version: its snapshot plus the deltas since"""
+        base = self._base(self.versions(), version_id)
+        with ShardedBrain(self._path(f"snapshot-{base['id']}")) as snapshot:
+            project_map = snapshot.to_dict()
+        for delta_id in range(base['id'] + 1, version_id + 1):
+            delta = self._delta(delta_id)
+            for path in delta['removed']:
+                project_map.pop(path, None)
+            for path, changes in delta['changed'].items():
+                project_map[path] = apply_file_delta(project_map[path], changes)
+            project_map.update(delta['added'])
+        return project_map
+
+    def diff(self, from_id: int, to_id: int) -> Dict:
+        """Structural changes between two versions, decoding only the files that changed"""
+        listed = self.versions()
+        versions = {entry['id']: entry for entry in listed}
+        if from_id not in versions or to_id not in versions:
+            raise KeyError(from_id if from_id not in versions else to_id)
+        low, high = sorted((from_id, to_id))
+
+        deltas = {}  # both reconstructions replay the same deltas
+        touched = set()
+        for delta_id in range(low + 1, high + 1):
+            delta = self._delta(delta_id, deltas)
+            touched.update(delta['added'], delta['removed'], delta['changed'])
+        before = self.files_at(from_id, touched, deltas, listed)
+        after = self.files_at(to_id, touched, deltas, listed)
+
+        files = {'added': [], 'removed': [], 'changed': {}}
+        for path in sorted(touched):
+            old, new = before[path], after[path]
+            if old is None and new is not None:
+                files['added'].append(path)
+            elif new is None and old is not None:
+                files['removed'].append(path)
+            elif old is not None and file_digest(old) != file_digest(new):
+                files['changed'][path] = summarize_file_delta(file_delta(old, new))
+        return {
+            'from': versions[from_id],
+            'to': versions[to_id],
+            'files': files,
+            'summary': {'added': len(files['added']), 'removed': len(files['removed']),
+                        'changed': len(files['changed'])}
+        }
+
+    def record(self, brain: ShardedBrain) -> Optional[Dict]:
+        """Append the brain as a new version (None if it equals the newest one)"""
+        with FileLock(self._path('.lock')):
+            versions = self.versions()
+            head = _load_json(self._path('head.json'), None)
+            if head and versions and versions[-1]['version'] == brain.version:
+                return None
+
+            version_id = versions[-1]['id'] + 1 if versions else 1
+            entry = {'id': version_id, 'version': brain.version, 'created_at': time.time(),
+                     'files': len(brain), 'snapshot': False}
+
+            if head and versions:
+                old_digests, new_digests = head['digests'], brain.digests
+                changed = [path for path, digest in new_digests.items()
+                           if path in old_digests and old_digests[path] != digest]
+                delta = {
+                    'added': {path: brain[path] for path in new_digests if path not in old_digests},
+                    'removed': [path for path in old_digests if path not in new_digests],
+                    'changed': {}
+                }
+                previous = self.files_at(versions[-1]['id'], changed, versions=versions)
+                for path in changed:
+                    delta['changed'][path] = file_delta(previous[path], brain[path])
+
+                delta_file = self._path(f'delta-{version_id}.json.gz')
+                with gzip.open(delta_file, 'wt', encoding='utf-8') as f:
+                    json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+                entry.update(added=len(delta['added']), removed=len(delta['removed']),
+                             changed=len(delta['changed']), delta_bytes=os.path.getsize(delta_file))
+
+            # Compaction: a full copy once the deltas since the last one are many or heavy
+            last_snapshot = next((v for v in reversed(versions) if v['snapshot']), None)
+            chain = [v for v in versions if last_snapshot and v['id'] > last_snapshot['id']] + [entry]
+            chain_bytes = sum(v.get('delta_bytes', 0) for v in chain)
+            if ('delta_bytes' not in entry or last_snapshot is None or len(chain) >= self.compact_every
+                    or chain_bytes * 2 > last_snapshot.get('snapshot_bytes', 0)):
+                snapshot_dir = self._path(f'snapshot-{version_id}')
+                write_sharded_brain(snapshot_dir, brain).close()
+                entry.update(snapshot=True, snapshot_bytes=storage_bytes(snapshot_dir))
+
+            versions.append(entry)
+            versions = self._prune(versions)
+            _save_json(self._path('versions.json'), versions)
+            _save_json(self._path('head.json'), {'id': version_id, 'digests': brain.digests})
+            return entry
+
+    def _prune(self, versions: List[Dict]) -> List[Dict]:
+        """Drop the oldest versions beyond `keep`, always cutting at a snapshot"""
+        while len(versions) > self.keep:
+            later_snapshots = [entry for entry in versions[1:] if entry['snapshot']]
+            if not later_snapshots or len(versions) - versions.index(later_snapshots[0]) < self.keep // 2:
+                break  # keep at least half the history reconstructible
+            cut = versions.index(later_snapshots[0])
+            for entry in versions[:cut]:
+                shutil.rmtree(self._path(f"snapshot-{entry['id']}"), ignore_errors=True)
+                try:
+                    os.remove(self._path(f"delta-{entry['id']}.json.gz"))
+                except FileNotFoundError:
+                    pass
+            versions = versions[cut:]
+        return versions
@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional
+
+from backend.module_index import ModuleIndex
+
+
+def short_name(symbol: str) -> str:
+    """'pkg/mod.py::Class.method' / 'self.display.show' -> 'method' / 'show'"""
+    return symbol.rsplit('::', 1)[-1].rsplit('.', 1)[-1]
+
+
+class CallGraph:
+    """Caller/callee lookups over the call sites recorded by the crawler
+
+    Symbols use the same ids as the architecture graph: 'file::function',
+    'file::Class.method' ('file::<module>' for top-level code). Each edge is
+    [caller symbol, callee name as written, line, resolved callee symbol or
+    None]. Lookups accept a full symbol or just a bare name such as
+    'calculate_mood'.
+    """
+
+    def __init__(self, edges: List[List]):
+        self.edges = edges
+        self.callers = {}  # callee symbol / bare name -> [edge]
+        self.callees = {}  # caller symbol / bare name -> [edge]
+
+        for edge in edges:
+            caller, callee, _, target = edge
+            for key in {target or callee, short_name(target or callee)}:
+                self.callers.setdefault(key, []).append(edge)
+            for key in (caller, short_name(caller)):
+                self.callees.setdefault(key, []).append(edge)
+
+    @classmethod
+    def from_project_map(cls, project_map: Dict, module_index: Optional[ModuleIndex] = None):
+        """Resolve every recorded call site - one pass, dictionary lookups only"""
+        module_index = module_index or ModuleIndex(project_map)
+        symbols = {file_path: cls._local_symbols(file_info) for file_path, file_info in project_map.items()}
+        edges = []
+
+        for file_path, file_info in project_map.items():
+            imports = set(file_info.get('imports', []))
+            for caller, callee, line in file_info.get('calls', []):
+                target = cls._resolve(file_path, caller, callee, symbols, imports, module_index)
+                edges.append([f"{file_path}::{caller}", callee, line, target])
+
+        return cls(edges)
+
+    @staticmethod
+    def _local_symbols(file_info):
+        """Names defined in a file: functions, classes and 'Class.method'"""
+        symbols = set(file_info.get('functions', {}))
+        for class_name, methods in file_info.get('classes', {}).items():
+            symbols.add(class_name)
+            symbols.update(f"{class_name}.{method}" for method in methods)
+        return symbols
+
+    @staticmethod
+    def _resolve(file_path, caller, callee, symbols, imports, module_index):
+        local = symbols[file_path]
+
+        # self.method() inside a class -> that class's method
+        if callee.startswith('self.') and callee.count('.') == 1:
+            class_name = caller.split('.', 1)[0]
+            candidate = f"{class_name}.{callee[5:]}"
+            return f"{file_path}::{candidate}" if candidate in local else None
+
+        # Defined in the same file
+        if callee in local:
+            return f"{file_path}::{callee}"
+
+        # Imported from another project file - the crawler already expanded
+        # the alias, so the callee must start with one of the file's imports
+        parts = callee.split('.')
+        if not any('.'.join(parts[:i]) in imports for i in range(1, len(parts) + 1)):
+            return None
+
+        target_file, symbol = module_index.resolve_symbol(callee, file_path)
+        if target_file and symbol in symbols.get(target_file, ()):
+            return f"{target_file}::{symbol}"
+
+        return None
+
+    def callers_of(self, name: str) -> List[Dict]:
+        """Who calls a symbol / bare function name"""
+        return [self._describe(edge) for edge in self.callers.get(name, [])]
+
+    def callees_of(self, name: str) -> List[Dict]:
+        """What a symbol / bare function name calls"""
+        return [self._describe(edge) for edge in self.callees.get(name, [])]
+
+    def _describe(self, edge):
+        caller, callee, line, target = edge
+        return {'caller': caller, 'callee': target or callee, 'line': line, 'resolved': target is not None}
@@ -1,71 +1,61 @@
 import os
-import ast
-import json
+import time
+
+from backend.metrics import span
+from backend.parsers import is_code_file, parser_for
+
+# Never contain project code, and are expensive to walk/watch
+SKIP_DIRS = {'.git', '.hg', '.svn', '__pycache__'}
+
+# Crawled first by a budgeted crawl - where people start reading a project
+ENTRY_POINTS = {
+    'main.py', 'app.py', '__main__.py', 'manage.py', 'wsgi.py', 'asgi.py',
+    'server.py', 'cli.py', 'setup.py', '__init__.py', 'main.cpp', 'main.c'
+}
 
 class CodeCrawler:
-    def __init__(self, project_root):
+    def __init__(self, project_root, parse_cache=None):
         self.project_root = project_root
         self.code_structure = {}
+        self.parse_cache = parse_cache  # optional ParseCache shared across projects
     
     def find_all_code_files(self):
-        """Find ALL code files in the project (Python + Arduino)"""
+        """Find ALL code files in the project (every extension in the parser registry)"""
         code_files = []
         
         for root, dirs, files in os.walk(self.project_root):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
             for file in files:
-                # Look for Python files
-                if file.endswith('.py'):
-                    full_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(full_path, self.project_root)
-                    code_files.append(relative_path)
-                
-                #Looking for Arduino files
-                elif file.endswith('.ino'):
+                # Python, Arduino, C/C++ - whatever has a registered parser
+                if is_code_file(file):
                     full_path = os.path.join(root, file)
                     relative_path = os.path.relpath(full_path, self.project_root)
                     code_files.append(relative_path)
         
         return code_files
     
-    def parse_python_file(self, file_path):
-        """Read and understand a Python file"""
+    def _parse_cached(self, file_path, parser_name, parse_source):
+        """Read a file and parse it - or reuse the result for identical content"""
         full_path = os.path.join(self.project_root, file_path)
         
         try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with open(full_path, 'rb') as f:
+                raw = f.read()
             
-            # Use AST to understand the code structure
-            tree = ast.parse(content)
+            key = None
+            if self.parse_cache:
+                key = self.parse_cache.key(raw, parser_name)
+                cached = self.parse_cache.get(key)
+                if cached is not None:
+                    return {'file_path': file_path, **cached}
             
-            file_info = {
-                'file_path': file_path,
-                'classes': {},
-                'functions': {},
-                'imports': []
-            }
-    
-            # Extract classes and functions
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    class_name = node.name
-                    methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                    file_info['classes'][class_name] = methods
-                
-                elif isinstance(node, ast.FunctionDef):
-                    func_name = node.name
-                    file_info['functions'][func_name] = {
-                        'line_number': node.lineno
-                    }
-                
-                # Extract imports
-                elif isinstance(node, ast.Import):
-                    for name in node.names:
-                        file_info['imports'].append(name.name)
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for name in node.names:
-                        file_info['imports'].append(f"{module}.{name.name}")
+            # Same newline handling as reading in text mode
+            content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            file_info = parse_source(content, file_path)
+            
+            if self.parse_cache:
+                # Path-independent, so the entry can serve any copy of the file
+                self.parse_cache.put(key, {k: v for k, v in file_info.items() if k != 'file_path'})
             
             return file_info
             
@@ -73,73 +63,193 @@ class CodeCrawler:
             print(f"❌ Error parsing {file_path}: {e}")
             return None
     
+    def parse_python_file(self, file_path):
+        """Read and understand a Python file"""
+        from backend.parsers.python_parser import parse_python_source
+        return self._parse_cached(file_path, 'python', parse_python_source)
+    
     def parse_arduino_file(self, file_path):
         """Read and understand an Arduino .ino file"""
-        full_path = os.path.join(self.project_root, file_path)
+        from backend.parsers.c_parser import parse_arduino_source
+        return self._parse_cached(file_path, 'arduino', parse_arduino_source)
+    
+    def parse_file(self, file_path):
+        """Pick the parser for a file (None for files we don't understand)"""
+        parser = parser_for(file_path)
+        if parser is None:
+            return None
+        parser_name, parse_source = parser
+        return self._parse_cached(file_path, parser_name, parse_source)
+    
+    @span('update_files')
+    def update_files(self, project_map, changed_paths):
+        """Incremental re-crawl: re-parse or drop only the given relative paths
         
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            file_info = {
-                'file_path': file_path,
-                'type': 'arduino',
-                'functions': {},
-                'setup_loop': False
-            }
+        Paths may be files or directories (a directory that was created or
+        moved in is crawled, one that disappeared drops everything under it).
+        """
+        self.code_structure = project_map
+        updated, removed = 0, 0
+        
+        for path in sorted(set(os.path.normpath(p) for p in changed_paths)):
+            full_path = os.path.join(self.project_root, path)
             
-            # Look for Arduino-specific patterns
-            lines = content.split('\n')
-            for i, line in enumerate(lines, 1):
-                line = line.strip()
-                
-                # Find setup() and loop() functions
-                if line.startswith('void setup()'):
-                    file_info['functions']['setup'] = {'line_number': i}
-                    file_info['setup_loop'] = True
-                elif line.startswith('void loop()'):
-                    file_info['functions']['loop'] = {'line_number': i}
-                    file_info['setup_loop'] = True
-                
-                # Find custom functions
-                elif line.startswith('void ') and '(' in line and ')' in line:
-                    # Extract function name
-                    func_declaration = line.split('void ')[1].split('(')[0].strip()
-                    if func_declaration and func_declaration not in ['setup', 'loop']:
-                        file_info['functions'][func_declaration] = {'line_number': i}
+            if os.path.isdir(full_path):
+                stale = set(self._entries_under(project_map, path))
+                for root, dirs, files in os.walk(full_path):
+                    dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                    for file in files:
+                        if is_code_file(file):
+                            relative_path = os.path.relpath(os.path.join(root, file), self.project_root)
+                            stale.discard(relative_path)
+                            file_info = self.parse_file(relative_path)
+                            if file_info:
+                                project_map[relative_path] = file_info
+                                updated += 1
+                for key in stale:
+                    del project_map[key]
+                    removed += 1
             
-            return file_info
+            elif os.path.isfile(full_path):
+                file_info = self.parse_file(path)
+                if file_info:
+                    project_map[path] = file_info
+                    updated += 1
+                elif project_map.pop(path, None) is not None:
+                    removed += 1  # no longer parses - same as a full crawl would do
             
-        except Exception as e:
-            print(f"❌ Error parsing {file_path}: {e}")
+            else:
+                # Deleted: the file itself, or everything under a deleted directory
+                under = [] if is_code_file(path) else self._entries_under(project_map, path)
+                for key in [path] + under:
+                    if project_map.pop(key, None) is not None:
+                        removed += 1
+        
+        print(f"🔁 Brain updated: {updated} files re-parsed, {removed} removed")
+        return {'updated': updated, 'removed': removed}
+    
+    def git_state(self):
+        """Commit and untracked code files of a git checkout ({} otherwise)"""
+        from backend.git_changes import head_commit, untracked_files
+        
+        commit = head_commit(self.project_root)
+        if not commit:
+            return {}
+        return {'commit': commit, 'untracked': sorted(untracked_files(self.project_root))}
+    
+    def update_from_git(self, project_map, since_commit, previous_untracked=()):
+        """Re-analysis for git checkouts: no tree walk, git names the changed files
+        
+        Returns the update_files() result plus the new git state, or None when
+        git can't tell (not a checkout, commit unknown) - do a full crawl then.
+        """
+        from backend.git_changes import changed_since
+        
+        state = self.git_state()
+        if not state or not since_commit:
+            return None
+        
+        changed = changed_since(self.project_root, since_commit)
+        if changed is None:
             return None
+        
+        # Untracked files never show up in a diff: re-check the ones we saw
+        # last time (maybe deleted or committed since) and the current ones
+        changed |= set(previous_untracked) | set(state['untracked'])
+        print(f"🌿 {len(changed)} files changed since {since_commit[:10]}")
+        
+        result = self.update_files(project_map, changed)
+        result.update(state)
+        return result
+    
+    def _entries_under(self, project_map, directory):
+        prefix = directory + os.sep
+        return [key for key in project_map if key.startswith(prefix)]
+    
+    def prioritize(self, files):
+        """Likely-important files first: entry points, then shallow, then recently modified"""
+        def priority(file_path):
+            name = os.path.basename(file_path)
+            entry = name in ENTRY_POINTS or file_path.lower().endswith('.ino')  # a sketch is its own entry point
+            try:
+                mtime = os.path.getmtime(os.path.join(self.project_root, file_path))
+            except OSError:
+                mtime = 0
+            return (not entry, file_path.count(os.sep), -mtime, file_path)
+        
+        return sorted(files, key=priority)
+    
+    def crawl_files(self, files, project_map, deadline=None, max_files=None, stop_event=None):
+        """Parse files into project_map until a budget runs out; returns the files left over
+        
+        deadline is a time.monotonic() value, max_files a count - either may be None.
+        At least one file is parsed per call, so repeated calls always make progress.
+        """
+        for done, file_path in enumerate(files):
+            if stop_event is not None and stop_event.is_set():
+                return files[done:]
+            if done and ((deadline is not None and time.monotonic() >= deadline) or
+                         (max_files is not None and done >= max_files)):
+                return files[done:]
+            
+            file_info = self.parse_file(file_path)
+            if file_info:
+                project_map[file_path] = file_info
+        
+        return []
+    
+    @span('build_partial_project_map')
+    def build_partial_project_map(self, time_budget=None, file_budget=None):
+        """Budgeted crawl: the most important files first, stop when the budget is spent
+        
+        Returns (project_map, remaining files); keep going with crawl_files().
+        """
+        print("🕷️  CodeCrawler is mapping your project (budgeted)...")
+        
+        # The budget covers discovery and prioritizing (a stat per file) too
+        deadline = time.monotonic() + time_budget if time_budget else None
+        files = self.prioritize(self.find_all_code_files())
+        remaining = self.crawl_files(files, self.code_structure, deadline, file_budget)
+        
+        if remaining:
+            print(f"⏱️  Budget reached: {len(files) - len(remaining)} of {len(files)} files crawled")
+        else:
+            print(f"✅ Project brain built! Analyzed {len(self.code_structure)} files.")
+        return self.code_structure, remaining
     
-    def build_project_map(self):
-        """MAIN FUNCTION: Build the understanding of the whole project"""
+    @span('build_project_map')
+    def build_project_map(self, sink=None):
+        """MAIN FUNCTION: Build the understanding of the whole project
+        
+        With a sink (a sharded_brain.BrainWriter) every file is written out as
+        soon as it is parsed instead of being kept, and the published
+        ShardedBrain is returned - memory stays flat however big the project.
+        """
         print("🕷️  CodeCrawler is mapping your project...")
         
         files = self.find_all_code_files()
         print(f"📁 Found {len(files)} code files")
         
-        for file_path in files:
-            print(f"   Scanning: {file_path}")
-            
-            if file_path.endswith('.py'):
-                file_info = self.parse_python_file(file_path)
-            elif file_path.endswith('.ino'):
-                file_info = self.parse_arduino_file(file_path)  # NEW!
-            else:
-                continue  # Skip other files
+        analyzed = 0
+        try:
+            for file_path in files:
+                print(f"   Scanning: {file_path}")
                 
-            if file_info:
-                self.code_structure[file_path] = file_info
-        
-        # Save the map to JSON file
-        with open('project_brain.json', 'w', encoding='utf-8') as f:
-            json.dump(self.code_structure, f, indent=2, ensure_ascii=False)
+                file_info = self.parse_file(file_path)
+                    
+                if file_info:
+                    analyzed += 1
+                    if sink is not None:
+                        sink.add(file_path, file_info)
+                    else:
+                        self.code_structure[file_path] = file_info
+        except BaseException:
+            if sink is not None:
+                sink.abort()
+            raise
         
-        print(f"✅ Project brain built! Analyzed {len(self.code_structure)} files.")
-        return self.code_structure
+        print(f"✅ Project brain built! Analyzed {analyzed} files.")
+        return sink.close() if sink is not None else self.code_structure
 # TEST FUNCTION
 def test_crawler():
     """Test our crawler on the EcoPulse project"""
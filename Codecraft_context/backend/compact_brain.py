@@ -0,0 +1,289 @@
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+# Keys stored in columns; everything else a parser emits (type, includes,
+# setup_loop, ...) is kept per file as-is - those are small.
+COLUMN_KEYS = ('file_path', 'classes', 'functions', 'globals', 'defines', 'imports', 'calls')
+
+# name -> {'line_number': n[, field: str]} tables: key -> (column prefix, string field or None).
+# Columns <prefix>_offsets / _names / _lines (/ _types for the field)
+SYMBOL_TABLES = {
+    'functions': ('function', 'return_type'),
+    'globals': ('global', 'type'),
+    'defines': ('define', None),
+}
+NO_STRING = 0xFFFFFFFF  # row without the string field
+
+
+class StringTable:
+    """Every distinct path / name stored once; records hold integer ids"""
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            value = sys.intern(value)
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self.ids[value] = string_id
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    def get_id(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+
+class CompactBrain(Mapping):
+    """Read-only, column-oriented brain: path -> file view
+
+    Behaves like the dict loaded from project_brain.json (same keys, same
+    nested shapes on access) but stores symbols as integer ids in flat
+    arrays, with one offset array per column marking where each file's rows
+    start. A file costs a few array slots instead of a dict per function,
+    and every name or path is held once.
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.paths: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.key_layouts: List[tuple] = []  # distinct key orders, for faithful round-trips
+        self.layout_ids: Dict[tuple, int] = {}
+        self.file_layout = array('H')
+        self.extras: Dict[int, Dict] = {}  # file -> non-column keys (and odd file_path values / tables)
+        # (table key, file, name id) -> a row that doesn't fit the columns, as parsed
+        self.symbol_extras: Dict[tuple, object] = {}
+
+        # Columns: file i owns rows offsets[i]:offsets[i + 1]
+        for prefix, field in SYMBOL_TABLES.values():
+            setattr(self, f'{prefix}_offsets', array('I', [0]))
+            setattr(self, f'{prefix}_names', array('I'))
+            setattr(self, f'{prefix}_lines', array('I'))
+            if field:
+                setattr(self, f'{prefix}_types', array('I'))
+        self.class_offsets = array('I', [0])
+        self.class_names = array('I')
+        self.method_offsets = array('I', [0])  # per class row
+        self.method_names = array('I')
+        self.import_offsets = array('I', [0])
+        self.imports = array('I')
+        self.call_offsets = array('I', [0])
+        self.calls = array('I')  # flat (caller id, callee id, line) triples
+
+        self.version: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, project_map: Dict, version: Optional[str] = None):
+        """Compact a plain brain; version is its brain_version() (computed if not given)"""
+        from backend.brain_cache import brain_version
+
+        brain = cls()
+        for file_path, file_info in project_map.items():
+            brain._add(file_path, file_info)
+        brain.version = version or brain_version(project_map)
+        return brain
+
+    def _add(self, file_path: str, file_info: Dict):
+        add = self.strings.add
+        file_index = len(self.paths)
+        self.paths.append(self.strings[add(file_path)])
+        self.index[file_path] = file_index
+
+        layout = tuple(file_info)
+        layout_id = self.layout_ids.get(layout)
+        if layout_id is None:
+            layout_id = self.layout_ids[layout] = len(self.key_layouts)
+            self.key_layouts.append(layout)
+        self.file_layout.append(layout_id)
+
+        extra = {key: value for key, value in file_info.items() if key not in COLUMN_KEYS}
+        if file_info.get('file_path', file_path) != file_path:
+            extra['file_path'] = file_info['file_path']
+        for key in SYMBOL_TABLES:
+            if key in file_info and not isinstance(file_info[key], dict):
+                extra[key] = file_info[key]
+        if extra:
+            self.extras[file_index] = extra
+
+        for key, (prefix, field) in SYMBOL_TABLES.items():
+            table = file_info.get(key)
+            names = getattr(self, f'{prefix}_names')
+            lines = getattr(self, f'{prefix}_lines')
+            types = getattr(self, f'{prefix}_types') if field else None
+            for name, info in (table.items() if isinstance(table, dict) else ()):
+                name_id = add(name)
+                names.append(name_id)
+                line = info.get('line_number') if isinstance(info, dict) else None
+                value = info.get(field) if field and isinstance(info, dict) else None
+                fits = (isinstance(line, int) and 0 <= line < NO_STRING
+                        and set(info) <= {'line_number', field} and (value is None or isinstance(value, str)))
+                lines.append(line if fits else 0)
+                if field:
+                    types.append(add(value) if fits and value is not None else NO_STRING)
+                if not fits:
+                    self.symbol_extras[(key, file_index, name_id)] = info
+            getattr(self, f'{prefix}_offsets').append(len(names))
+
+        for class_name, methods in file_info.get('classes', {}).items():
+            self.class_names.append(add(class_name))
+            self.method_names.extend(add(method) for method in methods)
+            self.method_offsets.append(len(self.method_names))
+        self.class_offsets.append(len(self.class_names))
+
+        self.imports.extend(add(name) for name in file_info.get('imports', []))
+        self.import_offsets.append(len(self.imports))
+
+        for caller, callee, line in file_info.get('calls', []):
+            self.calls.extend((add(caller), add(callee), line))
+        self.call_offsets.append(len(self.calls))
+
+    def file_index(self, file_path: str) -> Optional[int]:
+        return self.index.get(file_path)
+
+    def path_of(self, file_index: int) -> str:
+        return self.paths[file_index]
+
+    def __getitem__(self, file_path: str) -> 'FileView':
+        file_index = self.file_index(file_path)
+        if file_index is None:
+            raise KeyError(file_path)
+        return FileView(self, file_index)
+
+    def __contains__(self, file_path) -> bool:
+        return self.file_index(file_path) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def to_dict(self) -> Dict:
+        """The equivalent plain brain (e.g. to modify and save it)"""
+        return {path: FileView(self, i).to_dict() for i, path in enumerate(self)}
+
+    def save(self, path: str):
+        """Write the memory-mappable form (see MappedBrain) - atomically"""
+        from backend.mapped_brain import write_mapped_brain
+        write_mapped_brain(self, path)
+
+    @staticmethod
+    def load_mapped(path: str) -> 'CompactBrain':
+        """Open a file written by save(): columns stay in the page cache, shared by processes"""
+        from backend.mapped_brain import MappedBrain
+        return MappedBrain(path)
+
+
+class FileView(Mapping):
+    """One file of a CompactBrain; nested values are built on access"""
+    __slots__ = ('brain', 'file_index')
+
+    def __init__(self, brain: CompactBrain, file_index: int):
+        self.brain = brain
+        self.file_index = file_index
+
+    def _keys(self) -> tuple:
+        return self.brain.key_layouts[self.brain.file_layout[self.file_index]]
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys()
+
+    def __getitem__(self, key):
+        if key not in self._keys():
+            raise KeyError(key)
+
+        brain, i = self.brain, self.file_index
+        extra = brain.extras.get(i)
+        if extra and key in extra:
+            return extra[key]
+
+        strings = brain.strings
+        if key == 'file_path':
+            return brain.path_of(i)
+        if key in SYMBOL_TABLES:
+            return SymbolTable(brain, i, key)
+        if key == 'classes':
+            classes = {}
+            for row in range(brain.class_offsets[i], brain.class_offsets[i + 1]):
+                methods = brain.method_names[brain.method_offsets[row]:brain.method_offsets[row + 1]]
+                classes[strings[brain.class_names[row]]] = [strings[m] for m in methods]
+            return classes
+        if key == 'imports':
+            return [strings[s] for s in brain.imports[brain.import_offsets[i]:brain.import_offsets[i + 1]]]
+        if key == 'calls':
+            flat = brain.calls[brain.call_offsets[i]:brain.call_offsets[i + 1]]
+            return [[strings[flat[j]], strings[flat[j + 1]], flat[j + 2]] for j in range(0, len(flat), 3)]
+        raise KeyError(key)
+
+    def to_dict(self) -> Dict:
+        return {key: dict(value) if isinstance(value, SymbolTable) else value for key, value in self.items()}
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class SymbolTable(Mapping):
+    """name -> {'line_number': n, ...} (functions, globals, defines) over a file's rows"""
+    __slots__ = ('brain', 'file_index', 'key', 'names', 'start', 'end')
+
+    def __init__(self, brain: CompactBrain, file_index: int, key: str = 'functions'):
+        prefix = SYMBOL_TABLES[key][0]
+        offsets = getattr(brain, f'{prefix}_offsets')
+        self.brain = brain
+        self.file_index = file_index
+        self.key = key
+        self.names = getattr(brain, f'{prefix}_names')
+        self.start = offsets[file_index]
+        self.end = offsets[file_index + 1]
+
+    def _row(self, name) -> int:
+        name_id = self.brain.strings.get_id(name)
+        if name_id is not None:
+            for row in range(self.start, self.end):
+                if self.names[row] == name_id:
+                    return row
+        return -1
+
+    def __getitem__(self, name):
+        row = self._row(name)
+        if row < 0:
+            raise KeyError(name)
+        brain = self.brain
+        extra = brain.symbol_extras.get((self.key, self.file_index, self.names[row]))
+        if extra is not None:
+            return dict(extra) if isinstance(extra, dict) else extra
+
+        prefix, field = SYMBOL_TABLES[self.key]
+        info = {'line_number': getattr(brain, f'{prefix}_lines')[row]}
+        if field:
+            string_id = getattr(brain, f'{prefix}_types')[row]
+            if string_id != NO_STRING:
+                info[field] = brain.strings[string_id]
+        return info
+
+    def __contains__(self, name) -> bool:
+        return self._row(name) >= 0
+
+    def __iter__(self):
+        strings = self.brain.strings
+        return (strings[name_id] for name_id in self.names[self.start:self.end])
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self):
+        return repr(dict(self))
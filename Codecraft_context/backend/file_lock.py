@@ -0,0 +1,73 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: serve.py runs a single process there
+    fcntl = None
+
+_local_locks = {}  # lock path -> threading.Lock, when there is no fcntl
+_local_locks_guard = threading.Lock()
+
+
+class FileLock:
+    """Exclusive lock on a lock file, held across processes (flock) and threads
+
+    Every FileLock opens its own descriptor, so two threads of one process
+    exclude each other just like two worker processes do. The kernel drops
+    the lock when its holder dies, so a lock that can be taken also means
+    nobody is doing that work any more. Use one instance per acquisition.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._local = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if fcntl is None:
+            with _local_locks_guard:
+                self._local = _local_locks.setdefault(self.path, threading.Lock())
+            return self._local.acquire(blocking)
+
+        handle = open(self.path, 'a+')
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            handle.close()
+            return False
+        except BaseException:
+            handle.close()
+            raise
+        self._file = handle
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        elif self._local is not None:
+            self._local.release()
+            self._local = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None or self._local is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def lock_is_held(path: str) -> bool:
+    """Is someone (another process, or another FileLock here) holding the lock right now?"""
+    probe = FileLock(path)
+    if probe.acquire(blocking=False):
+        probe.release()
+        return False
+    return True
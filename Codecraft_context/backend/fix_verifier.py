@@ -0,0 +1,221 @@
+import ast
+import io
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from backend.auto_fixer import AutoFixer, PositionMap
+from backend.smart_analyzer import SmartAnalyzer
+
+# Below this many candidates a process pool costs more than it saves
+MIN_PARALLEL_BATCH = 4
+# Fix types verified on the fixed code's structure rather than by re-counting analyzer hits
+STRUCTURAL_CHECKS = ('resource_leak', 'performance_issue')
+
+
+def _count_issues(code, file_path, issue_type):
+    """How many issues of one type SmartAnalyzer reports for some code"""
+    issues = SmartAnalyzer().analyze_code_quality(code, file_path, include_ml=False)
+    return sum(1 for issue in issues if issue['type'] == issue_type)
+
+
+def _closes(statement, name):
+    """Is a statement `name.close()`?"""
+    return (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call)
+            and isinstance(statement.value.func, ast.Attribute) and statement.value.func.attr == 'close'
+            and isinstance(statement.value.func.value, ast.Name) and statement.value.func.value.id == name)
+
+
+def _leak_closed(fixed_code, line):
+    """The file opened on a line is closed: opened in a `with`, or closed right after / in a finally
+
+    SmartAnalyzer matches `open(` per line, so it still flags a fixed leak;
+    this checks the structure of the fixed code instead. A close followed by
+    another read of the name (later in the function) breaks the code, so
+    it doesn't count.
+    """
+    positions = PositionMap(fixed_code)
+    statement, body = positions.statement_at(line)
+    if isinstance(statement, ast.With):
+        return any(isinstance(item.context_expr, ast.Call) and getattr(item.context_expr.func, 'id', None) == 'open'
+                   for item in statement.items)
+    if not isinstance(statement, ast.Assign) or not isinstance(statement.targets[0], ast.Name):
+        return False
+
+    name = statement.targets[0].id
+    following = body[body.index(statement) + 1:body.index(statement) + 2]
+    if not following:
+        return False
+    closed = _closes(following[0], name) or (
+        isinstance(following[0], ast.Try) and any(_closes(stmt, name) for stmt in following[0].finalbody))
+    return closed and not positions.reads_after(name, following[0].end_lineno)
+
+
+def _review_noted(fixed_code, line):
+    """An AUTO-FIX review note sits on the flagged line, or on its own line above its statement
+
+    The flagged text (e.g. SELECT *) is left as is, so only the note can tell.
+    """
+    noted = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(fixed_code).readline):
+            if token.type == tokenize.COMMENT and token.string.startswith('# AUTO-FIX: review'):
+                noted.add(token.start[0])
+    except (tokenize.TokenError, SyntaxError):
+        return False
+    if line in noted:
+        return True
+    # A note on its own line pushed the flagged line (and its statement) down by one
+    statement = PositionMap(fixed_code).enclosing_statement(line + 1)
+    return statement is not None and statement.lineno - 1 in noted
+
+
+def _issue_resolved(job):
+    """Did the fix address its issue? (structural checks where the analyzer's regexes can't tell)"""
+    issue = job['issue']
+    if issue['type'] == 'resource_leak':
+        return _leak_closed(job['fixed_code'], issue['line'])
+    if issue['type'] == 'performance_issue':
+        return _review_noted(job['fixed_code'], issue['line'])
+    remaining = _count_issues(job['fixed_code'], job['file'], issue['type'])
+    return remaining < job['original_count']
+
+
+def _run_test_command(job, fixed_code):
+    """Run the user's test command against a throwaway copy of the project"""
+    sandbox = tempfile.mkdtemp(prefix='codecraft_fix_')
+    try:
+        project_copy = os.path.join(sandbox, 'project')
+        shutil.copytree(
+            job['project_root'], project_copy,
+            ignore=shutil.ignore_patterns('.git', '__pycache__', '*.pyc')
+        )
+        with open(os.path.join(project_copy, job['file']), 'w', encoding='utf-8') as f:
+            f.write(fixed_code)
+
+        command = job['test_command']
+        if isinstance(command, str):
+            command = shlex.split(command)
+
+        result = subprocess.run(
+            command, cwd=project_copy, capture_output=True, text=True,
+            timeout=job['test_timeout']
+        )
+        output = (result.stdout + result.stderr)[-2000:]
+        return result.returncode == 0, f'exit code {result.returncode}', output
+
+    except subprocess.TimeoutExpired:
+        return False, f"timed out after {job['test_timeout']}s", ''
+    except OSError as e:
+        return False, f'could not run tests: {e}', ''
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+
+def _verify_candidate(job):
+    """Worker: check one candidate fix (runs inside the process pool)"""
+    started = time.perf_counter()
+    result = {
+        'issue': job['issue'],
+        'file': job['file'],
+        'diff': job['diff'],
+        'accepted': False,
+        'reason': '',
+        'checks': {}
+    }
+
+    def finish(accepted, reason):
+        result['accepted'] = accepted
+        result['reason'] = reason
+        result['duration'] = round(time.perf_counter() - started, 4)
+        return result
+
+    # 1. Does it still compile?
+    try:
+        compile(job['fixed_code'], job['file'], 'exec')
+        result['checks']['compiles'] = True
+    except (SyntaxError, ValueError) as e:
+        result['checks']['compiles'] = False
+        return finish(False, f'fixed code does not compile: {e}')
+
+    # 2. Is the issue gone? (SmartAnalyzer's count, or a structural check for fixes it can't see)
+    issue_type = job['issue']['type']
+    result['checks']['issue_resolved'] = _issue_resolved(job)
+    if not result['checks']['issue_resolved']:
+        return finish(False, f'{issue_type} is not resolved by the fix')
+
+    # 3. Optional: do the user's tests still pass?
+    if job['test_command'] and job['project_root']:
+        passed, summary, output = _run_test_command(job, job['fixed_code'])
+        result['checks']['tests'] = passed
+        result['test_output'] = output
+        if not passed:
+            return finish(False, f'test command failed ({summary})')
+
+    return finish(True, 'all checks passed')
+
+
+class FixVerifier:
+    """Verifies AutoFixer candidates in a process pool before anyone applies them"""
+
+    def __init__(self, max_workers=None, test_command=None, project_root=None, test_timeout=60):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.test_command = test_command
+        self.project_root = project_root
+        self.test_timeout = test_timeout
+        self.fixer = AutoFixer()
+
+    def build_candidates(self, issues: List[Dict], sources: Dict[str, str]) -> List[Dict]:
+        """One candidate file per fixable issue (issue['file'] must be in sources)"""
+        jobs = []
+        original_counts = {}
+
+        for issue in issues:
+            file_path = issue.get('file')
+            code = sources.get(file_path)
+            if code is None:
+                continue
+
+            candidate = self.fixer.apply_fixes([issue], code, file_path)
+            if not candidate['applied']:
+                continue
+
+            # Analyze each original file once per issue type, not once per fix
+            count_key = (file_path, issue['type'])
+            if count_key not in original_counts and issue['type'] not in STRUCTURAL_CHECKS:
+                original_counts[count_key] = _count_issues(code, file_path, issue['type'])
+
+            jobs.append({
+                'issue': issue,
+                'file': file_path,
+                'fixed_code': candidate['code'],
+                'diff': candidate['diff'],
+                'original_count': original_counts.get(count_key),
+                'test_command': self.test_command,
+                'project_root': self.project_root,
+                'test_timeout': self.test_timeout
+            })
+
+        return jobs
+
+    def verify_fixes(self, issues: List[Dict], sources: Dict[str, str]) -> List[Dict]:
+        """Generate and verify a fix per issue; returns accept/reject results"""
+        jobs = self.build_candidates(issues, sources)
+        print(f"🧪 Verifying {len(jobs)} candidate fixes...")
+
+        if len(jobs) < MIN_PARALLEL_BATCH or self.max_workers == 1:
+            results = [_verify_candidate(job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (self.max_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_verify_candidate, jobs, chunksize=chunksize))
+
+        accepted = sum(1 for result in results if result['accepted'])
+        print(f"✅ {accepted} accepted, ❌ {len(results) - accepted} rejected")
+        return results
@@ -0,0 +1,56 @@
+import subprocess
+from typing import Optional, Set
+
+from backend.parsers import is_code_file
+
+GIT_TIMEOUT = 30
+
+
+def run_git(root: str, *args) -> Optional[str]:
+    """Output of `git -C root <args>`, or None if git is missing or the command fails"""
+    try:
+        result = subprocess.run(
+            ['git', '-C', root, *args],
+            capture_output=True, text=True, timeout=GIT_TIMEOUT
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def head_commit(root: str) -> Optional[str]:
+    """Commit the checkout is on (None when root is not a git work tree)"""
+    output = run_git(root, 'rev-parse', '--verify', '--quiet', 'HEAD')
+    return output.strip() if output else None
+
+
+def changed_since(root: str, commit: str) -> Optional[Set[str]]:
+    """Code files that differ between `commit` and the working tree
+
+    Covers new commits, staged and unstaged edits in one diff. A rename
+    reports both sides, so the old entry is dropped and the new one parsed.
+    Paths are relative to root (--relative), like the brain's keys. None
+    means the commit is unknown (e.g. history was rewritten).
+    """
+    output = run_git(root, 'diff', '--name-status', '-M', '-z', '--relative', commit, '--')
+    if output is None:
+        return None
+
+    changed = set()
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        path_count = 2 if status[0] in 'RC' else 1
+        changed.update(fields[i + 1:i + 1 + path_count])
+        i += 1 + path_count
+
+    return {path for path in changed if is_code_file(path)}
+
+
+def untracked_files(root: str) -> Set[str]:
+    """Code files git does not track yet (ignored files excluded)"""
+    output = run_git(root, 'ls-files', '--others', '--exclude-standard', '-z')
+    if not output:
+        return set()
+    return {path for path in output.split('\0') if is_code_file(path)}
@@ -0,0 +1,78 @@
+from typing import Dict
+
+
+def file_import_graph(dependency_graph):
+    """Just the files and the imports between them (no class/method nodes)"""
+    files = [node for node, node_type in dependency_graph.nodes(data='type') if node_type == 'file']
+    return dependency_graph.subgraph(files)
+
+
+def pagerank(graph, damping: float = 0.85, max_iter: int = 100, tol: float = 1e-8) -> Dict[str, float]:
+    """Power-iteration PageRank on a DiGraph (nx.pagerank would pull in scipy)
+
+    An import edge a -> b passes a's rank to b, so heavily imported
+    modules end up central.
+    """
+    nodes = list(graph.nodes)
+    n = len(nodes)
+    if n == 0:
+        return {}
+
+    out_degree = {node: graph.out_degree(node) for node in nodes}
+    rank = {node: 1.0 / n for node in nodes}
+
+    for _ in range(max_iter):
+        dangling = damping * sum(rank[node] for node in nodes if out_degree[node] == 0) / n
+        new_rank = {node: (1.0 - damping) / n + dangling for node in nodes}
+        for source, target in graph.edges():
+            new_rank[target] += damping * rank[source] / out_degree[source]
+
+        error = sum(abs(new_rank[node] - rank[node]) for node in nodes)
+        rank = new_rank
+        if error < n * tol:
+            break
+
+    return rank
+
+
+def compute_graph_metrics(dependency_graph, top_n: int = 10) -> Dict:
+    """Fan-in/out, import cycles, PageRank and dependency layers per file
+
+    Layer 0 holds files that import nothing local; every other file sits one
+    layer above the highest layer it depends on. Files in an import cycle
+    share a layer.
+    """
+    import networkx as nx
+
+    graph = file_import_graph(dependency_graph)
+    ranks = pagerank(graph)
+
+    # Import cycles = strongly connected components with more than one file
+    components = list(nx.strongly_connected_components(graph))
+    cycles = sorted((sorted(component) for component in components if len(component) > 1), key=len, reverse=True)
+
+    # Layering on the condensation (a DAG), dependencies first
+    condensed = nx.condensation(graph, scc=components)
+    component_layer = {}
+    for component in reversed(list(nx.topological_sort(condensed))):
+        dependencies = [component_layer[c] for c in condensed.successors(component)]
+        component_layer[component] = max(dependencies) + 1 if dependencies else 0
+
+    mapping = condensed.graph['mapping']
+    in_cycle = {file_path for cycle in cycles for file_path in cycle}
+    files = {}
+    for file_path in graph.nodes:
+        files[file_path] = {
+            'fan_in': graph.in_degree(file_path),
+            'fan_out': graph.out_degree(file_path),
+            'pagerank': round(ranks.get(file_path, 0.0), 6),
+            'layer': component_layer[mapping[file_path]],
+            'in_cycle': file_path in in_cycle
+        }
+
+    return {
+        'files': files,
+        'cycles': cycles,
+        'layer_count': max(component_layer.values()) + 1 if component_layer else 0,
+        'central_files': sorted(files, key=lambda path: files[path]['pagerank'], reverse=True)[:top_n]
+    }
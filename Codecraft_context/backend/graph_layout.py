@@ -0,0 +1,245 @@
+import math
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from backend.module_index import to_posix
+
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+
+def _stable_phase(name: str) -> float:
+    """Deterministic angle per name (hash() is randomized between runs)"""
+    return (zlib.crc32(name.encode('utf-8')) % 3600) / 3600 * 2 * math.pi
+
+
+def _spread(count: int, dim: int, phase: float = 0.0) -> List[Tuple[float, ...]]:
+    """`count` evenly spread unit vectors (Fibonacci sphere / circle) - O(count)"""
+    points = []
+    for i in range(count):
+        if dim == 2:
+            angle = 2 * math.pi * i / count + phase
+            points.append((math.cos(angle), math.sin(angle)))
+            continue
+        theta = GOLDEN_ANGLE * i + phase
+        y = 1 - 2 * (i + 0.5) / count
+        r = math.sqrt(max(0.0, 1 - y * y))
+        points.append((r * math.cos(theta), y, r * math.sin(theta)))
+    return points
+
+
+def _offset(center, direction, radius):
+    return tuple(c + d * radius for c, d in zip(center, direction))
+
+
+class GraphLayout:
+    """Seeded, warm-startable layout for architecture graphs
+
+    Small graphs get a plain force-directed (spring) layout. Larger graphs use
+    a multilevel layout that follows the code hierarchy: directories are laid
+    out as coarse clusters weighted by the imports between them, files inside
+    their directory's cell, and classes/methods on small shells around their
+    parent. Each force-directed step only ever sees one group of siblings, so
+    the cost grows with the largest directory instead of the whole project.
+
+    Positions from a previous run are kept as-is; only new nodes are placed.
+    """
+
+    def __init__(self, seed: int = 42, dim: int = 3, spring_threshold: int = 300,
+                 max_group: int = 150, iterations: int = 50):
+        self.seed = seed
+        self.dim = dim
+        self.spring_threshold = spring_threshold
+        self.max_group = max_group
+        self.iterations = iterations
+
+    def compute(self, graph, previous: Optional[Dict] = None) -> Dict[str, Tuple[float, ...]]:
+        previous = {
+            node: tuple(position) for node, position in (previous or {}).items()
+            if node in graph and len(position) == self.dim
+        }
+
+        if len(previous) == graph.number_of_nodes():
+            return previous
+
+        if graph.number_of_nodes() <= self.spring_threshold:
+            return self._spring(graph, previous)
+
+        if previous:
+            return self._place_new_nodes(graph, previous)
+
+        return self._multilevel(graph)
+
+    # ---------- small graphs ----------
+
+    def _spring(self, graph, previous):
+        import networkx as nx
+
+        if previous:
+            # Start new nodes next to their parents/neighbours, relax only them
+            initial = self._place_new_nodes(graph, previous)
+            pos = nx.spring_layout(
+                graph, dim=self.dim, seed=self.seed, iterations=self.iterations,
+                pos={node: list(position) for node, position in initial.items()},
+                fixed=list(previous)
+            )
+        else:
+            pos = nx.spring_layout(graph, dim=self.dim, seed=self.seed, iterations=self.iterations)
+
+        return {node: tuple(float(c) for c in position) for node, position in pos.items()}
+
+    # ---------- hierarchy helpers ----------
+
+    def _parent(self, graph, node):
+        """Structural parent: class -> file, method -> class, file -> None"""
+        node_type = graph.nodes[node].get('type')
+        if node_type == 'class':
+            return node.split('::', 1)[0]
+        if node_type == 'method':
+            return node.rsplit('.', 1)[0]
+        return None
+
+    def _hierarchy(self, graph):
+        anchors, children = [], {}
+        for node in graph.nodes:
+            parent = self._parent(graph, node)
+            if parent is None or parent not in graph:
+                anchors.append(node)
+            else:
+                children.setdefault(parent, []).append(node)
+        return anchors, children
+
+    def _anchor_of(self, graph, node):
+        parent = self._parent(graph, node)
+        while parent is not None and parent in graph:
+            node, parent = parent, self._parent(graph, parent)
+        return node
+
+    # ---------- large graphs ----------
+
+    def _multilevel(self, graph):
+        anchors, children = self._hierarchy(graph)
+
+        # Directory tree over the anchors (files)
+        dirs = {(): {'dirs': [], 'files': []}}
+        anchor_dirs = {}
+        for anchor in anchors:
+            parts = tuple(to_posix(anchor).split('/')[:-1])
+            anchor_dirs[anchor] = parts
+            for depth in range(len(parts)):
+                if parts[:depth + 1] not in dirs:
+                    dirs[parts[:depth + 1]] = {'dirs': [], 'files': []}
+                    dirs[parts[:depth]]['dirs'].append(parts[:depth + 1])
+            dirs[parts]['files'].append(anchor)
+
+        # Every dependency edge (lifted to file level) is weighted into the
+        # group graph of the lowest directory containing both ends
+        group_edges = {}
+        for u, v in graph.edges():
+            a, b = self._anchor_of(graph, u), self._anchor_of(graph, v)
+            if a == b:
+                continue
+            pa, pb = anchor_dirs[a], anchor_dirs[b]
+            common = 0
+            while common < min(len(pa), len(pb)) and pa[common] == pb[common]:
+                common += 1
+            lca = pa[:common]
+            ma = pa[:common + 1] if len(pa) > common else a
+            mb = pb[:common + 1] if len(pb) > common else b
+            key = (ma, mb) if str(ma) <= str(mb) else (mb, ma)
+            edges = group_edges.setdefault(lca, {})
+            edges[key] = edges.get(key, 0) + 1
+
+        positions, radii = {}, {}
+        origin = tuple(0.0 for _ in range(self.dim))
+
+        # Top-down: place each directory's members inside its cell
+        stack = [((), origin, 1.0)]
+        while stack:
+            dir_key, center, radius = stack.pop()
+            members = dirs[dir_key]['dirs'] + dirs[dir_key]['files']
+            placed = self._place_group(members, group_edges.get(dir_key, {}), center, radius, str(dir_key))
+            child_radius = radius * 0.8 / max(1.0, len(members) ** (1 / self.dim))
+
+            for member, position in placed.items():
+                if isinstance(member, tuple):
+                    stack.append((member, position, child_radius))
+                else:
+                    positions[member] = position
+                    radii[member] = child_radius
+
+        # Bottom level: classes around files, methods around classes
+        queue = list(anchors)
+        while queue:
+            node = queue.pop()
+            kids = children.get(node, [])
+            if not kids:
+                continue
+            radius = radii[node] * 0.5
+            for kid, direction in zip(kids, _spread(len(kids), self.dim, _stable_phase(node))):
+                positions[kid] = _offset(positions[node], direction, radius)
+                radii[kid] = radius * 0.5
+                queue.append(kid)
+
+        return positions
+
+    def _place_group(self, members, edges, center, radius, name):
+        """Positions for one group of siblings inside a cell"""
+        if len(members) == 1:
+            return {members[0]: center}
+
+        if len(members) <= self.max_group and edges:
+            import networkx as nx
+
+            group = nx.Graph()
+            group.add_nodes_from(range(len(members)))
+            index = {member: i for i, member in enumerate(members)}
+            for (a, b), weight in edges.items():
+                group.add_edge(index[a], index[b], weight=weight)
+
+            pos = nx.spring_layout(
+                group, dim=self.dim, seed=self.seed, iterations=self.iterations,
+                weight='weight', scale=radius, center=list(center)
+            )
+            return {member: tuple(float(c) for c in pos[index[member]]) for member in members}
+
+        # Too big (or nothing connects them): deterministic even spread
+        return {
+            member: _offset(center, direction, radius)
+            for member, direction in zip(members, _spread(len(members), self.dim, _stable_phase(name)))
+        }
+
+    # ---------- warm start ----------
+
+    def _place_new_nodes(self, graph, previous):
+        """Keep every known position; put new nodes next to what they belong to"""
+        positions = dict(previous)
+        anchors, children = self._hierarchy(graph)
+        origin = tuple(0.0 for _ in range(self.dim))
+
+        # New files go to the centroid of their placed neighbours, else of
+        # their placed directory siblings
+        by_dir = {}
+        for anchor in anchors:
+            by_dir.setdefault(to_posix(anchor).rsplit('/', 1)[0], []).append(anchor)
+
+        for anchor in anchors:
+            if anchor in positions:
+                continue
+            near = [positions[n] for n in graph.successors(anchor) if n in positions]
+            near += [positions[n] for n in graph.predecessors(anchor) if n in positions]
+            if not near:
+                near = [positions[s] for s in by_dir[to_posix(anchor).rsplit('/', 1)[0]] if s in positions]
+            center = tuple(sum(c) / len(near) for c in zip(*near)) if near else origin
+            direction = _spread(1, self.dim, _stable_phase(anchor))[0]
+            positions[anchor] = _offset(center, direction, 0.05)
+
+        queue = list(anchors)
+        while queue:
+            node = queue.pop()
+            kids = children.get(node, [])
+            for kid, direction in zip(kids, _spread(len(kids), self.dim, _stable_phase(node))):
+                if kid not in positions:
+                    positions[kid] = _offset(positions[node], direction, 0.03)
+                queue.append(kid)
+
+        return positions
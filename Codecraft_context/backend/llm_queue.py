@@ -0,0 +1,64 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.metrics import REGISTRY
+
+# Lower runs first: a user waiting on an answer goes ahead of any background work
+INTERACTIVE, PREFETCH = 0, 10
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', PREFETCH: 'prefetch'}
+
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    'codecraft_llm_queue_wait_seconds', 'Time an LLM call waited for a free slot', ['priority']
+)
+
+
+class LLMQueue:
+    """Admission to the LLM: a few concurrent calls, the rest wait in priority order
+
+    A freed slot goes to the most urgent waiter (then the oldest), so a
+    question asked while prefetch jobs are queued is next in line. A call
+    already running is never interrupted. One queue per process: with
+    several workers, slots and priorities apply within each worker only,
+    and Ollama takes the workers' calls in arrival order.
+    """
+
+    def __init__(self, slots: int = 1):
+        self.slots = max(1, slots)
+        self._busy = 0
+        self._waiting = []  # heap of (priority, arrival, event)
+        self._arrivals = itertools.count()
+        self._lock = threading.Lock()
+
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def _acquire(self, priority: int):
+        with self._lock:
+            if self._busy < self.slots and not self._waiting:
+                self._busy += 1
+                return
+            event = threading.Event()
+            heapq.heappush(self._waiting, (priority, next(self._arrivals), event))
+        event.wait()
+
+    def _release(self):
+        with self._lock:
+            if self._waiting:
+                _, _, event = heapq.heappop(self._waiting)
+                event.set()  # the slot passes straight to the waiter
+            else:
+                self._busy -= 1
+
+    @contextmanager
+    def slot(self, priority: int = INTERACTIVE):
+        started = time.perf_counter()
+        self._acquire(priority)
+        QUEUE_WAIT_SECONDS.observe(time.perf_counter() - started,
+                                   priority=PRIORITY_NAMES.get(priority, str(priority)))
+        try:
+            yield
+        finally:
+            self._release()
@@ -0,0 +1,168 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+
+from backend.compact_brain import CompactBrain
+
+# project_brain.bin: MAGIC, uint64 directory length, JSON directory, then
+# 8-byte aligned raw arrays. Every section is used in place through the
+# mapping, so any number of worker processes share one copy in the page cache.
+MAGIC = b'CCBRAIN3'
+HEADER = struct.Struct('<8sQ')
+ALIGN = 8
+
+COLUMNS = (
+    'file_layout',
+    'function_offsets', 'function_names', 'function_lines', 'function_types',
+    'global_offsets', 'global_names', 'global_lines', 'global_types',
+    'define_offsets', 'define_names', 'define_lines',
+    'class_offsets', 'class_names', 'method_offsets', 'method_names',
+    'import_offsets', 'imports', 'call_offsets', 'calls',
+)
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGN
+
+
+def write_mapped_brain(brain: CompactBrain, path: str):
+    """Serialize a CompactBrain for MappedBrain (atomic: tmp file + os.replace)"""
+    encoded = [value.encode('utf-8') for value in brain.strings.strings]
+    string_offsets = array('Q', [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    path_ids = array('I', (brain.strings.get_id(file_path) for file_path in brain.paths))
+    sections = {
+        'string_blob': b''.join(encoded),
+        'string_offsets': string_offsets,
+        # Lookups by name / path are binary searches over these orders
+        'sorted_strings': array('I', sorted(range(len(encoded)), key=encoded.__getitem__)),
+        'path_ids': path_ids,
+        'sorted_files': array('I', sorted(range(len(path_ids)), key=lambda i: encoded[path_ids[i]])),
+    }
+    sections.update((name, getattr(brain, name)) for name in COLUMNS)
+
+    layout, offset = {}, 0
+    for name, data in sections.items():
+        size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+        layout[name] = [offset, size, data.typecode if isinstance(data, array) else 'B']
+        offset += size + _padding(size)
+
+    directory = json.dumps({
+        'version': brain.version,
+        'byteorder': sys.byteorder,
+        'files': len(brain.paths),
+        'key_layouts': brain.key_layouts,
+        'extras': {str(file_index): extra for file_index, extra in brain.extras.items()},
+        'symbol_extras': [[key, file_index, name_id, info]
+                          for (key, file_index, name_id), info in brain.symbol_extras.items()],
+        'sections': layout,
+    }, separators=(',', ':')).encode('utf-8')
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(directory)))
+        f.write(directory)
+        f.write(b'\0' * _padding(HEADER.size + len(directory)))
+        for data in sections.values():
+            raw = data.tobytes() if isinstance(data, array) else data
+            f.write(raw)
+            f.write(b'\0' * _padding(len(raw)))
+    os.replace(tmp_path, path)  # processes still mapping the old file keep its inode
+
+
+class MappedStringTable:
+    """StringTable over the mapped blob: strings decoded on access"""
+    __slots__ = ('blob', 'offsets', 'sorted_ids')
+
+    def __init__(self, blob, offsets, sorted_ids):
+        self.blob = blob
+        self.offsets = offsets
+        self.sorted_ids = sorted_ids
+
+    def raw(self, string_id: int) -> bytes:
+        return self.blob[self.offsets[string_id]:self.offsets[string_id + 1]].tobytes()
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.raw(string_id).decode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get_id(self, value: str) -> Optional[int]:
+        encoded = value.encode('utf-8')
+        position = bisect.bisect_left(self.sorted_ids, encoded, key=self.raw)
+        if position < len(self.sorted_ids) and self.raw(self.sorted_ids[position]) == encoded:
+            return self.sorted_ids[position]
+        return None
+
+
+class MappedBrain(CompactBrain):
+    """CompactBrain read straight from a memory-mapped project_brain.bin
+
+    Opening costs one small JSON directory parse; the columns are never
+    copied into the process. Raises ValueError for files it cannot use
+    (older format, other byte order) - callers fall back to the JSON brain.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, directory_size = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a mapped brain")
+        directory = json.loads(view[HEADER.size:HEADER.size + directory_size].tobytes())
+        if directory['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {directory['byteorder']}-endian machine")
+        data_start = HEADER.size + directory_size + _padding(HEADER.size + directory_size)
+
+        def section(name):
+            offset, size, typecode = directory['sections'][name]
+            raw = view[data_start + offset:data_start + offset + size]
+            return raw if typecode == 'B' else raw.cast(typecode)
+
+        self.strings = MappedStringTable(section('string_blob'), section('string_offsets'),
+                                         section('sorted_strings'))
+        self.path_ids = section('path_ids')
+        self.sorted_files = section('sorted_files')
+        for name in COLUMNS:
+            setattr(self, name, section(name))
+
+        self.key_layouts = [tuple(keys) for keys in directory['key_layouts']]
+        self.extras = {int(file_index): extra for file_index, extra in directory['extras'].items()}
+        self.symbol_extras = {(key, file_index, name_id): info
+                              for key, file_index, name_id, info in directory['symbol_extras']}
+        self.version = directory['version']
+        self.file_count = directory['files']
+
+    def _path_bytes(self, file_index: int) -> bytes:
+        return self.strings.raw(self.path_ids[file_index])
+
+    def file_index(self, file_path: str) -> Optional[int]:
+        if not isinstance(file_path, str):
+            return None
+        encoded = file_path.encode('utf-8')
+        position = bisect.bisect_left(self.sorted_files, encoded, key=self._path_bytes)
+        if position < self.file_count and self._path_bytes(self.sorted_files[position]) == encoded:
+            return self.sorted_files[position]
+        return None
+
+    def path_of(self, file_index: int) -> str:
+        return self.strings[self.path_ids[file_index]]
+
+    def __iter__(self):
+        return (self.path_of(i) for i in range(self.file_count))
+
+    def __len__(self) -> int:
+        return self.file_count
+
+    def _add(self, file_path, file_info):
+        raise TypeError('MappedBrain is read-only')
@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Tuple
+
+
+def to_posix(path: str) -> str:
+    """Brains built on Windows use backslashes - index everything with '/'"""
+    return path.replace('\\', '/')
+
+
+def module_name_for(path: str) -> Optional[str]:
+    """'pkg/sub/mod.py' -> 'pkg.sub.mod', 'pkg/__init__.py' -> 'pkg'"""
+    path = to_posix(path)
+    if not path.endswith('.py'):
+        return None
+
+    parts = path[:-3].split('/')
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+
+    return '.'.join(parts) if parts else None
+
+
+class ModuleIndex:
+    """Dotted module name -> project file, built once per brain
+
+    Every Python file is indexed under all dotted suffixes of its path, so
+    `backend.code_crawler` finds `Codecraft_context/backend/code_crawler.py`
+    no matter which directory the project was crawled from. Each lookup is
+    a couple of dictionary hits instead of a scan over the project map.
+    """
+
+    def __init__(self, project_map: Dict):
+        self.modules = {}   # dotted name (from project root) -> file
+        self.suffixes = {}  # any dotted suffix -> [(source root parts, file)]
+
+        for file_path in project_map:
+            self.add_file(file_path)
+
+    def add_file(self, file_path: str):
+        name = module_name_for(file_path)
+        if not name:
+            return
+
+        self.modules[name] = file_path
+
+        parts = name.split('.')
+        for i in range(len(parts)):
+            suffix = '.'.join(parts[i:])
+            self.suffixes.setdefault(suffix, []).append((tuple(parts[:i]), file_path))
+
+    def resolve(self, import_name: str, importer: str = '') -> Optional[str]:
+        """Find the project file an import refers to, or None for external code
+
+        Tries the full dotted name first (`from x import y` where y is a
+        submodule), then its parent (y is a class or function inside x).
+        """
+        target = self._lookup(import_name, importer)
+        if target:
+            return target
+
+        parent = import_name.rsplit('.', 1)[0]
+        if parent != import_name and parent.strip('.'):
+            return self._lookup(parent, importer)
+
+        return None
+
+    def resolve_symbol(self, dotted_name: str, importer: str = '') -> Tuple[Optional[str], Optional[str]]:
+        """'pkg.mod.Class.method' -> ('pkg/mod.py', 'Class.method') - longest module prefix wins"""
+        level = len(dotted_name) - len(dotted_name.lstrip('.'))
+        parts = dotted_name[level:].split('.')
+
+        for i in range(len(parts) - 1, 0, -1):
+            target = self._lookup('.' * level + '.'.join(parts[:i]), importer)
+            if target:
+                return target, '.'.join(parts[i:])
+
+        return None, None
+
+    def _lookup(self, module_name: str, importer: str) -> Optional[str]:
+        """Exact module name (absolute or relative to the importer) -> file"""
+        if module_name.startswith('.'):
+            return self._resolve_relative(module_name, importer)
+        return self._resolve_absolute(module_name, importer)
+
+    def _resolve_relative(self, import_name: str, importer: str) -> Optional[str]:
+        level = len(import_name) - len(import_name.lstrip('.'))
+        rest = import_name[level:]
+
+        # The package the importer lives in, then one step up per extra dot
+        package = to_posix(importer).split('/')[:-1]
+        if level > 1:
+            package = package[:-(level - 1)] if level - 1 <= len(package) else []
+
+        return self.modules.get('.'.join(package + (rest.split('.') if rest else [])))
+
+    def _resolve_absolute(self, name: str, importer: str) -> Optional[str]:
+        if name in self.modules:
+            return self.modules[name]
+
+        candidates = self.suffixes.get(name)
+        if not candidates:
+            return None
+
+        # Prefer a source root the importer actually lives under (it would be
+        # on sys.path when the importer runs); the deepest one wins
+        importer_dir = tuple(to_posix(importer).split('/')[:-1])
+        best: List = [
+            (len(root), file_path) for root, file_path in candidates
+            if importer_dir[:len(root)] == root
+        ]
+        if best:
+            return max(best)[1]
+
+        # src/ layouts: a unique dotted match is still trustworthy, a bare
+        # name like `utils` or `json` is not
+        if len(candidates) == 1 and '.' in name:
+            return candidates[0][1]
+
+        return None
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+# Bump whenever a parser's output format changes - old entries then never match
+PARSER_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.path.join('projects', '.parse_cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ParseCache:
+    """Parse results keyed by file content hash, shared by every project
+
+    Identical files (vendored copies, forks, the same tree analyzed under
+    two project names) are parsed once. Entries are small JSON files under
+    <cache_dir>/<2-char prefix>/<hash>.json; when the cache grows past
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None  # bytes on disk, scanned lazily
+        self._lock = threading.Lock()
+
+    def key(self, content: bytes, parser_name: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        return f"{parser_name}-v{PARSER_VERSION}-{digest}"
+
+    def _path(self, key: str) -> str:
+        digest = key.rsplit('-', 1)[-1]
+        return os.path.join(self.cache_dir, digest[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so eviction is least-recently-used, not oldest-written
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        data = json.dumps(result, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        try:
+            replaced = os.path.getsize(path)  # an existing entry for the key is overwritten
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - replaced
+            over_budget = self._size > self.max_bytes
+
+        if over_budget:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_ratio: float = 0.8):
+        """Drop least recently used entries until the cache is under target_ratio * max_bytes"""
+        with self._lock:
+            entries = sorted(self._entries())
+            size = sum(entry_size for _, entry_size, _ in entries)
+            target = self.max_bytes * target_ratio
+
+            for _, entry_size, path in entries:
+                if size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                size -= entry_size
+                self.evictions += 1
+
+            self._size = size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'bytes': self._size if self._size is not None else self._scan_size(),
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,52 @@
+import importlib
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+# File extension -> (parser name, 'module:function'). The parser name is part
+# of the parse cache key; the module is only imported when a file of that kind
+# is actually crawled.
+PARSERS: Dict[str, Tuple[str, str]] = {
+    '.py': ('python', 'backend.parsers.python_parser:parse_python_source'),
+    '.ino': ('arduino', 'backend.parsers.c_parser:parse_arduino_source'),
+    '.c': ('c', 'backend.parsers.c_parser:parse_c_source'),
+    '.cpp': ('c', 'backend.parsers.c_parser:parse_c_source'),
+    '.cc': ('c', 'backend.parsers.c_parser:parse_c_source'),
+    '.h': ('c', 'backend.parsers.c_parser:parse_c_source'),
+    '.hpp': ('c', 'backend.parsers.c_parser:parse_c_source'),
+}
+
+_loaded: Dict[str, Callable] = {}
+
+
+def register_parser(extension: str, parser_name: str, target: str):
+    """Add or replace the parser for an extension, e.g. ('.rs', 'rust', 'my_pkg.rust:parse')
+
+    The function is called as parse(content, file_path) and returns the
+    file_info dict stored in the brain.
+    """
+    PARSERS[extension.lower()] = (parser_name, target)
+
+
+def code_extensions() -> Tuple[str, ...]:
+    """Every extension some parser understands, lowercase"""
+    return tuple(PARSERS)
+
+
+def is_code_file(file_path: str) -> bool:
+    """Does some parser handle this file? Extensions match in any case (.INO, .CPP)"""
+    return os.path.splitext(file_path)[1].lower() in PARSERS
+
+
+def parser_for(file_path: str) -> Optional[Tuple[str, Callable]]:
+    """(parser name, parse function) for a file, or None if no parser handles it"""
+    entry = PARSERS.get(os.path.splitext(file_path)[1].lower())
+    if entry is None:
+        return None
+
+    parser_name, target = entry
+    parse = _loaded.get(target)
+    if parse is None:
+        module_name, function_name = target.split(':')
+        parse = getattr(importlib.import_module(module_name), function_name)
+        _loaded[target] = parse
+    return parser_name, parse
@@ -0,0 +1,366 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# One token per match, alternatives tried in order. Comments, strings and
+# preprocessor lines come first so braces/semicolons inside them never count.
+TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<directive>(?<![^\n])[ \t]*\#(?:\\\r?\n|[^\n])*)
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<name>[A-Za-z_]\w*(?:\s*::\s*~?[A-Za-z_]\w*)*)
+  | (?P<number>\.?\d[\w.]*)
+  | (?P<op>\S)
+''', re.S | re.X)
+
+# Inside a function body only braces matter - skip everything else in C
+BODY_TOKEN = re.compile(r'''//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|[{}]''', re.S)
+
+DEFINE = re.compile(r'#\s*define\s+([A-Za-z_]\w*)')
+INCLUDE = re.compile(r'#\s*include\s*[<"]([^>"]+)[>"]')
+
+CLASS_KEYWORDS = {'class', 'struct', 'union'}
+SKIP_STATEMENTS = {'typedef', 'using', 'friend', 'static_assert', 'template', 'return'}
+SPECIFIERS = {'static', 'inline', 'virtual', 'extern', 'constexpr', 'explicit', 'friend', 'register'}
+ACCESS = {'public', 'private', 'protected'}
+
+
+class _Token:
+    __slots__ = ('kind', 'text', 'pos')
+
+    def __init__(self, kind, text, pos):
+        self.kind = kind
+        self.text = text
+        self.pos = pos
+
+
+class CExtractor:
+    """Single-pass, brace-aware extraction of C/C++/Arduino declarations
+
+    Not a compiler front end: it tokenizes once, tracks (), {} and class /
+    namespace scopes, and reads declarations at file and class level.
+    Function bodies are skipped with a regex that only looks at braces,
+    strings and comments, so large sketches cost little more than a read.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.functions = {}
+        self.classes = {}
+        self.method_lines = {}  # class -> {method: line}; `functions` is keyed by bare name
+        self.globals = {}
+        self.defines = {}
+        self.includes = []
+        self._line, self._line_pos = 1, 0
+
+    def line_at(self, pos: int) -> int:
+        # Positions only move forward, so count newlines incrementally
+        if pos < self._line_pos:
+            self._line, self._line_pos = 1, 0
+        self._line += self.content.count('\n', self._line_pos, pos)
+        self._line_pos = pos
+        return self._line
+
+    def extract(self):
+        content = self.content
+        scopes: List[Optional[str]] = [None]  # class name, or None for file / namespace level
+        statement: List[_Token] = []
+        parens = 0
+        pos = 0
+
+        while True:
+            match = TOKEN.search(content, pos)
+            if match is None:
+                break
+            pos = match.end()
+            kind = match.lastgroup
+            text = match.group()
+
+            if kind == 'comment':
+                continue
+            if kind == 'directive':
+                self._directive(text, match.start())
+                continue
+            if kind == 'name' and '::' in text:
+                text = re.sub(r'\s+', '', text)
+
+            token = _Token(kind, text, match.start())
+
+            if parens:
+                statement.append(token)
+                parens += {'(': 1, ')': -1}.get(text, 0)
+                continue
+
+            if text == '(':
+                parens = 1
+                statement.append(token)
+            elif text == ';':
+                self._statement(statement, scopes[-1])
+                statement = []
+            elif text == ':' and scopes[-1] and len(statement) == 1 and statement[0].text in ACCESS:
+                statement = []  # public: / private:
+            elif text == '{':
+                statement, pos = self._open_brace(statement, scopes, pos)
+            elif text == '}':
+                if len(scopes) > 1:
+                    closed = scopes.pop()
+                    # struct Foo { ... } foo; declares a variable after the brace
+                    statement = [_Token('type', closed, token.pos)] if closed else []
+                else:
+                    statement = []
+            else:
+                statement.append(token)
+
+        return self
+
+    def _directive(self, text, pos):
+        match = DEFINE.match(text.lstrip())
+        if match:
+            self.defines.setdefault(match.group(1), {'line_number': self.line_at(pos + text.index('#'))})
+            return
+        match = INCLUDE.match(text.lstrip())
+        if match:
+            self.includes.append(match.group(1))
+
+    def _open_brace(self, statement, scopes, pos) -> Tuple[List[_Token], int]:
+        """Decide what a '{' opens; returns the statement to continue and the scan position"""
+        words = [token.text for token in statement]
+        head = self._strip_template(words)
+        paren = self._first_paren(statement)
+        assigned = '=' in words[:paren if paren is not None else len(words)]
+
+        if head and head[0] in CLASS_KEYWORDS and paren is None and not assigned:
+            name = next((word for word in head[1:] if word not in ('final', 'alignas')
+                         and re.match(r'[A-Za-z_]', word)), None)
+            if name and head[0] != 'union' and words[0] != 'typedef':
+                self.classes.setdefault(name, [])
+                scopes.append(name)
+                return [], pos
+            # typedef struct { ... } Name; is a type, struct { ... } cfg; a variable
+            marker = 'typedef' if words[0] == 'typedef' else head[0]
+            return [_Token('type', marker, 0)], self._skip_block(pos)
+
+        if head[:1] == ['namespace'] or head[:2] == ['extern', '"C"']:
+            scopes.append(None)  # transparent: declarations inside are file level
+            return [], pos
+
+        if head[:1] == ['enum']:
+            return [_Token('type', 'enum', 0)], self._skip_block(pos)
+
+        if paren is not None and not assigned and not self._function_pointer(statement, paren):
+            self._function(statement, paren, scopes[-1], definition=True)
+            return [], self._skip_block(pos)
+
+        # Brace initializer (int pins[] = {2, 3}; Foo f{1};) - part of the statement
+        statement.append(_Token('op', '{}', pos))
+        return statement, self._skip_block(pos)
+
+    def _skip_block(self, pos) -> int:
+        """Position just after the '}' matching an already consumed '{'"""
+        depth = 1
+        content = self.content
+        while depth:
+            match = BODY_TOKEN.search(content, pos)
+            if match is None:
+                return len(content)
+            pos = match.end()
+            text = match.group()
+            if text == '{':
+                depth += 1
+            elif text == '}':
+                depth -= 1
+        return pos
+
+    @staticmethod
+    def _strip_template(words):
+        """Drop a leading template<...> so the declaration itself is seen"""
+        if words[:2] != ['template', '<']:
+            return words
+        depth = 0
+        for i, word in enumerate(words[1:], 1):
+            depth += {'<': 1, '>': -1}.get(word, 0)
+            if depth == 0:
+                return words[i + 1:]
+        return []
+
+    @staticmethod
+    def _first_paren(statement):
+        for i, token in enumerate(statement):
+            if token.text == '(':
+                return i
+        return None
+
+    def _function(self, statement, paren, class_name, definition):
+        if paren == 0 or statement[paren - 1].kind != 'name':
+            return  # operator(), casts, macros without a name
+        name_token = statement[paren - 1]
+        name = name_token.text
+        if paren >= 2 and statement[paren - 2].text == '~':
+            name = '~' + name
+
+        if '::' in name:
+            class_name, _, name = name.rpartition('::')
+            class_name = class_name.rsplit('::', 1)[-1]
+
+        return_words = [t.text for t in statement[:paren - 1]
+                        if t.text not in SPECIFIERS and t.text != '~']
+        return_words = self._strip_template(return_words)
+
+        if class_name:
+            methods = self.classes.setdefault(class_name, [])
+            if name not in methods:
+                methods.append(name)
+            lines = self.method_lines.setdefault(class_name, {})
+            if definition or name not in lines:
+                lines[name] = self.line_at(name_token.pos)
+
+        if definition:
+            self.functions.setdefault(name, {
+                'line_number': self.line_at(name_token.pos),
+                'return_type': self._type_string(return_words)
+            })
+
+    def _statement(self, statement, class_name):
+        """A declaration ended by ';' - prototype, method declaration or global"""
+        words = self._strip_template([token.text for token in statement])
+        if not words or words[0] in SKIP_STATEMENTS:
+            return
+        statement = statement[len(statement) - len(words):]
+
+        paren = self._first_paren(statement)
+        pointer = self._function_pointer(statement, paren) if paren else None
+        if pointer is not None:
+            if class_name is None:  # members are skipped like other member variables
+                name_token, var_type = pointer
+                self.globals.setdefault(name_token.text, {
+                    'line_number': self.line_at(name_token.pos),
+                    'type': var_type
+                })
+            return
+
+        assigned = '=' in words[:paren if paren is not None else len(words)]
+        if paren is not None and not assigned and self._is_prototype(statement, paren):
+            self._function(statement, paren, class_name, definition=False)
+            return
+
+        if class_name is not None:
+            return  # member variables
+
+        if words[0] in CLASS_KEYWORDS | {'enum'} and statement[0].kind == 'name' and len(words) == 2:
+            return  # forward declaration
+
+        var_type = ''
+        for i, part in enumerate(self._split_declarators(statement)):
+            names = [token for token in part if token.kind == 'name']
+            if not names or (i == 0 and len(part) < 2):
+                continue
+            name_token = names[-1]
+            if i == 0:
+                type_words = [t.text for t in part if t is not name_token and t.text not in SPECIFIERS]
+                var_type = self._type_string(type_words)
+            self.globals.setdefault(name_token.text, {
+                'line_number': self.line_at(name_token.pos),
+                'type': var_type
+            })
+
+    def _function_pointer(self, statement, paren):
+        """void (*cb)(int); / void (*handlers[4])(int) = {...}; -> (name token, 'void (*)(int)')"""
+        rest = statement[paren + 1:]
+        texts = [token.text for token in rest]
+        i = 1
+        while i < len(rest) and texts[i] == 'const':
+            i += 1
+        if texts[:1] != ['*'] or i >= len(rest) or rest[i].kind != 'name':
+            return None
+        name_token = rest[i]
+        i += 1
+        while i < len(rest) and texts[i] == '[':  # an array of them
+            i = texts.index(']', i) + 1 if ']' in texts[i:] else len(rest)
+        if texts[i:i + 2] != [')', '(']:
+            return None  # not a pointer to a function: int (*p)[4], void (*f(int))(int)
+
+        params, depth = [], 0
+        for text in texts[i + 2:]:
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            params.append(text)
+        return_words = [token.text for token in statement[:paren] if token.text not in SPECIFIERS]
+        return name_token, f"{self._type_string(return_words)} (*)({self._type_string(params)})"
+
+    @staticmethod
+    def _split_declarators(statement):
+        """'int a = 1, *b, c[4]' -> the part of each declarator before its initializer"""
+        parts, current, cut, depth = [], [], False, 0
+        for token in statement:
+            text = token.text
+            if text == '(':
+                depth += 1
+                cut = True  # DHT dht(PIN, TYPE): constructor arguments
+            elif text == ')':
+                depth -= 1
+            elif depth:
+                continue
+            elif text == ',':
+                parts.append(current)
+                current, cut = [], False
+            elif text in ('=', '[', '{}', ':'):
+                cut = True
+            elif not cut:
+                current.append(token)
+        parts.append(current)
+        return parts
+
+    @staticmethod
+    def _is_prototype(statement, paren):
+        """int f(int a); / void f(); vs. a global built with arguments: DHT dht(PIN, TYPE);"""
+        inside, depth = [], 0
+        for token in statement[paren + 1:]:
+            if token.text == '(':
+                depth += 1
+            elif token.text == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            inside.append(token)
+
+        if not inside or [t.text for t in inside] == ['void']:
+            return True
+        for previous, token in zip(inside, inside[1:]):
+            # Two names in a row ("int a") or a pointer/reference after a type
+            if previous.kind == 'name' and (token.kind == 'name' or token.text in ('*', '&')):
+                return True
+        return False
+
+    @staticmethod
+    def _type_string(words):
+        return (' '.join(words).replace(' *', '*').replace(' &', '&').replace(' <', '<').replace('< ', '<')
+                .replace(' >', '>').replace(' ,', ','))
+
+
+def _c_file_info(content, file_path, file_type):
+    extractor = CExtractor(content).extract()
+    return {
+        'file_path': file_path,
+        'type': file_type,
+        'classes': extractor.classes,
+        'method_lines': extractor.method_lines,
+        'functions': extractor.functions,
+        'globals': extractor.globals,
+        'defines': extractor.defines,
+        'includes': extractor.includes
+    }
+
+
+def parse_c_source(content: str, file_path: str) -> Dict:
+    """Functions, classes, globals, #defines and #includes of C/C++ source"""
+    return _c_file_info(content, file_path, 'cpp')
+
+
+def parse_arduino_source(content: str, file_path: str) -> Dict:
+    """Same as parse_c_source, plus whether the sketch has setup()/loop()"""
+    file_info = _c_file_info(content, file_path, 'arduino')
+    file_info['setup_loop'] = 'setup' in file_info['functions'] or 'loop' in file_info['functions']
+    return file_info
@@ -0,0 +1,108 @@
+import ast
+
+
+class CallCollector(ast.NodeVisitor):
+    """Records every call site as [caller symbol, callee name, line]
+
+    The caller is the enclosing 'Class.method' / 'function' ('<module>' at
+    top level). Callee names that start with an imported name are rewritten
+    to the full import, e.g. np.array -> numpy.array, so they can later be
+    resolved against the module index.
+    """
+    
+    def __init__(self, bindings):
+        self.bindings = bindings
+        self.scope = []
+        self.calls = []
+    
+    def _visit_scope(self, node):
+        # Decorators, bases and default values run in the enclosing scope
+        for child in node.decorator_list + getattr(node, 'bases', []):
+            self.visit(child)
+        if hasattr(node, 'args'):
+            self.visit(node.args)
+        
+        self.scope.append(node.name)
+        for child in node.body:
+            self.visit(child)
+        self.scope.pop()
+    
+    visit_ClassDef = _visit_scope
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    
+    def visit_Call(self, node):
+        callee = self._dotted_name(node.func)
+        if callee:
+            head, _, rest = callee.partition('.')
+            if head in self.bindings:
+                callee = self.bindings[head] + ('.' + rest if rest else '')
+            caller = '.'.join(self.scope) or '<module>'
+            self.calls.append([caller, callee, node.lineno])
+        self.generic_visit(node)
+    
+    def _dotted_name(self, node):
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None  # e.g. foo()() or obj[0].bar()
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+
+
+def parse_python_source(content, file_path):
+    """Classes, functions, imports and call sites of Python source"""
+    # Use AST to understand the code structure
+    tree = ast.parse(content)
+
+    file_info = {
+        'file_path': file_path,
+        'classes': {},
+        'method_lines': {},  # class -> {method: line}; `functions` is keyed by bare name
+        'functions': {},
+        'imports': [],
+        'calls': []
+    }
+    bindings = {}  # local name -> what it was imported as
+
+    # Extract classes and functions
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            class_name = node.name
+            methods = [n for n in node.body if isinstance(n, ast.FunctionDef)]
+            file_info['classes'][class_name] = [n.name for n in methods]
+            file_info['method_lines'][class_name] = {n.name: n.lineno for n in methods}
+
+        elif isinstance(node, ast.FunctionDef):
+            func_name = node.name
+            file_info['functions'][func_name] = {
+                'line_number': node.lineno
+            }
+
+        # Extract imports
+        elif isinstance(node, ast.Import):
+            for name in node.names:
+                file_info['imports'].append(name.name)
+                if name.asname:
+                    bindings[name.asname] = name.name
+                else:
+                    bindings[name.name.split('.')[0]] = name.name.split('.')[0]
+        elif isinstance(node, ast.ImportFrom):
+            # Relative imports keep their leading dots: from .a import b -> ".a.b"
+            module = '.' * node.level + (node.module or "")
+            for name in node.names:
+                if node.module:
+                    imported = f"{module}.{name.name}"
+                else:
+                    imported = f"{module}{name.name}"
+                file_info['imports'].append(imported)
+                bindings[name.asname or name.name] = imported
+
+    # Call sites (who calls what), for the call graph
+    collector = CallCollector(bindings)
+    collector.visit(tree)
+    file_info['calls'] = collector.calls
+
+    return file_info
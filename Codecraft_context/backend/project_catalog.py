@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from backend.file_lock import FileLock
+from backend.sharded_brain import INDEX_FILE, storage_bytes
+
+CATALOG_FILE = '.catalog.json'
+
+# project_meta.json fields copied into the catalog entry
+META_FIELDS = ('status', 'files_pending', 'analyzed_at', 'source_root', 'commit',
+               'files', 'symbols', 'brain_bytes', 'crawl_seconds')
+
+
+def brain_stats(project_map) -> Dict:
+    """File and symbol counts of a brain (functions - methods included - and classes)"""
+    symbols = sum(len(file_info.get('functions', {})) + len(file_info.get('classes', {}))
+                  for file_info in project_map.values())
+    return {'files': len(project_map), 'symbols': symbols}
+
+
+class ProjectCatalog:
+    """projects/.catalog.json: one entry per project, kept current on analyze / delete
+
+    Listing reads one small file (re-read only when it changes on disk, so
+    every worker process sees the others' updates) instead of walking the
+    projects directory. The ETag is a hash of the file. Changes re-read and
+    replace the file under a lock file, so concurrent updates from several
+    worker processes don't drop each other's entries.
+    """
+
+    def __init__(self, projects_dir: str):
+        self.projects_dir = projects_dir
+        self.path = os.path.join(projects_dir, CATALOG_FILE)
+        self.lock_path = f"{self.path}.lock"
+        self._loaded = None  # (mtime_ns, size, projects, etag)
+
+    def _read(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if self._loaded and self._loaded[:2] == (stat.st_mtime_ns, stat.st_size):
+            return self._loaded
+
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            projects = json.loads(raw)['projects']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+        self._loaded = (stat.st_mtime_ns, stat.st_size, projects, f'catalog-{hashlib.sha1(raw).hexdigest()[:16]}')
+        return self._loaded
+
+    def _write(self, projects: Dict):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'projects': projects}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _projects(self, locked: bool = False) -> Dict:
+        loaded = self._read()
+        if loaded is None:
+            if locked:
+                self._rebuild()
+            else:
+                self.rebuild()
+            loaded = self._read()
+        return loaded[2] if loaded else {}
+
+    def listing(self) -> Tuple[List[Dict], str]:
+        """(entries sorted by name, ETag) - both from the same read of the file"""
+        self._projects()
+        loaded = self._loaded
+        if loaded is None:
+            return [], 'catalog-empty'
+        return sorted(loaded[2].values(), key=lambda entry: entry['name']), loaded[3]
+
+    def get(self, project_name: str) -> Optional[Dict]:
+        return self._projects().get(project_name)
+
+    def entry(self, project_name: str, meta: Dict) -> Dict:
+        brain_file = os.path.join(self.projects_dir, project_name, INDEX_FILE)
+        if not os.path.exists(brain_file):
+            brain_file = os.path.join(self.projects_dir, project_name, 'project_brain.json')  # older projects
+        entry = {
+            'name': project_name,
+            'brain_file': brain_file,
+            'status': 'complete',
+            'files_pending': 0
+        }
+        entry.update((key, meta[key]) for key in META_FIELDS if key in meta)
+        return entry
+
+    def _fresh_projects(self) -> Dict:
+        """The catalog as on disk right now (call with the lock held)"""
+        self._loaded = None  # another worker may have replaced it within our stat granularity
+        return dict(self._projects(locked=True))
+
+    def update(self, project_name: str, meta: Dict):
+        with FileLock(self.lock_path):
+            projects = self._fresh_projects()
+            projects[project_name] = self.entry(project_name, meta)
+            self._write(projects)
+
+    def remove(self, project_name: str):
+        with FileLock(self.lock_path):
+            projects = self._fresh_projects()
+            if projects.pop(project_name, None) is not None:
+                self._write(projects)
+
+    def rebuild(self):
+        """Recreate the catalog from each project's meta file (first start, lost catalog)"""
+        with FileLock(self.lock_path):
+            self._rebuild()
+
+    def _rebuild(self):
+        projects = {}
+        for project_name in os.listdir(self.projects_dir):
+            project_path = os.path.join(self.projects_dir, project_name)
+            if project_name.startswith('.') or not os.path.isdir(project_path):
+                continue
+            try:
+                with open(os.path.join(project_path, 'project_meta.json'), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                meta = {}
+            if 'brain_bytes' not in meta:
+                meta['brain_bytes'] = storage_bytes(project_path)
+            projects[project_name] = self.entry(project_name, meta)
+        self._write(projects)
@@ -0,0 +1,229 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Set
+
+from backend.code_crawler import SKIP_DIRS
+from backend.parsers import is_code_file
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+RESCAN = object()  # backend lost events - the caller should re-check everything
+
+
+class InotifyBackend:
+    """Linux inotify through libc (no extra dependency); one watch per directory"""
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches = {}  # watch descriptor -> directory
+        self._watch_tree(root)
+
+    def _watch_tree(self, directory):
+        """Watch a directory and everything below it; returns code files found"""
+        found = []
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = root
+            found.extend(os.path.join(root, f) for f in files if is_code_file(f))
+        return found
+
+    def read(self, timeout: float):
+        """Absolute paths that changed within `timeout` seconds (or RESCAN)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed, offset = [], 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                return RESCAN
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if os.path.basename(path) in SKIP_DIRS:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may have landed before the new watch existed
+                    changed.extend(self._watch_tree(path))
+                changed.append(path)
+            elif is_code_file(path):
+                changed.append(path)
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Portable fallback: compare (mtime, size) snapshots of the code files"""
+
+    def __init__(self, root: str, stop_event: threading.Event):
+        self.root = root
+        self.stop_event = stop_event
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif is_code_file(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout: float):
+        if self.stop_event.wait(timeout):
+            return []
+
+        current = self._scan()
+        changed = [path for path, stamp in current.items() if self.snapshot.get(path) != stamp]
+        changed.extend(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class ProjectWatcher:
+    """Watches a project tree and reports debounced batches of changed paths
+
+    on_change receives a set of paths relative to the project root (files,
+    or directories that appeared/disappeared) once no new change has arrived
+    for `debounce` seconds, or after `max_delay` seconds of continuous churn
+    (think `git checkout`). None means events were lost and everything should
+    be re-checked.
+    """
+
+    def __init__(self, project_root: str, on_change: Callable[[Set[str]], None],
+                 debounce: float = 0.5, max_delay: float = 5.0, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+        self.project_root = os.path.abspath(project_root)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith('linux')
+        self.backend_name = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _make_backend(self):
+        if self.use_inotify:
+            try:
+                self.backend_name = 'inotify'
+                return InotifyBackend(self.project_root)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+        self.backend_name = 'polling'
+        return PollingBackend(self.project_root, self._stop)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        backend = self._make_backend()
+        self._thread = threading.Thread(target=self._run, args=(backend,), daemon=True,
+                                        name=f'watch:{self.project_root}')
+        self._thread.start()
+        print(f"👀 Watching {self.project_root} ({self.backend_name})")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop watching; from inside on_change this only signals (the thread can't join itself)"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _relative(self, paths: Iterable[str]) -> Set[str]:
+        return {os.path.relpath(path, self.project_root) for path in paths}
+
+    def _run(self, backend):
+        pending, rescan = set(), False
+        first_change = last_change = None
+
+        try:
+            while not self._stop.is_set():
+                timeout = self.poll_interval
+                if pending or rescan:
+                    timeout = min(timeout, max(0.05, self.debounce - (time.monotonic() - last_change)))
+
+                changed = backend.read(timeout)
+                now = time.monotonic()
+
+                if changed is RESCAN:
+                    rescan = True
+                elif changed:
+                    pending.update(self._relative(changed))
+                if changed:
+                    last_change = now
+                    first_change = first_change or now
+
+                quiet = last_change is not None and now - last_change >= self.debounce
+                overdue = first_change is not None and now - first_change >= self.max_delay
+                if (pending or rescan) and (quiet or overdue):
+                    batch = None if rescan else pending
+                    pending, rescan = set(), False
+                    first_change = last_change = None
+                    try:
+                        self.on_change(batch)
+                    except Exception as e:
+                        print(f"❌ Re-indexing after change failed: {e}")
+        finally:
+            backend.close()
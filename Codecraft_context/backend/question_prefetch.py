@@ -0,0 +1,85 @@
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from backend.brain_cache import load_cached, save_cached
+from backend.llm_queue import PREFETCH
+
+PREFETCH_FILE = 'prefetch.json'
+
+# What people ask first about a freshly analyzed project
+DEFAULT_TEMPLATES = (
+    "What's the main entry point of the application?",
+    "Give me an overview of the project's architecture.",
+)
+# Asked for each of the most central classes
+CLASS_TEMPLATE = "How does {name} work?"
+
+
+def normalize_question(question: str) -> str:
+    """Case, spacing and punctuation don't make a different question"""
+    return ' '.join(re.findall(r'\w+', question.lower()))
+
+
+def template_questions(project_map, graph_metrics: Dict, class_count: int = 5,
+                       templates: Sequence[str] = DEFAULT_TEMPLATES,
+                       class_template: str = CLASS_TEMPLATE) -> List[str]:
+    """The fixed templates, plus class_template for the top classes by file PageRank (then size)"""
+    files = graph_metrics.get('files', {})
+    classes = []
+    for file_path, info in project_map.items():
+        rank = files.get(file_path, {}).get('pagerank', 0)
+        for class_name, methods in info.get('classes', {}).items():
+            classes.append((-rank, -len(methods), class_name))
+
+    questions = list(templates)
+    for _, _, class_name in sorted(classes):
+        if len(questions) - len(templates) >= class_count:
+            break
+        question = class_template.format(name=class_name)
+        if question not in questions:
+            questions.append(question)
+    return questions
+
+
+def load_prefetched(cache_file: str, version: Optional[str]) -> Dict:
+    """normalized question -> {'question', 'context'[, 'answer']} for this brain version"""
+    if not version:
+        return {}
+    return load_cached(cache_file, version) or {}
+
+
+class QuestionPrefetcher:
+    """Precomputes retrieval contexts (and optionally answers) for likely first questions
+
+    Results are saved next to the brain after every question, keyed by the
+    brain version, so AIHelper serves the early ones warm while later ones
+    are still running. Answers go through the LLM queue at PREFETCH
+    priority: a user's question asked in the same worker process takes the
+    next free slot. Other workers have queues of their own, so their
+    questions only compete with prefetch calls at Ollama, in arrival order.
+    """
+
+    def __init__(self, helper, cache_file: str, answers: bool = False):
+        self.helper = helper
+        self.cache_file = cache_file
+        self.answers = answers
+
+    def run(self, questions: Sequence[str], stop_event: Optional[threading.Event] = None) -> Dict:
+        version = self.helper.brain_version
+        entries = load_prefetched(self.cache_file, version)
+        for question in questions:
+            if stop_event is not None and stop_event.is_set():
+                break
+            key = normalize_question(question)
+            entry = dict(entries.get(key) or {'question': question})
+            if 'context' not in entry:
+                entry['context'] = self.helper.get_intelligent_context(question)
+            if self.answers and 'answer' not in entry:
+                answer = self.helper.ask_ollama(question, entry['context'], priority=PREFETCH)
+                if not answer.startswith('❌'):  # errors (Ollama down) are not worth keeping
+                    entry['answer'] = answer
+            if entry != entries.get(key):
+                entries[key] = entry
+                save_cached(self.cache_file, version, entries)
+        return entries
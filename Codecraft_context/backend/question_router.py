@@ -0,0 +1,197 @@
+import re
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from backend.metrics import REGISTRY
+
+# Where a question is answered
+PREFETCHED, INDEX, SMALL, LARGE = 'prefetched', 'index', 'small', 'large'
+ROUTES = (PREFETCHED, INDEX, SMALL, LARGE)
+
+# Questions about reasoning or design need the large model whatever their length
+COMPLEX_WORDS = {
+    'why', 'design', 'architecture', 'architectural', 'refactor', 'refactoring', 'improve', 'optimize',
+    'compare', 'tradeoff', 'tradeoffs', 'trade', 'should', 'better', 'best', 'explain', 'overview',
+    'relationship', 'relationships', 'interact', 'interacts', 'flow', 'bug', 'bugs', 'fix', 'debug',
+    'performance', 'security', 'scalable', 'alternative', 'alternatives', 'pros', 'cons'
+}
+
+QUESTION_SECONDS = REGISTRY.histogram(
+    'codecraft_question_seconds', 'Time to answer a question, by route', ['route']
+)
+
+_SYMBOL = r'`?([A-Za-z_][\w.]*?)`?(?:\(\))?'
+_END = r'\s*[?.!]*$'
+DEFINITION_PATTERNS = [
+    re.compile(r'^where\s+(?:is|are)\s+(?:the\s+)?(?:class\s+|function\s+|method\s+)?' + _SYMBOL
+               + r'(?:\s+(?:defined|declared|implemented|located))?' + _END, re.I),
+    re.compile(r'^(?:which|what)\s+file\s+(?:defines|contains|has|declares)\s+(?:the\s+)?'
+               r'(?:class\s+|function\s+|method\s+)?' + _SYMBOL + _END, re.I),
+    re.compile(r'^find\s+(?:the\s+)?(?:class\s+|function\s+|method\s+)?' + _SYMBOL + _END, re.I),
+]
+CALLERS_PATTERNS = [
+    re.compile(r'^(?:who|what|which\s+functions?)\s+calls?\s+' + _SYMBOL + _END, re.I),
+    re.compile(r'^(?:list\s+|show\s+)?(?:the\s+)?callers\s+of\s+' + _SYMBOL + _END, re.I),
+]
+CALLEES_PATTERNS = [
+    re.compile(r'^what\s+(?:functions\s+)?does\s+' + _SYMBOL + r'\s+call' + _END, re.I),
+]
+_KIND = r'(classes|functions|methods|imports)'
+_FILE = r'(?:the\s+)?(?:file\s+)?`?([\w./\\-]+\.\w+)`?'
+LISTING_PATTERNS = [
+    re.compile(r'^(?:list|show)\s+(?:me\s+)?(?:all\s+)?(?:the\s+)?' + _KIND + r'\s+(?:in|of|from)\s+' + _FILE + _END,
+               re.I),
+    re.compile(r'^(?:what|which)\s+(?:are\s+)?(?:all\s+)?(?:the\s+)?' + _KIND
+               + r'\s+(?:are\s+)?(?:there\s+)?(?:in|of|defined\s+in)\s+' + _FILE + _END, re.I),
+    re.compile(r'^what\s+' + _KIND + r'\s+does\s+' + _FILE + r'\s+(?:have|contain|define|import)' + _END, re.I),
+]
+
+
+class RouteStats:
+    """Recent latencies per route (count, mean, p50, p95) for /api/ask/stats; also fed to /metrics"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = {}  # route -> deque of seconds
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, seconds: float):
+        QUESTION_SECONDS.observe(seconds, route=route)
+        with self._lock:
+            self._samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+            self._counts[route] = self._counts.get(route, 0) + 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            samples = {route: sorted(values) for route, values in self._samples.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for route, values in samples.items():
+            summary[route] = {
+                'count': counts[route],
+                'mean_ms': round(1000 * sum(values) / len(values), 2),
+                'p50_ms': round(1000 * values[len(values) // 2], 2),
+                'p95_ms': round(1000 * values[min(len(values) - 1, int(len(values) * 0.95))], 2)
+            }
+        return summary
+
+
+class QuestionRouter:
+    """Picks the cheapest route that answers a question as well as the large model would
+
+    - index: lookups ("where is X defined", "who calls X", "list the classes
+      in foo.py") are answered from the brain and call graph, no LLM call;
+      only whole-question matches without design / reasoning words count
+    - small: short questions (at most small_max_words words, no design /
+      reasoning words) whose retrieved context fits in small_max_context
+      characters go to small_model
+    - large: everything else, exactly as before routing existed
+    """
+
+    def __init__(self, large_model: str = 'codellama:7b', small_model: Optional[str] = None,
+                 small_max_words: int = 12, small_max_context: int = 4000, lookups: bool = True,
+                 stats: Optional[RouteStats] = None):
+        self.large_model = large_model
+        self.small_model = small_model or None
+        self.small_max_words = small_max_words
+        self.small_max_context = small_max_context
+        self.lookups = lookups
+        self.stats = stats or RouteStats()
+
+    def model_for(self, question: str, context: str) -> str:
+        """SMALL or LARGE, once the context is known"""
+        words = re.findall(r'\w+', question.lower())
+        if (self.small_model and len(words) <= self.small_max_words
+                and not COMPLEX_WORDS.intersection(words) and len(context) <= self.small_max_context):
+            return SMALL
+        return LARGE
+
+    def model_name(self, route: str) -> str:
+        return self.small_model if route == SMALL else self.large_model
+
+    def answer_lookup(self, question: str, project_map, call_graph=None) -> Optional[str]:
+        """The answer to a lookup-style question straight from the brain, None if it isn't one"""
+        if not self.lookups or COMPLEX_WORDS.intersection(re.findall(r'\w+', question.lower())):
+            return None  # a design question that happens to name a file or symbol
+        question = question.strip()
+
+        for pattern in LISTING_PATTERNS:
+            match = pattern.match(question)
+            if match:
+                return self._listing(match.group(1).lower(), match.group(2), project_map)
+        for pattern in DEFINITION_PATTERNS:
+            match = pattern.match(question)
+            if match:
+                return self._definition(match.group(1), project_map)
+        if call_graph is not None:
+            for pattern in CALLERS_PATTERNS:
+                match = pattern.match(question)
+                if match:
+                    return self._calls(match.group(1), call_graph.callers_of, 'is called by', 'caller')
+            for pattern in CALLEES_PATTERNS:
+                match = pattern.match(question)
+                if match:
+                    return self._calls(match.group(1), call_graph.callees_of, 'calls', 'callee')
+        return None
+
+    @staticmethod
+    def _find_file(name: str, project_map) -> Optional[str]:
+        name = name.replace('\\', '/')
+        if name in project_map:
+            return name
+        matches = [path for path in project_map
+                   if path.replace('\\', '/') == name or path.replace('\\', '/').endswith('/' + name)]
+        return min(matches, key=len) if matches else None
+
+    def _listing(self, kind: str, file_name: str, project_map) -> Optional[str]:
+        file_path = self._find_file(file_name, project_map)
+        if file_path is None:
+            return None
+        info = project_map[file_path]
+        if kind == 'classes':
+            names = list(info.get('classes', {}))
+        elif kind == 'methods':
+            names = [f"{class_name}.{method}" for class_name, methods in info.get('classes', {}).items()
+                     for method in methods]
+        elif kind == 'functions':
+            methods = {method for methods in info.get('classes', {}).values() for method in methods}
+            names = [name for name in info.get('functions', {}) if name not in methods]
+        else:
+            names = list(info.get('imports', []))
+        if not names:
+            return f"{file_path} has no {kind}."
+        return f"{kind.capitalize()} in {file_path}:\n" + "\n".join(f"- {name}" for name in names)
+
+    def _definition(self, symbol: str, project_map) -> Optional[str]:
+        class_name, _, member = symbol.rpartition('.')
+        found = []
+        for file_path, info in project_map.items():
+            classes = info.get('classes', {})
+            functions = info.get('functions', {})
+            if not class_name and symbol in classes:
+                found.append(f"- class {symbol} in {file_path}")
+            if class_name and member in classes.get(class_name, ()):
+                method_lines = info.get('method_lines')
+                line = (method_lines.get(class_name, {}).get(member) if method_lines is not None
+                        else functions.get(member, {}).get('line_number'))
+                found.append(f"- {symbol} in {file_path}" + (f" (line {line})" if line else ''))
+            elif not class_name and symbol in functions:
+                line = functions[symbol].get('line_number')
+                owner = next((name for name, methods in classes.items() if symbol in methods), None)
+                label = f"method {owner}.{symbol}" if owner else f"function {symbol}"
+                found.append(f"- {label} in {file_path}" + (f" (line {line})" if line else ''))
+        if not found:
+            return None  # not a project symbol - let the LLM make sense of the question
+        return f"{symbol} is defined in:\n" + "\n".join(found)
+
+    @staticmethod
+    def _calls(symbol: str, lookup, verb: str, side: str) -> Optional[str]:
+        calls = lookup(symbol)
+        if not calls:
+            return None
+        lines = [f"- {call[side]} (line {call['line']})" if side == 'caller' else f"- {call[side]}"
+                 for call in calls[:50]]
+        more = f"\n... and {len(calls) - 50} more" if len(calls) > 50 else ''
+        return f"{symbol} {verb}:\n" + "\n".join(dict.fromkeys(lines)) + more
@@ -0,0 +1,214 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from typing import Dict, List, Optional, Set
+
+DEFAULT_PROFILE_DIR = os.path.join('projects', '.profiles')
+TOP_N = 15
+
+# ?profile= / X-Codecraft-Profile: values -> what to capture
+MODES = {
+    '1': {'cpu'}, 'true': {'cpu'}, 'cpu': {'cpu'},
+    'memory': {'memory'}, 'mem': {'memory'},
+    'all': {'cpu', 'memory'}, 'cpu,memory': {'cpu', 'memory'},
+}
+
+# Memory-profiled requests in flight; tracemalloc is process-wide, so the last one stops it
+_tracemalloc_users = 0
+_tracemalloc_ours = False  # started by us, not by PYTHONTRACEMALLOC or a debugger
+_tracemalloc_lock = threading.Lock()
+# One cProfile at a time: Python 3.12+ raises ValueError for a second active profiler
+_cpu_profile_lock = threading.Lock()
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_ours
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            _tracemalloc_ours = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_ours
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_ours:
+            tracemalloc.stop()
+            _tracemalloc_ours = False
+
+
+class ProfileSession:
+    """cProfile and/or tracemalloc running around one request
+
+    While another request (or a debugger) holds the CPU profiler, the
+    session captures memory only - `modes` says what was actually captured.
+    """
+
+    def __init__(self, modes: Set[str]):
+        self.modes = set(modes)
+        self.started = time.perf_counter()
+        self.profiler = None
+        self.snapshot = None
+        self.duration = 0.0
+        self.stopped = False
+
+        if 'memory' in self.modes:
+            # Process-wide: allocations of concurrent requests show up too
+            _start_tracemalloc()
+        if 'cpu' in self.modes:
+            self.modes.discard('cpu')
+            if _cpu_profile_lock.acquire(blocking=False):
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:  # another profiling tool is active
+                    _cpu_profile_lock.release()
+                else:
+                    self.profiler = profiler
+                    self.modes.add('cpu')
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        if self.profiler:
+            self.profiler.disable()
+            _cpu_profile_lock.release()
+        if 'memory' in self.modes:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            _stop_tracemalloc()
+        self.duration = time.perf_counter() - self.started
+
+    def top_functions(self, by: str = 'cumulative') -> List[Dict]:
+        """Heaviest functions by cumulative time (call chains) or own time ('total', hot spots)"""
+        stats = pstats.Stats(self.profiler)
+        column = 3 if by == 'cumulative' else 2
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:TOP_N]
+        return [{
+            'function': f"{function} ({file_name}:{line})",
+            'calls': calls,
+            'total_time': round(total_time, 6),
+            'cumulative_time': round(cumulative_time, 6)
+        } for (file_name, line, function), (_, calls, total_time, cumulative_time, _) in rows]
+
+    def top_allocations(self) -> List[Dict]:
+        return [{
+            'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count
+        } for stat in self.snapshot.statistics('lineno')[:TOP_N]]
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the last `keep` captures on disk
+
+    Each capture is <id>.json (summary) plus <id>.prof (pstats, open with
+    snakeviz / pstats) and/or <id>.snapshot (tracemalloc.Snapshot.load).
+    """
+
+    def __init__(self, profile_dir: str = DEFAULT_PROFILE_DIR, keep: int = 50,
+                 sample_rate: float = 0.0, enabled: bool = True):
+        self.profile_dir = profile_dir
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def modes_for(self, flag: Optional[str]) -> Optional[Set[str]]:
+        """What to capture for a request's profile flag (None = don't profile)"""
+        if not self.enabled:
+            return None
+        if flag:
+            return MODES.get(flag.strip().lower())
+        if self.sample_rate and random.random() < self.sample_rate:
+            return {'cpu'}
+        return None
+
+    def start(self, modes: Set[str]) -> Optional[ProfileSession]:
+        """A running session, or None if none of the modes can be captured right now"""
+        session = ProfileSession(modes)
+        if not session.modes:
+            session.stop()
+            return None
+        return session
+
+    def save(self, session: ProfileSession, method: str, path: str, status: int) -> Dict:
+        session.stop()
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', path).strip('-')[:60] or 'root'
+        now = time.time()
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        capture_id = f"{stamp}-{slug}-{uuid.uuid4().hex[:6]}"
+        base = os.path.join(self.profile_dir, capture_id)
+
+        summary = {
+            'id': capture_id,
+            'method': method,
+            'path': path,
+            'status': status,
+            'captured_at': time.time(),
+            'duration_ms': round(session.duration * 1000, 2),
+            'modes': sorted(session.modes),
+            'files': []
+        }
+        if session.profiler:
+            session.profiler.dump_stats(f"{base}.prof")
+            summary['files'].append(f"{capture_id}.prof")
+            summary['top_functions'] = session.top_functions('cumulative')
+            summary['hot_functions'] = session.top_functions('total')
+        if session.snapshot:
+            session.snapshot.dump(f"{base}.snapshot")
+            summary['files'].append(f"{capture_id}.snapshot")
+            summary['top_allocations'] = session.top_allocations()
+
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        self._rotate()
+        print(f"🔬 Profiled {method} {path} in {summary['duration_ms']} ms -> {capture_id}")
+        return summary
+
+    def _summaries(self) -> List[str]:
+        try:
+            names = os.listdir(self.profile_dir)
+        except FileNotFoundError:
+            return []
+        # Ids start with a timestamp, so name order is capture order
+        return sorted(name for name in names if name.endswith('.json'))
+
+    def _rotate(self):
+        with self._lock:
+            summaries = self._summaries()
+            for name in summaries[:max(0, len(summaries) - self.keep)]:
+                capture_id = name[:-len('.json')]
+                for suffix in ('.json', '.prof', '.snapshot'):
+                    try:
+                        os.remove(os.path.join(self.profile_dir, capture_id + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def list_captures(self, limit: int = 20) -> List[Dict]:
+        """Newest captures first, with their top functions / allocation sites"""
+        captures = []
+        for name in reversed(self._summaries()):
+            if len(captures) >= limit:
+                break
+            try:
+                with open(os.path.join(self.profile_dir, name), 'r', encoding='utf-8') as f:
+                    captures.append(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue  # rotated away while listing
+        return captures
@@ -0,0 +1,400 @@
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterator, Optional
+
+from backend.brain_cache import combine_digests, file_digest
+from backend.file_lock import FileLock
+
+# projects/<name>/brain_index.json   header: version, shard list, path -> (shard, offset, length), digests
+# projects/<name>/brain/<gen>-0000.ndjson, ...   one {"path": ..., "info": ...} line per file
+INDEX_FILE = 'brain_index.json'
+SHARD_DIR = 'brain'
+FORMAT = 1
+SHARD_BYTES = 8 * 1024 * 1024
+STALE_SHARD_SECONDS = 3600  # shards of writers that never published (crashed, aborted)
+PUBLISH_LOCK = '.publish.lock'  # in the shard directory: one header swap (and shard cleanup) at a time
+
+
+class BrainWriter:
+    """Writes a brain one file at a time: NDJSON shards, then the index header
+
+    Only the per-file index (path, offsets, digest) stays in memory. Shards
+    get a fresh generation prefix and the header is replaced last, so readers
+    see either the old brain or the new one; older shards are removed after.
+
+    With patch=True only the files added (or remove()d) are written: the new
+    header keeps pointing at the stored brain's shards for everything else.
+    Once shards hold more replaced records than live ones, the live records
+    are copied (as raw bytes, not decoded) into fresh shards.
+    """
+
+    def __init__(self, project_dir: str, shard_bytes: int = SHARD_BYTES, patch: bool = False):
+        self.project_dir = project_dir
+        self.shard_dir = os.path.join(project_dir, SHARD_DIR)
+        self.shard_bytes = shard_bytes
+        self.patch = patch
+        self.generation = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.shards = []
+        self.files: Dict[str, list] = {}
+        self.digests: Dict[str, str] = {}
+        self.removed = set()
+        self._created = []  # every shard this writer wrote, published or not
+        self._file = None
+        self._offset = 0
+        os.makedirs(self.shard_dir, exist_ok=True)
+
+    def _next_shard(self):
+        if self._file:
+            self._file.close()
+        name = f"{self.generation}-{len(self.shards):04d}.ndjson"
+        self.shards.append(name)
+        self._created.append(name)
+        self._file = open(os.path.join(self.shard_dir, name), 'wb')
+        self._offset = 0
+
+    def add(self, file_path: str, file_info: Dict):
+        if file_path in self.files:
+            raise ValueError(f"{file_path} written twice")
+        if self._file is None or self._offset >= self.shard_bytes:
+            self._next_shard()
+
+        line = json.dumps({'path': file_path, 'info': file_info}, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8') + b'\n'
+        self._file.write(line)
+        self.files[file_path] = [len(self.shards) - 1, self._offset, len(line)]
+        self.digests[file_path] = file_digest(file_info)
+        self.removed.discard(file_path)
+        self._offset += len(line)
+
+    def _write_raw(self, file_path: str, line: bytes, digest: str):
+        if self._file is None or self._offset >= self.shard_bytes:
+            self._next_shard()
+        self._file.write(line)
+        self.files[file_path] = [len(self.shards) - 1, self._offset, len(line)]
+        self.digests[file_path] = digest
+        self._offset += len(line)
+
+    def remove(self, file_path: str):
+        """Patch: drop a file of the stored brain"""
+        self.files.pop(file_path, None)
+        self.digests.pop(file_path, None)
+        self.removed.add(file_path)
+
+    def close(self) -> 'ShardedBrain':
+        """Publish the brain (atomic header swap) and return a reader for it"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+        index_file = os.path.join(self.project_dir, INDEX_FILE)
+        with FileLock(os.path.join(self.shard_dir, PUBLISH_LOCK)):
+            try:
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    current = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                current = {}
+            superseded = current.get('shards', [])
+            if self.patch and current:
+                self._merge(current)
+
+            tmp_file = f"{index_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'format': FORMAT,
+                    'version': combine_digests(self.digests),
+                    'generation': self.generation,
+                    'shards': self.shards,
+                    'files': self.files,
+                    'digests': self.digests
+                }, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, index_file)
+            brain = ShardedBrain(self.project_dir)
+            self._remove_old_shards(superseded + self._created)  # incl. a patch's shard copied by _compact
+        return brain
+
+    def _merge(self, current: Dict):
+        """Patch: the published brain (whatever wrote it last), with this writer's files on top"""
+        base_shards = current['shards']
+        files = {path: location for path, location in current['files'].items() if path not in self.removed}
+        digests = current.get('digests') or {}
+        digests = {path: digests.get(path) for path in files}
+        for path, (shard, offset, length) in self.files.items():
+            files[path] = [len(base_shards) + shard, offset, length]
+            digests[path] = self.digests[path]
+        shards = base_shards + self.shards
+
+        # Keep only the shards something still points at, renumbered
+        used = sorted({location[0] for location in files.values()})
+        renumber = {old: new for new, old in enumerate(used)}
+        self.shards = [shards[i] for i in used]
+        self.files = {path: [renumber[shard], offset, length] for path, (shard, offset, length) in files.items()}
+        if any(digest is None for digest in digests.values()):  # header written before digests were stored
+            with ShardedBrain(self.project_dir, header=self._header()) as brain:
+                digests = {path: digest or file_digest(brain[path]) for path, digest in digests.items()}
+        self.digests = digests
+
+        live = sum(length for _, _, length in self.files.values())
+        stored = sum(self._shard_size(name) for name in self.shards)
+        if stored - live > max(live, self.shard_bytes) or len(self.shards) > 2 * (live // self.shard_bytes) + 16:
+            self._compact()
+
+    def _header(self) -> Dict:
+        return {'format': FORMAT, 'version': '', 'shards': self.shards, 'files': self.files}
+
+    def _shard_size(self, name: str) -> int:
+        try:
+            return os.path.getsize(os.path.join(self.shard_dir, name))
+        except OSError:
+            return 0
+
+    def _compact(self):
+        """Copy the live records, in storage order, into fresh shards of this generation"""
+        old_shards, old_files = self.shards, self.files
+        self.shards, self.files = [], {}
+        self.generation = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        records = sorted(old_files.items(), key=lambda item: item[1])
+        for shard, group in itertools.groupby(records, key=lambda item: item[1][0]):
+            with open(os.path.join(self.shard_dir, old_shards[shard]), 'rb') as f:
+                for path, (_, offset, length) in group:
+                    f.seek(offset)
+                    self._write_raw(path, f.read(length), self.digests[path])
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def abort(self):
+        """Drop what was written (e.g. the crawl failed); the published brain stays"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        for name in self._created:
+            try:
+                os.remove(os.path.join(self.shard_dir, name))
+            except OSError:
+                pass
+
+    def _remove_old_shards(self, superseded):
+        """Shards the new header doesn't use, plus leftovers of writers that never published
+
+        Shards of another writer still in progress are recent, so they stay.
+        """
+        current = set(self.shards)
+        stale_before = time.time() - STALE_SHARD_SECONDS
+        for name in os.listdir(self.shard_dir):
+            if name in current or not name.endswith('.ndjson'):
+                continue
+            path = os.path.join(self.shard_dir, name)
+            try:
+                if name in superseded or os.path.getmtime(path) < stale_before:
+                    os.remove(path)
+            except OSError:
+                pass  # still open elsewhere (Windows) - a later write retries
+
+
+def write_sharded_brain(project_dir: str, project_map) -> 'ShardedBrain':
+    writer = BrainWriter(project_dir)
+    try:
+        for file_path, file_info in project_map.items():
+            writer.add(file_path, file_info)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+class ShardedBrain(Mapping):
+    """Read-only brain over the shards: path -> file info, decoded per access
+
+    Only the header is loaded; brain[path] seeks to one record and items()
+    streams the shards in order, so memory stays flat whatever the size.
+    All shards are opened up front, so a concurrent re-write (which deletes
+    the old generation) cannot pull files out from under a reader.
+    """
+
+    def __init__(self, project_dir: str, header: Optional[Dict] = None):
+        self.project_dir = project_dir
+        for attempt in range(3):
+            if header is None or attempt:
+                with open(os.path.join(project_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+                    header = json.load(f)
+            if header.get('format') != FORMAT:
+                raise ValueError(f"Unsupported brain format {header.get('format')}")
+
+            self._shards = []
+            try:
+                for name in header['shards']:
+                    self._shards.append(open(os.path.join(project_dir, SHARD_DIR, name), 'rb'))
+                break
+            except FileNotFoundError:
+                # The header was replaced between reading it and opening its shards
+                self.close()
+                if attempt == 2:
+                    raise
+        self.version: str = header['version']
+        self.files: Dict[str, list] = header['files']
+        self._digests: Optional[Dict[str, str]] = header.get('digests')
+        self._lock = threading.Lock()
+
+    @property
+    def digests(self) -> Dict[str, str]:
+        """path -> file_digest(), to tell which files differ between two brains without decoding them"""
+        if self._digests is None:  # header written before digests were stored
+            self._digests = {file_path: file_digest(file_info) for file_path, file_info in self.items()}
+        return self._digests
+
+    def _read(self, shard: int, offset: int, length: int) -> Dict:
+        with self._lock:
+            handle = self._shards[shard]
+            handle.seek(offset)
+            raw = handle.read(length)
+        return json.loads(raw)
+
+    def __getitem__(self, file_path: str) -> Dict:
+        location = self.files[file_path]
+        return self._read(*location)['info']
+
+    def __contains__(self, file_path) -> bool:
+        return file_path in self.files
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def items(self):
+        """(path, info) in storage order - sequential reads, one shard in memory at a time
+
+        Records a patch replaced or removed stay in their shard until it is
+        compacted; only those the header points at are decoded.
+        """
+        live = {}
+        for shard, offset, _ in self.files.values():
+            live.setdefault(shard, set()).add(offset)
+        for shard, handle in enumerate(self._shards):
+            with self._lock:
+                handle.seek(0)
+                lines = handle.readlines()
+            offsets = live.get(shard, ())
+            offset = 0
+            for line in lines:
+                if offset in offsets:
+                    record = json.loads(line)
+                    yield record['path'], record['info']
+                offset += len(line)
+
+    def values(self):
+        return (file_info for _, file_info in self.items())
+
+    def to_dict(self) -> Dict:
+        """The whole brain as plain dicts (e.g. to patch it and write it back)"""
+        return dict(self.items())
+
+    def close(self):
+        for handle in self._shards:
+            handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BrainPatch(MutableMapping):
+    """Changes to a stored brain, held apart until apply() writes only them
+
+    Reads fall through to the stored brain, so CodeCrawler.update_files can
+    patch it like the plain dict; unchanged files are never decoded, kept
+    or copied. Close it (or apply it) to release the stored brain's shards.
+    """
+
+    def __init__(self, base: ShardedBrain):
+        self.base = base
+        self.changed: Dict[str, Dict] = {}
+        self.removed = set()
+
+    def __getitem__(self, file_path: str) -> Dict:
+        if file_path in self.changed:
+            return self.changed[file_path]
+        if file_path in self.removed:
+            raise KeyError(file_path)
+        return self.base[file_path]
+
+    def __setitem__(self, file_path: str, file_info: Dict):
+        self.changed[file_path] = file_info
+        self.removed.discard(file_path)
+
+    def __delitem__(self, file_path: str):
+        if file_path not in self:
+            raise KeyError(file_path)
+        self.changed.pop(file_path, None)
+        if file_path in self.base.files:
+            self.removed.add(file_path)
+
+    def __contains__(self, file_path) -> bool:
+        return file_path in self.changed or (file_path in self.base.files and file_path not in self.removed)
+
+    def __iter__(self) -> Iterator[str]:
+        for file_path in self.base.files:
+            if file_path not in self.removed and file_path not in self.changed:
+                yield file_path
+        yield from self.changed
+
+    def __len__(self) -> int:
+        stored = sum(1 for file_path in self.base.files if file_path not in self.removed)
+        return stored + sum(1 for file_path in self.changed if file_path not in self.base.files)
+
+    def apply(self) -> ShardedBrain:
+        """Write the changed files and publish; returns the new brain (the stored one is closed)"""
+        writer = BrainWriter(self.base.project_dir, patch=True)
+        try:
+            for file_path, file_info in self.changed.items():
+                writer.add(file_path, file_info)
+            for file_path in self.removed:
+                writer.remove(file_path)
+        except BaseException:
+            writer.abort()
+            raise
+        self.close()
+        return writer.close()
+
+    def close(self):
+        self.base.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_brain(project_dir: str) -> Optional[ShardedBrain]:
+    """The sharded brain of a project directory, None if it has none yet"""
+    try:
+        return ShardedBrain(project_dir)
+    except FileNotFoundError:
+        return None
+
+
+def storage_bytes(project_dir: str) -> int:
+    """Size on disk of a project's brain (header + shards, or a legacy project_brain.json)"""
+    index_file = os.path.join(project_dir, INDEX_FILE)
+    if not os.path.exists(index_file):
+        legacy = os.path.join(project_dir, 'project_brain.json')
+        return os.path.getsize(legacy) if os.path.exists(legacy) else 0
+
+    total = os.path.getsize(index_file)
+    with open(index_file, 'r', encoding='utf-8') as f:
+        shards = json.load(f)['shards']
+    for name in shards:
+        try:
+            total += os.path.getsize(os.path.join(project_dir, SHARD_DIR, name))
+        except FileNotFoundError:
+            pass
+    return total
@@ -1,13 +1,19 @@
 import ast
 import re
 from typing import Dict, List
-import numpy as np
-from sklearn.ensemble import IsolationForest  # ML for anomaly detection
 
 class SmartAnalyzer:
     def __init__(self):
         self.bug_patterns = self._load_bug_patterns()
-        self.ml_model = IsolationForest(contamination=0.1)
+        self._ml_model = None
+    
+    @property
+    def ml_model(self):
+        """Build the anomaly model on first use (scikit-learn is slow to import)"""
+        if self._ml_model is None:
+            from sklearn.ensemble import IsolationForest  # ML for anomaly detection
+            self._ml_model = IsolationForest(contamination=0.1)
+        return self._ml_model
     
     def _load_bug_patterns(self):
         """Hard-coded expert knowledge of common bugs"""
@@ -32,7 +38,7 @@ class SmartAnalyzer:
             ]
         }
     
-    def analyze_code_quality(self, code: str, file_path: str) -> List[Dict]:
+    def analyze_code_quality(self, code: str, file_path: str, include_ml: bool = True) -> List[Dict]:
         """HARD: Static analysis that finds bugs automatically"""
         issues = []
         
@@ -46,7 +52,8 @@ class SmartAnalyzer:
             issues.extend(self._pattern_analysis(code, file_path))
             
             # ML-based anomaly detection
-            issues.extend(self._ml_analysis(code, file_path))
+            if include_ml:
+                issues.extend(self._ml_analysis(code, file_path))
             
         except SyntaxError as e:
             issues.append({
@@ -0,0 +1,198 @@
+import base64
+import bisect
+import heapq
+from array import array
+from typing import Dict, List, Optional
+
+KINDS = ('class', 'function', 'method', 'file')
+
+# Rank: exact name > name prefix > match at a word start > any substring
+EXACT, PREFIX, WORD, SUBSTRING = 100, 80, 60, 40
+# Caps that keep very common prefixes / trigrams (e.g. 'get') within a few ms
+MAX_PREFIX_SCAN = 5000
+MAX_VERIFY = 5000
+
+SEPARATORS = '._/-:'
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _pack(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+
+def _unpack(encoded: str, typecode: str = 'I') -> array:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(encoded))
+    return values
+
+
+class SymbolIndex:
+    """Prefix + trigram index over a brain's classes, methods, functions and files
+
+    Symbols are columns (name, qualified name, kind, file, line). Prefix
+    lookups bisect a sorted list of lower-cased keys (bare and qualified
+    names, file names and paths); substring lookups scan the shortest
+    trigram posting list of the query and verify each candidate.
+    """
+
+    def __init__(self, data: Dict):
+        self.names: List[str] = data['names']
+        self.qualified: List[str] = data['qualified']
+        self.kinds = data['kinds']
+        self.files: List[str] = data['files']
+        self.file_ids = data['file_ids']
+        self.lines = data['lines']
+        self.keys: List[str] = data['keys']
+        self.key_ids = data['key_ids']
+        self.grams = {gram: i for i, gram in enumerate(data['grams'])}
+        self.gram_offsets = data['gram_offsets']
+        self.postings = data['postings']
+        self.lowered = [name.lower() for name in self.qualified]
+
+    @classmethod
+    def from_project_map(cls, project_map: Dict) -> 'SymbolIndex':
+        names, qualified, kinds, file_ids, lines, files = [], [], array('B'), array('I'), array('I'), []
+
+        def add(name, qualified_name, kind, file_id, line):
+            names.append(name)
+            qualified.append(qualified_name)
+            kinds.append(KINDS.index(kind))
+            file_ids.append(file_id)
+            lines.append(line or 0)
+
+        for file_path, file_info in project_map.items():
+            file_id = len(files)
+            files.append(file_path)
+            add(file_path.replace('\\', '/').rsplit('/', 1)[-1], file_path, 'file', file_id, 0)
+
+            functions = file_info.get('functions', {})
+            # Per class: `functions` is keyed by bare name, so it can't tell one __init__ from another
+            method_lines = file_info.get('method_lines', {})
+            methods = set()
+            for class_name, class_methods in file_info.get('classes', {}).items():
+                add(class_name, class_name, 'class', file_id, 0)
+                class_lines = method_lines.get(class_name, {})
+                for method in class_methods:
+                    methods.add(method)
+                    add(method, f"{class_name}.{method}", 'method', file_id, class_lines.get(method))
+            for name, info in functions.items():
+                if name not in methods:  # the brain lists methods among functions too
+                    add(name, name, 'function', file_id, info.get('line_number'))
+
+        keyed = set()
+        postings = {}
+        for symbol_id, (name, qualified_name) in enumerate(zip(names, qualified)):
+            lowered = qualified_name.lower()
+            keyed.add((name.lower(), symbol_id))
+            keyed.add((lowered, symbol_id))
+            for gram in _trigrams(lowered):
+                postings.setdefault(gram, []).append(symbol_id)
+
+        keys = sorted(keyed)
+        grams = sorted(postings)
+        gram_offsets, flat = array('I', [0]), array('I')
+        for gram in grams:
+            flat.extend(postings[gram])
+            gram_offsets.append(len(flat))
+
+        return cls({
+            'names': names, 'qualified': qualified, 'kinds': kinds, 'files': files,
+            'file_ids': file_ids, 'lines': lines,
+            'keys': [key for key, _ in keys], 'key_ids': array('I', (symbol_id for _, symbol_id in keys)),
+            'grams': grams, 'gram_offsets': gram_offsets, 'postings': flat
+        })
+
+    def to_data(self) -> Dict:
+        """JSON-friendly form for save_cached(); numeric columns as base64 arrays"""
+        return {
+            'names': self.names, 'qualified': self.qualified, 'files': self.files, 'keys': self.keys,
+            'grams': sorted(self.grams, key=self.grams.get),
+            'kinds': _pack(self.kinds), 'file_ids': _pack(self.file_ids), 'lines': _pack(self.lines),
+            'key_ids': _pack(self.key_ids), 'gram_offsets': _pack(self.gram_offsets),
+            'postings': _pack(self.postings)
+        }
+
+    @classmethod
+    def from_data(cls, data: Dict) -> 'SymbolIndex':
+        data = dict(data)
+        data['kinds'] = _unpack(data['kinds'], 'B')
+        for key in ('file_ids', 'lines', 'key_ids', 'gram_offsets', 'postings'):
+            data[key] = _unpack(data[key])
+        return cls(data)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _posting(self, gram: str):
+        i = self.grams.get(gram)
+        if i is None:
+            return ()
+        return self.postings[self.gram_offsets[i]:self.gram_offsets[i + 1]]
+
+    def _word_match(self, symbol_id: int, query: str) -> bool:
+        """query starts at a word boundary: after . _ / or at a camelCase hump"""
+        text = self.qualified[symbol_id]
+        start = self.lowered[symbol_id].find(query)
+        while start > 0:
+            before = text[start - 1]
+            if before in SEPARATORS or (text[start].isupper() and not before.isupper()):
+                return True
+            start = self.lowered[symbol_id].find(query, start + 1)
+        return start == 0
+
+    def search(self, query: str, limit: int = 20, kinds: Optional[List[str]] = None) -> List[Dict]:
+        """Ranked matches for a partial name ('show_pl', 'max7219.show', 'plant_mood')"""
+        query = query.strip().lower()
+        if not query:
+            return []
+        allowed = {KINDS.index(kind) for kind in kinds if kind in KINDS} if kinds else None
+        scores = {}
+
+        # Kinds are filtered while collecting, so other kinds never use up the caps or the limit
+        start = bisect.bisect_left(self.keys, query)
+        scanned = 0
+        for position in range(start, len(self.keys)):
+            key = self.keys[position]
+            if not key.startswith(query) or scanned >= MAX_PREFIX_SCAN:
+                break
+            symbol_id = self.key_ids[position]
+            if allowed is not None and self.kinds[symbol_id] not in allowed:
+                continue
+            scanned += 1
+            score = EXACT if key == query else PREFIX
+            if score > scores.get(symbol_id, 0):
+                scores[symbol_id] = score
+
+        if len(query) >= 3 and len(scores) < limit:
+            candidates = min((self._posting(gram) for gram in _trigrams(query)), key=len)
+            verified = 0
+            for symbol_id in candidates:
+                if verified >= MAX_VERIFY:
+                    break
+                if allowed is not None and self.kinds[symbol_id] not in allowed:
+                    continue
+                verified += 1
+                if symbol_id in scores or query not in self.lowered[symbol_id]:
+                    continue
+                scores[symbol_id] = WORD if self._word_match(symbol_id, query) else SUBSTRING
+
+        ranked = heapq.nsmallest(limit, scores, key=lambda symbol_id: (
+            -scores[symbol_id], self.kinds[symbol_id], len(self.qualified[symbol_id]), self.qualified[symbol_id]
+        ))
+        return [self.describe(symbol_id, scores[symbol_id]) for symbol_id in ranked]
+
+    def describe(self, symbol_id: int, score: int) -> Dict:
+        kind = KINDS[self.kinds[symbol_id]]
+        file_path = self.files[self.file_ids[symbol_id]]
+        return {
+            'id': file_path if kind == 'file' else f"{file_path}::{self.qualified[symbol_id]}",
+            'name': self.names[symbol_id],
+            'qualified_name': self.qualified[symbol_id],
+            'kind': kind,
+            'file': file_path,
+            'line': self.lines[symbol_id] or None,
+            'score': score
+        }
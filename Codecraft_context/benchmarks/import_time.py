@@ -0,0 +1,115 @@
+"""Startup benchmark: measure `python -X importtime` for app.py
+
+Usage (from Codecraft_context/):
+    python benchmarks/import_time.py                    # report
+    python benchmarks/import_time.py --update-baseline  # record new baseline
+    python benchmarks/import_time.py --tolerance 0.2    # fail if >20% slower than baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(APP_DIR, 'benchmarks', 'import_time_baseline.json')
+
+
+def measure_import_time(module='app', env_overrides=None):
+    """Run `python -X importtime -c 'import <module>'` and parse the report"""
+    env = dict(os.environ)
+    env.update(env_overrides or {})
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=APP_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_part, cumulative_part, name = line.split(':', 1)[1].split('|', 2)
+            self_us, cumulative_us = int(self_part), int(cumulative_part)
+        except ValueError:
+            continue
+        name = name[1:]  # drop the single space after the separator
+        modules.append({
+            'name': name.strip(),
+            'self_us': self_us,
+            'cumulative_us': cumulative_us,
+            'depth': (len(name) - len(name.lstrip())) // 2
+        })
+
+    # The report is post-order: everything the module pulled in is listed
+    # right before its own depth-0 line, after the previous depth-0 line
+    # (interpreter startup imports such as `site`)
+    total_us, owned = 0, []
+    for entry in modules:
+        if entry['depth'] == 0:
+            if entry['name'] == module:
+                total_us = entry['cumulative_us']
+                break
+            owned = []
+        else:
+            owned.append(entry)
+
+    return {'module': module, 'total_us': total_us, 'modules': owned}
+
+
+def top_imports(report, limit=15):
+    """Slowest imports made directly by the benchmarked module"""
+    direct = [
+        (entry['name'], entry['cumulative_us']) for entry in report['modules']
+        if entry['depth'] == 1
+    ]
+    return sorted(direct, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Track app.py import time')
+    parser.add_argument('--runs', type=int, default=5, help='take the best of N runs')
+    parser.add_argument('--endpoints', help='value for CODECRAFT_ENDPOINTS')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown vs baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    env = {'CODECRAFT_ENDPOINTS': args.endpoints} if args.endpoints else {}
+    reports = [measure_import_time('app', env) for _ in range(max(1, args.runs))]
+    best = min(reports, key=lambda report: report['total_us'])
+
+    print(f"⏱️  import app: {best['total_us'] / 1000:.1f} ms (best of {len(reports)})")
+    for name, cumulative_us in top_imports(best):
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+    key = args.endpoints or 'all'
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline[key] = {'total_us': best['total_us'], 'top_imports': top_imports(best)}
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"✅ Baseline updated: {BASELINE_FILE}")
+        return 0
+
+    if key in baseline:
+        limit_us = baseline[key]['total_us'] * (1 + args.tolerance)
+        if best['total_us'] > limit_us:
+            print(f"❌ Import time regression: {best['total_us'] / 1000:.1f} ms > "
+                  f"{limit_us / 1000:.1f} ms allowed")
+            return 1
+        print(f"✅ Within {args.tolerance:.0%} of baseline "
+              f"({baseline[key]['total_us'] / 1000:.1f} ms)")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
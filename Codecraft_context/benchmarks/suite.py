@@ -0,0 +1,202 @@
+"""End-to-end benchmark: crawl, index, context selection, analysis, graph
+
+Generates synthetic projects at several scales (see synthetic_repo.py) and
+times each stage, best/median of N runs. Results are saved as JSON tagged
+with the git commit, so two runs can be compared.
+
+Usage (from Codecraft_context/):
+    python benchmarks/suite.py                                # 50,200,1000 files
+    python benchmarks/suite.py --scales 100,2000 --repeat 5
+    python benchmarks/suite.py --compare benchmarks/results/<older>.json --tolerance 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(APP_DIR, 'benchmarks', 'results')
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_repo import generate_repo  # noqa: E402
+
+QUESTIONS = [
+    'How does the sensor reading work?',
+    'Where is the display updated?',
+    'What does calculate_mood_2_0 call?',
+    'Explain the web routes',
+    'What is the overall architecture?',
+]
+
+
+def timed(function, repeat, warmup=1):
+    """(best, median, last result) of running function() `repeat` times, prints silenced
+
+    The warm-up runs are not counted - they pay for lazy imports.
+    """
+    durations, result = [], None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            function()
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = function()
+            durations.append(time.perf_counter() - start)
+    return {'best_s': round(min(durations), 6), 'median_s': round(statistics.median(durations), 6),
+            'runs': len(durations)}, result
+
+
+def run_scale(files, args, workdir):
+    from backend.ai_helper import AIHelper
+    from backend.architecture_mapper import ArchitectureMapper
+    from backend.code_crawler import CodeCrawler
+    from backend.compact_brain import CompactBrain
+    from backend.smart_analyzer import SmartAnalyzer
+
+    root = os.path.join(workdir, f'repo_{files}')
+    generated = generate_repo(root, files, args.symbols, args.import_density, args.arduino_ratio, seed=args.seed)
+    stages = {}
+
+    # Crawl: parse every file (no parse cache - that would only time the cache)
+    stages['crawl'], project_map = timed(lambda: CodeCrawler(root).build_project_map(), args.repeat)
+
+    brain_dir = os.path.join(workdir, f'brain_{files}')
+    os.makedirs(brain_dir, exist_ok=True)
+    brain_file = os.path.join(brain_dir, 'project_brain.json')
+    with open(brain_file, 'w', encoding='utf-8') as f:
+        json.dump(project_map, f)
+
+    # Index: dependency graph + metrics + call graph, as done after every analysis
+    def index():
+        for cache_file in ('graph_metrics.json', 'call_graph.json'):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(brain_dir, cache_file))  # time the work, not the cache
+        mapper = ArchitectureMapper()
+        mapper.build_dependency_graph(project_map)
+        mapper.compute_metrics(os.path.join(brain_dir, 'graph_metrics.json'))
+        mapper.build_call_graph(project_map, os.path.join(brain_dir, 'call_graph.json'))
+    stages['index'], _ = timed(index, args.repeat)
+
+    stages['brain_load'], compact = timed(lambda: CompactBrain.from_dict(project_map), args.repeat)
+
+    # Context selection, per question
+    helper = AIHelper(brain_file, project_map=compact)
+    stages['context'], _ = timed(lambda: [helper.get_intelligent_context(q) for q in QUESTIONS], args.repeat)
+    for key in ('best_s', 'median_s'):
+        stages['context'][key] = round(stages['context'][key] / len(QUESTIONS), 6)
+
+    # Pattern analysis over every Python file
+    sources = []
+    for file_path in project_map:
+        if file_path.endswith('.py'):
+            with open(os.path.join(root, file_path), 'r', encoding='utf-8') as f:
+                sources.append((file_path, f.read()))
+    analyzer = SmartAnalyzer()
+    stages['analysis'], _ = timed(
+        lambda: [analyzer.analyze_code_quality(code, path, include_ml=args.ml) for path, code in sources],
+        args.repeat
+    )
+
+    # Architecture graph: dependency graph + layout + compact payload (fresh layout each run)
+    stages['architecture_graph'], _ = timed(
+        lambda: ArchitectureMapper().build_architecture_graph(project_map), args.repeat
+    )
+
+    shutil.rmtree(root, ignore_errors=True)
+    return {
+        'files': generated['files'],
+        'symbols': generated['symbols'],
+        'imports': generated['imports'],
+        'stages': stages
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=APP_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print per-stage ratios vs a baseline run; True if any stage regressed"""
+    previous = {entry['files']: entry['stages'] for entry in baseline['results']}
+    regressed = False
+    print(f"\n📊 vs {str(baseline.get('commit'))[:10]} (tolerance {tolerance:.0%})")
+    for entry in results['results']:
+        old_stages = previous.get(entry['files'])
+        if not old_stages:
+            continue
+        for stage, numbers in entry['stages'].items():
+            if stage not in old_stages or not old_stages[stage]['best_s']:
+                continue
+            ratio = numbers['best_s'] / old_stages[stage]['best_s']
+            flag = '❌' if ratio > 1 + tolerance else '✅'
+            regressed |= ratio > 1 + tolerance
+            print(f"   {flag} {entry['files']:>6} files  {stage:<20} {ratio:5.2f}x")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Codecraft end-to-end benchmarks')
+    parser.add_argument('--scales', default='50,200,1000', help='comma separated file counts')
+    parser.add_argument('--symbols', type=int, default=10, help='top-level symbols per file')
+    parser.add_argument('--import-density', type=float, default=3.0, help='project imports per module')
+    parser.add_argument('--arduino-ratio', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ml', action='store_true', help='include the scikit-learn anomaly pass')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': []
+    }
+
+    workdir = tempfile.mkdtemp(prefix='codecraft-bench-')
+    try:
+        for files in (int(scale) for scale in args.scales.split(',')):
+            print(f"🏁 {files} files...")
+            entry = run_scale(files, args, workdir)
+            results['results'].append(entry)
+            for stage, numbers in entry['stages'].items():
+                print(f"   {stage:<20} {numbers['best_s'] * 1000:10.1f} ms (median {numbers['median_s'] * 1000:.1f})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{(commit or 'nogit')[:10]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results saved: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            if compare(results, json.load(f), args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Synthetic project generator for the benchmark suite
+
+Builds a reproducible Python + Arduino tree: nested packages, modules with
+classes/functions that import and call each other, and sketches with the
+usual setup()/loop(), #defines and globals. Everything is derived from the
+seed, so the same arguments always produce byte-identical files.
+
+Usage (from Codecraft_context/):
+    python benchmarks/synthetic_repo.py /tmp/synthetic --files 500 --symbols 12
+"""
+import argparse
+import os
+import random
+
+TOPICS = ['sensor', 'display', 'mood', 'network', 'storage', 'route', 'config', 'health', 'motor', 'audio']
+
+
+def _module_path(index, package_count, depth):
+    """pkg_3/sub_1/module_42.py - files spread over a fixed package tree"""
+    package = index % package_count
+    parts = [f'pkg_{package}']
+    for level in range(1, depth):
+        parts.append(f'sub_{(index // package_count + level) % 3}')
+    return os.path.join(*parts, f'module_{index}.py')
+
+
+def _python_module(rng, index, symbols, imports):
+    """Source of one module: imports, then classes and functions calling into them"""
+    topic = TOPICS[index % len(TOPICS)]
+    lines = ['import os', 'import json', '']
+    for module_name, function_name in imports:
+        lines.append(f'from {module_name} import {function_name}')
+    lines.append('')
+
+    function_names = []
+    for symbol in range(symbols):
+        if symbol % 4 == 3:
+            class_name = f'{topic.title()}Manager{index}_{symbol}'
+            lines.append(f'class {class_name}:')
+            lines.append('    def __init__(self, config=None):')
+            lines.append('        self.config = config or {}')
+            lines.append('')
+            for method in range(3):
+                lines.append(f'    def handle_{topic}_{method}(self, value):')
+                lines.append(f'        result = calculate_{topic}_{index}_0(value)' if function_names else '        result = value')
+                lines.append(f'        return self.handle_{topic}_{(method + 1) % 3}(result) if value > 100 else result')
+                lines.append('')
+            continue
+
+        name = f'calculate_{topic}_{index}_{symbol}'
+        function_names.append(name)
+        lines.append(f'def {name}(value, factor=2):')
+        lines.append(f'    """Compute the {topic} value (synthetic)"""')
+        lines.append('    total = 0')
+        lines.append('    for item in range(value % 50):')
+        lines.append('        total += item * factor')
+        for _, imported in imports[:2]:
+            lines.append(f'    total += {imported}(total % 7)')
+        if rng.random() < 0.05:
+            # A few known bug patterns so the analyzer has something to report
+            lines.append("    handle = open('data.txt')")
+            lines.append('    while True:')
+            lines.append('        break')
+        lines.append('    return total')
+        lines.append('')
+
+    return '\n'.join(lines) + '\n', function_names
+
+
+def _arduino_sketch(rng, index, symbols):
+    lines = ['#include <Wire.h>', f'#define SENSOR_PIN_{index} {index % 13}', f'#define INTERVAL_MS {100 + index}', '']
+    lines.append(f'int readings_{index}[10] = {{0}};')
+    lines.append('unsigned long lastRead = 0;')
+    lines.append('')
+    return_types = ['void', 'int', 'float', 'bool', 'unsigned long']
+    for symbol in range(symbols):
+        return_type = rng.choice(return_types)
+        lines.append(f'{return_type} step_{index}_{symbol}(int value,')
+        lines.append('                 float scale) {')
+        lines.append('  // { braces in comments must not confuse the parser }')
+        lines.append(f'  Serial.println("step {symbol} {{");')
+        lines.append('  if (value > 10) { value = value / 2; }')
+        lines.append('  return;' if return_type == 'void' else '  return value;')
+        lines.append('}')
+        lines.append('')
+    lines.extend(['void setup() {', '  Serial.begin(9600);', '}', '', 'void loop() {',
+                  f'  step_{index}_0(analogRead(SENSOR_PIN_{index}), 1.0);', '}', ''])
+    return '\n'.join(lines)
+
+
+def generate_repo(root, files=100, symbols=10, import_density=3.0, arduino_ratio=0.1, depth=3, seed=0):
+    """Write a synthetic project under root; returns what was generated
+
+    files          - number of code files (Python + Arduino)
+    symbols        - top-level functions/classes per file
+    import_density - average number of project-internal imports per module
+    arduino_ratio  - share of files that are .ino sketches
+    """
+    rng = random.Random(seed)
+    sketch_count = int(files * arduino_ratio)
+    module_count = files - sketch_count
+    package_count = max(1, int(module_count ** 0.5))
+
+    written = {'files': 0, 'python_files': 0, 'arduino_files': 0, 'symbols': 0, 'imports': 0, 'root': root}
+    exported = []  # (module name, function) of modules written so far
+
+    for package_dir in {os.path.dirname(_module_path(i, package_count, depth)) for i in range(module_count)}:
+        parts = package_dir.split(os.sep)
+        for level in range(1, len(parts) + 1):
+            init_path = os.path.join(root, *parts[:level], '__init__.py')
+            if not os.path.exists(init_path):
+                os.makedirs(os.path.dirname(init_path), exist_ok=True)
+                open(init_path, 'w').close()
+
+    for index in range(module_count):
+        relative_path = _module_path(index, package_count, depth)
+        # Only import modules generated earlier - keeps the import graph mostly acyclic
+        wanted = min(len(exported), int(import_density) + (rng.random() < import_density % 1))
+        imports = rng.sample(exported, wanted) if wanted else []
+
+        source, function_names = _python_module(rng, index, symbols, imports)
+        with open(os.path.join(root, relative_path), 'w', encoding='utf-8') as f:
+            f.write(source)
+
+        module_name = relative_path[:-3].replace(os.sep, '.')
+        exported.extend((module_name, name) for name in function_names[:2])
+        written['python_files'] += 1
+        written['symbols'] += symbols
+        written['imports'] += len(imports)
+
+    for index in range(sketch_count):
+        sketch_dir = os.path.join(root, 'firmware', f'sketch_{index}')
+        os.makedirs(sketch_dir, exist_ok=True)
+        with open(os.path.join(sketch_dir, f'sketch_{index}.ino'), 'w', encoding='utf-8') as f:
+            f.write(_arduino_sketch(rng, index, symbols))
+        written['arduino_files'] += 1
+        written['symbols'] += symbols + 2
+
+    written['files'] = written['python_files'] + written['arduino_files']
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Python/Arduino project')
+    parser.add_argument('root')
+    parser.add_argument('--files', type=int, default=100)
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--import-density', type=float, default=3.0)
+    parser.add_argument('--arduino-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    stats = generate_repo(args.root, args.files, args.symbols, args.import_density, args.arduino_ratio, seed=args.seed)
+    print(f"✅ Generated {stats['files']} files ({stats['symbols']} symbols, {stats['imports']} imports) in {args.root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,19 +6,30 @@ async function loadProjects() {
     const projects = await response.json();
     
     const select = document.getElementById('projectSelect');
+    const selected = select.value;
     select.innerHTML = '<option value="">Select a project...</option>';
     
     projects.forEach(project => {
         const option = document.createElement('option');
         option.value = project.name;
-        option.textContent = project.name;
+        const counts = project.files !== undefined ? ` (${project.files} files, ${project.symbols} symbols)` : '';
+        option.textContent = project.status === 'partial'
+            ? `${project.name} (indexing, ${project.files_pending} files left)`
+            : project.name + counts;
         select.appendChild(option);
     });
+    
+    // Keep the selection across reloads and draw its graph (no change event fires for it)
+    if (projects.some(project => project.name === selected)) {
+        select.value = selected;
+    }
+    loadArchitectureGraph(select.value);
 }
 
 async function analyzeProject() {
     const projectPath = document.getElementById('projectPath').value;
     const projectName = document.getElementById('projectName').value;
+    const timeBudget = document.getElementById('timeBudget').value;
     
     if (!projectPath || !projectName) {
         alert('Please enter both project path and name!');
@@ -37,12 +48,17 @@ async function analyzeProject() {
             },
             body: JSON.stringify({
                 project_path: projectPath,
-                project_name: projectName
+                project_name: projectName,
+                // Only when asked for: without a budget the crawl streams straight into the brain
+                ...(timeBudget ? {time_budget: Number(timeBudget)} : {})
             })
         });
         
         const result = await response.json();
         statusDiv.textContent = `✅ ${result.message} (${result.files_analyzed} files analyzed)`;
+        if (result.files_pending) {
+            setTimeout(loadProjects, 15000);  // pick up the completed brain
+        }
         
         // Reload projects list
         loadProjects();
@@ -101,4 +117,207 @@ async function askQuestion() {
         errorDiv.textContent = `AI: Error - ${error.message}`;
         chatHistory.appendChild(errorDiv);
     }
-}
\ No newline at end of file
+}
+
+// Architecture view: the overview starts from the collapsed package/file
+// level and opens a node into its children on click; the full graph comes
+// as a compact payload (typed arrays as base64) that we draw ourselves
+const projectSelectForGraph = document.getElementById('projectSelect');
+if (projectSelectForGraph) {
+    projectSelectForGraph.addEventListener('change', () => loadArchitectureGraph(projectSelectForGraph.value));
+}
+const architectureMode = document.getElementById('architectureMode');
+if (architectureMode) {
+    architectureMode.addEventListener('change', () => loadArchitectureGraph(projectSelectForGraph.value));
+}
+const architectureCanvas = document.getElementById('architectureCanvas');
+if (architectureCanvas) {
+    architectureCanvas.addEventListener('click', event => expandClickedNode(architectureCanvas, event));
+}
+
+// Overview state: the visible nodes (id -> node), their lifted import edges and where they were drawn
+let architectureView = null;
+
+function decodeTypedArray(base64, ArrayType) {
+    const bytes = Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+    return new ArrayType(bytes.buffer);
+}
+
+async function loadArchitectureGraph(projectName) {
+    const canvas = document.getElementById('architectureCanvas');
+    architectureView = null;
+    if (!canvas || !projectName) {
+        return;
+    }
+    
+    if (!architectureMode || architectureMode.value === 'overview') {
+        const response = await fetch(`/api/architecture/${encodeURIComponent(projectName)}`);
+        if (!response.ok) {
+            return;
+        }
+        
+        const view = await response.json();
+        architectureView = {
+            project: projectName,
+            nodes: new Map(view.nodes.map(node => [node.id, node])),
+            edges: view.edges,
+            positions: new Map()
+        };
+        drawArchitectureOverview(canvas, architectureView);
+        return;
+    }
+    
+    const response = await fetch(`/api/architecture/${encodeURIComponent(projectName)}/graph`);
+    if (!response.ok) {
+        return;
+    }
+    
+    const graph = await response.json();
+    drawArchitectureGraph(canvas, {
+        ...graph,
+        positions: decodeTypedArray(graph.positions, Float32Array),
+        edges: decodeTypedArray(graph.edges, Uint32Array)
+    });
+}
+
+function drawArchitectureGraph(canvas, graph) {
+    const ctx = canvas.getContext('2d');
+    const colors = {file: '#4a90d9', class: '#e67e22', method: '#95a5a6'};
+    const {positions, edges, parents, types, labels, strings} = graph;
+    
+    // Fit x/y of the 3D layout into the canvas
+    let minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
+    for (let i = 0; i < graph.node_count; i++) {
+        minX = Math.min(minX, positions[i * 3]);
+        maxX = Math.max(maxX, positions[i * 3]);
+        minY = Math.min(minY, positions[i * 3 + 1]);
+        maxY = Math.max(maxY, positions[i * 3 + 1]);
+    }
+    const scale = Math.min(canvas.width / (maxX - minX || 1), canvas.height / (maxY - minY || 1)) * 0.9;
+    const x = i => (positions[i * 3] - minX) * scale + canvas.width * 0.05;
+    const y = i => (positions[i * 3 + 1] - minY) * scale + canvas.height * 0.05;
+    
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    
+    // Containment edges (from parents) and import edges
+    ctx.strokeStyle = '#dddddd';
+    ctx.beginPath();
+    for (let i = 0; i < graph.node_count; i++) {
+        if (parents[i] >= 0) {
+            ctx.moveTo(x(parents[i]), y(parents[i]));
+            ctx.lineTo(x(i), y(i));
+        }
+    }
+    ctx.stroke();
+    
+    ctx.strokeStyle = '#888888';
+    ctx.beginPath();
+    for (let e = 0; e < edges.length; e += 2) {
+        ctx.moveTo(x(edges[e]), y(edges[e]));
+        ctx.lineTo(x(edges[e + 1]), y(edges[e + 1]));
+    }
+    ctx.stroke();
+    
+    for (let i = 0; i < graph.node_count; i++) {
+        const type = graph.node_types[types[i]];
+        ctx.fillStyle = colors[type] || '#4a90d9';
+        ctx.beginPath();
+        ctx.arc(x(i), y(i), type === 'file' ? 5 : type === 'class' ? 3.5 : 2, 0, 2 * Math.PI);
+        ctx.fill();
+        
+        if (type === 'file') {
+            ctx.fillStyle = '#333333';
+            ctx.fillText(strings[labels[i]], x(i) + 6, y(i) + 3);
+        }
+    }
+}
+
+async function expandArchitectureNode(canvas, nodeId) {
+    const view = architectureView;
+    const params = new URLSearchParams({node: nodeId});
+    view.nodes.forEach((node, id) => params.append('visible', id));
+    
+    const response = await fetch(`/api/architecture/${encodeURIComponent(view.project)}/expand?${params}`);
+    if (!response.ok || architectureView !== view) {
+        return;  // failed, or another project / mode was picked meanwhile
+    }
+    
+    // The node's edges now attach to its children, which the response brings
+    const expanded = await response.json();
+    view.nodes.delete(nodeId);
+    view.edges = view.edges.filter(edge => edge.source !== nodeId && edge.target !== nodeId);
+    expanded.nodes.forEach(node => view.nodes.set(node.id, node));
+    view.edges.push(...expanded.edges);
+    drawArchitectureOverview(canvas, view);
+}
+
+function expandClickedNode(canvas, event) {
+    if (!architectureView) {
+        return;
+    }
+    
+    // The canvas is scaled by CSS: convert the click to canvas pixels
+    const rect = canvas.getBoundingClientRect();
+    const clickX = (event.clientX - rect.left) * canvas.width / rect.width;
+    const clickY = (event.clientY - rect.top) * canvas.height / rect.height;
+    for (const [id, position] of architectureView.positions) {
+        const node = architectureView.nodes.get(id);
+        if (node.child_count > 0 && Math.hypot(position.x - clickX, position.y - clickY) <= position.radius + 4) {
+            expandArchitectureNode(canvas, id);
+            return;
+        }
+    }
+}
+
+function drawArchitectureOverview(canvas, view) {
+    const ctx = canvas.getContext('2d');
+    const colors = {package: '#2c3e50', file: '#4a90d9', class: '#e67e22', method: '#95a5a6', function: '#27ae60'};
+    const nodes = [...view.nodes.values()];
+    
+    // Visible nodes on a circle, sized by how many files they hold
+    const centerX = canvas.width / 2, centerY = canvas.height / 2;
+    const ring = Math.min(centerX, centerY) * 0.75;
+    view.positions = new Map();
+    nodes.forEach((node, i) => {
+        const angle = 2 * Math.PI * i / nodes.length;
+        view.positions.set(node.id, {
+            x: nodes.length > 1 ? centerX + ring * Math.cos(angle) : centerX,
+            y: nodes.length > 1 ? centerY + ring * Math.sin(angle) : centerY,
+            radius: 4 + Math.min(12, 2 * Math.sqrt(node.file_count || 1))
+        });
+    });
+    
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    
+    // Import edges between visible nodes, thicker for more imports
+    ctx.strokeStyle = '#888888';
+    view.edges.forEach(edge => {
+        const source = view.positions.get(edge.source), target = view.positions.get(edge.target);
+        if (source && target) {
+            ctx.lineWidth = 1 + Math.log2(edge.weight);
+            ctx.beginPath();
+            ctx.moveTo(source.x, source.y);
+            ctx.lineTo(target.x, target.y);
+            ctx.stroke();
+        }
+    });
+    ctx.lineWidth = 1;
+    
+    nodes.forEach(node => {
+        const position = view.positions.get(node.id);
+        ctx.fillStyle = colors[node.type] || '#4a90d9';
+        ctx.beginPath();
+        ctx.arc(position.x, position.y, position.radius, 0, 2 * Math.PI);
+        ctx.fill();
+        if (node.child_count > 0) {
+            // Can be opened: ring around it
+            ctx.strokeStyle = '#333333';
+            ctx.beginPath();
+            ctx.arc(position.x, position.y, position.radius + 3, 0, 2 * Math.PI);
+            ctx.stroke();
+        }
+        
+        ctx.fillStyle = '#333333';
+        ctx.fillText(node.label, position.x + position.radius + 5, position.y + 3);
+    });
+}
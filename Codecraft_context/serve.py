@@ -0,0 +1,215 @@
+"""Production server: a prefork master and N threaded WSGI workers
+
+The master binds the port once and forks workers that all accept on the
+shared socket; it never handles requests itself. Brains are opened as
+memory-mapped project_brain.bin files (see backend/mapped_brain.py), so
+every worker reads the same physical pages from the page cache.
+
+Reloading:
+  - a re-analysis replaces the brain files; each worker notices the new
+    stamp on its next request to that project and maps the new file, while
+    requests already running finish on the old mapping
+  - SIGHUP starts a fresh generation of workers, then gracefully stops the
+    old one (without --preload this also picks up new code)
+  - SIGTERM / SIGINT: stop accepting, let in-flight requests finish
+    (up to --graceful-timeout), then exit
+
+Background jobs across workers:
+  - budgeted crawls and watchers run as threads of one worker, which holds
+    projects/.locks/<name>.crawl.lock / .watch.lock while it runs them;
+    what is wanted (crawl_token, watch config) lives in project_meta.json,
+    so any worker can supersede a crawl, unwatch or delete a project
+  - every worker resumes crawls and watchers whose lock is free (the worker
+    went away in a reload or crash) on start and every
+    CODECRAFT_JOBS_INTERVAL seconds; a stopping worker hands its jobs over
+  - still per worker: question prefetch jobs and the LLM queue (priorities
+    only order the calls of one worker), and a watcher keeps the debounce /
+    backend it was started with until it is restarted
+
+Usage (from Codecraft_context/):
+    python serve.py --workers 4 --port 5000
+    kill -HUP <master pid>        # graceful reload
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+
+def load_app():
+    from app import app
+    return app
+
+
+def start_jobs():
+    from app import start_background_maintenance
+    start_background_maintenance()
+
+
+def stop_jobs():
+    from app import stop_background_jobs
+    stop_background_jobs()
+
+
+def run_worker(sock, host, port):
+    """Serve on the inherited socket until SIGTERM, then finish in-flight requests"""
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C reaches the whole group; the master decides
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    server = make_server(host, port, load_app(), threaded=True, fd=sock.fileno())
+    # Workers race for each connection: a loser must get EAGAIN, not block in accept()
+    server.socket.setblocking(False)
+    server.daemon_threads = False
+    server.block_on_close = True  # server_close() waits for running requests
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"👷 Worker {os.getpid()} serving on http://{host}:{port}")
+    start_jobs()
+    server.serve_forever()
+    server.server_close()
+    stop_jobs()
+
+
+class Master:
+    """Keeps `workers` processes alive; reloads on SIGHUP, stops on SIGTERM/SIGINT"""
+
+    def __init__(self, sock, host, port, workers, graceful_timeout):
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.size = workers
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}  # pid -> generation
+        self.generation = 0
+        self.stopping = False
+        self.reloading = False
+
+    def spawn(self):
+        sys.stdout.flush()  # or the child re-prints the master's buffered output
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self.sock, self.host, self.port)
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} crashed: {e}")
+                status = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(status)
+        self.workers[pid] = self.generation
+
+    def reap(self):
+        """Forget exited workers; True if one of the current generation died"""
+        died = False
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and not self.stopping:
+                print(f"⚠️ Worker {pid} exited ({os.waitstatus_to_exitcode(status)}), respawning")
+                died = True
+        return died
+
+    def signal_workers(self, signum, generation=None):
+        for pid, worker_generation in list(self.workers.items()):
+            if generation is None or worker_generation == generation:
+                try:
+                    os.kill(pid, signum)
+                except ProcessLookupError:
+                    pass
+
+    def reload(self):
+        old_generation = self.generation
+        self.generation += 1
+        for _ in range(self.size):
+            self.spawn()
+        print(f"🔄 Reload: generation {self.generation} started, stopping generation {old_generation}")
+        self.signal_workers(signal.SIGTERM, old_generation)
+
+    def stop(self):
+        print(f"🛑 Stopping {len(self.workers)} workers...")
+        self.signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        if self.workers:
+            print(f"⚠️ Killing {len(self.workers)} workers still busy after {self.graceful_timeout}s")
+            self.signal_workers(signal.SIGKILL)
+            while self.workers:
+                self.reap()
+                time.sleep(0.05)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        for _ in range(self.size):
+            self.spawn()
+        print(f"🚀 Master {os.getpid()}: {self.size} workers on http://{self.host}:{self.port}")
+
+        while not self.stopping:
+            if self.reloading:
+                self.reloading = False
+                self.reload()
+            if self.reap():
+                time.sleep(1)  # don't spin if workers die at startup
+            current = sum(1 for generation in self.workers.values() if generation == self.generation)
+            for _ in range(self.size - current):
+                self.spawn()
+            time.sleep(0.5)
+        self.stop()
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reloading = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Codecraft production server')
+    parser.add_argument('--host', default=os.environ.get('CODECRAFT_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('CODECRAFT_PORT', '5000')))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('CODECRAFT_WORKERS', str(os.cpu_count() or 2))))
+    parser.add_argument('--graceful-timeout', type=float,
+                        default=float(os.environ.get('CODECRAFT_GRACEFUL_TIMEOUT', '30')))
+    parser.add_argument('--preload', action='store_true',
+                        help='import the app (and CODECRAFT_PRELOAD modules) once in the master')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        # No prefork on Windows: one process, one thread per request
+        from werkzeug.serving import make_server
+        print(f"🚀 Serving on http://{args.host}:{args.port} (single process, no fork available)")
+        server = make_server(args.host, args.port, load_app(), threaded=True)
+        start_jobs()
+        server.serve_forever()
+        return
+
+    sock = socket.socket(socket.AF_INET6 if ':' in args.host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+
+    if args.preload:
+        load_app()  # workers inherit the imported modules copy-on-write
+    Master(sock, args.host, args.port, max(1, args.workers), args.graceful_timeout).run()
+
+
+if __name__ == '__main__':
+    main()
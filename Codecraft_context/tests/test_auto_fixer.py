@@ -0,0 +1,27 @@
+from backend.auto_fixer import AutoFixer
+
+BRANCH_OPEN = '''def load(a):
+    if a:
+        fh = open(a)
+    else:
+        fh = open("b")
+    data = fh.read()
+    return data
+'''
+
+
+def test_resource_leak_used_after_its_block_is_not_closed():
+    fixer = AutoFixer()
+    for line in (3, 5):
+        result = fixer.apply_fixes([{'type': 'resource_leak', 'line': line}], BRANCH_OPEN)
+        assert result['applied'] == []
+        assert result['code'] == BRANCH_OPEN
+
+
+def test_resource_leak_wraps_the_rest_of_the_block():
+    code = 'def load(path):\n    f = open(path)\n    data = f.read()\n    return data\n'
+    result = AutoFixer().apply_fixes([{'type': 'resource_leak', 'line': 2}], code)
+    assert result['valid']
+    assert result['code'] == ('def load(path):\n    f = open(path)\n    try:\n        data = f.read()\n'
+                              '        return data\n    finally:\n'
+                              '        f.close()  # AUTO-FIX: Added resource cleanup\n')
@@ -0,0 +1,26 @@
+import pytest
+
+from backend.parsers.c_parser import parse_c_source
+
+
+@pytest.mark.parametrize('source, return_type', [
+    ('std::vector<int> values() { return {}; }', 'std::vector<int>'),
+    ('std::vector <int> values() { return {}; }', 'std::vector<int>'),
+    ('std::map<std::string, std::vector<int> > values() { return {}; }',
+     'std::map<std::string, std::vector<int>>'),
+    ('const std::vector<int>& values() { static std::vector<int> v; return v; }', 'const std::vector<int>&'),
+])
+def test_templated_return_types(source, return_type):
+    assert parse_c_source(source, 'values.cpp')['functions']['values']['return_type'] == return_type
+
+
+def test_function_pointer_globals():
+    source = ('void (*on_press)(int);\n'
+              'static int (*handlers[4])(int, char*) = {0};\n'
+              'struct ops { int (*open)(void); };\n')
+    info = parse_c_source(source, 'buttons.cpp')
+    assert info['globals'] == {
+        'on_press': {'line_number': 1, 'type': 'void (*)(int)'},
+        'handlers': {'line_number': 2, 'type': 'int (*)(int, char*)'},
+    }
+    assert info['functions'] == {}
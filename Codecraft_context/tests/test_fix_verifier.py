@@ -0,0 +1,21 @@
+from backend.fix_verifier import _verify_candidate
+
+
+def job(fixed_code):
+    return {'issue': {'type': 'resource_leak', 'line': 3}, 'file': 'load.py', 'diff': '',
+            'fixed_code': fixed_code, 'original_count': None, 'test_command': None,
+            'project_root': None, 'test_timeout': 60}
+
+
+def test_leak_fix_closing_a_file_read_later_is_rejected():
+    fixed_code = ('def load(a):\n    if a:\n        fh = open(a)\n        fh.close()\n'
+                  '    else:\n        fh = open("b")\n    data = fh.read()\n    return data\n')
+    result = _verify_candidate(job(fixed_code))
+    assert not result['accepted']
+    assert result['checks']['issue_resolved'] is False
+
+
+def test_leak_fix_closing_in_finally_is_accepted():
+    fixed_code = ('def load(a):\n    if a:\n        fh = open(a)\n        try:\n            data = fh.read()\n'
+                  '        finally:\n            fh.close()\n        return data\n')
+    assert _verify_candidate(job(fixed_code))['accepted']
@@ -0,0 +1,64 @@
+import pytest
+
+from backend.call_graph import CallGraph
+from backend.question_router import LARGE, SMALL, QuestionRouter
+
+PROJECT_MAP = {
+    'sensors/sensor.py': {
+        'classes': {'Sensor': ['read']},
+        'functions': {'read': {'line_number': 3}, 'calculate_mood': {'line_number': 8}},
+        'imports': ['time'],
+        'calls': []
+    },
+    'main.py': {
+        'classes': {},
+        'functions': {'main': {'line_number': 1}},
+        'imports': ['sensors.sensor'],
+        'calls': []
+    }
+}
+CALL_GRAPH = CallGraph([['main.py::main', 'calculate_mood', 2, 'sensors/sensor.py::calculate_mood']])
+
+
+@pytest.fixture
+def router():
+    return QuestionRouter(small_model='small-model')
+
+
+@pytest.mark.parametrize('question', [
+    "Which functions in sensor.py should I refactor for better performance?",
+    "What functions does the bug in sensor.py affect, and why?",
+    "List the functions in sensor.py that are too long",
+    "What classes in sensor.py would be worth splitting up?",
+    "Where is calculate_mood used and why is it slow?",
+    "Who calls calculate_mood and should they cache it?",
+    "Explain where calculate_mood is defined",
+    "Where is the plant mood calculation logic?",
+    "What's the main entry point of the application?",
+])
+def test_questions_that_are_not_lookups(router, question):
+    assert router.answer_lookup(question, PROJECT_MAP, CALL_GRAPH) is None
+
+
+@pytest.mark.parametrize('question, expected', [
+    ("List the functions in sensor.py", "- calculate_mood"),
+    ("What classes are in sensors/sensor.py?", "- Sensor"),
+    ("What imports does main.py have?", "- sensors.sensor"),
+    ("Where is calculate_mood defined?", "sensors/sensor.py (line 8)"),
+    ("Which file defines Sensor.read", "sensors/sensor.py (line 3)"),
+    ("Who calls calculate_mood?", "main.py::main (line 2)"),
+    ("What does main call?", "sensors/sensor.py::calculate_mood"),
+])
+def test_lookups_answered_from_the_index(router, question, expected):
+    assert expected in router.answer_lookup(question, PROJECT_MAP, CALL_GRAPH)
+
+
+def test_unknown_symbol_falls_through_to_the_llm(router):
+    assert router.answer_lookup("Where is nothing_here defined?", PROJECT_MAP, CALL_GRAPH) is None
+
+
+def test_model_for(router):
+    assert router.model_for("What does calculate_mood return?", "context") == SMALL
+    assert router.model_for("Why does calculate_mood return a string?", "context") == LARGE
+    assert router.model_for("What does calculate_mood return?", "x" * 5000) == LARGE
+    assert QuestionRouter().model_for("What does calculate_mood return?", "context") == LARGE
@@ -0,0 +1,28 @@
+from backend.parsers.python_parser import parse_python_source
+from backend.symbol_index import SymbolIndex
+
+SOURCE = '''class Sensor:
+    def __init__(self, pin):
+        self.pin = pin
+
+
+class Display:
+    def __init__(self):
+        self.lines = []
+'''
+
+
+def lines_of(project_map, name):
+    index = SymbolIndex.from_project_map(project_map)
+    return {match['qualified_name']: match['line'] for match in index.search(name, kinds=['method'])}
+
+
+def test_methods_with_the_same_name_keep_their_own_lines():
+    project_map = {'devices.py': parse_python_source(SOURCE, 'devices.py')}
+    assert lines_of(project_map, '__init__') == {'Sensor.__init__': 2, 'Display.__init__': 7}
+
+
+def test_method_line_is_left_out_without_per_class_lines():
+    project_map = {'devices.py': {'classes': {'Sensor': ['__init__'], 'Display': ['__init__']},
+                                  'functions': {'__init__': {'line_number': 7}}}}
+    assert lines_of(project_map, '__init__') == {'Sensor.__init__': None, 'Display.__init__': None}